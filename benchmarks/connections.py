@@ -0,0 +1,165 @@
+"""
+Connection setup benchmark for Mayor K. Guest Palace.
+
+Serves requests through Django's real WSGI handler, so the request_started /
+request_finished signals open and close database connections exactly as they
+do under gunicorn, and compares connection strategies:
+
+- fresh:      CONN_MAX_AGE=0, a new connection per request (the base settings)
+- persistent: CONN_MAX_AGE with health checks (config.settings_production)
+- pool:       psycopg3 connection pool (PostgreSQL with psycopg[pool] only)
+"""
+import io
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+from benchmarks.harness import percentile, no_throttling
+
+MODES = ['fresh', 'persistent', 'pool']
+
+
+def available_modes():
+    if connection.vendor != 'postgresql':
+        return ['fresh', 'persistent']
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return ['fresh', 'persistent']
+    return MODES
+
+
+def configure(mode, settings_dict):
+    """Apply a connection strategy to the default connection's settings."""
+    settings_dict['CONN_MAX_AGE'] = 600 if mode == 'persistent' else 0
+    settings_dict['CONN_HEALTH_CHECKS'] = mode == 'persistent'
+    options = settings_dict['OPTIONS']
+    if mode == 'pool':
+        options['pool'] = {'min_size': 1, 'max_size': 4}
+    else:
+        options.pop('pool', None)
+
+
+def reset():
+    connection.close()
+    if hasattr(connection, 'close_pool'):
+        connection.close_pool()
+
+
+def make_environ(path, cookie):
+    path, _, query = path.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_COOKIE': cookie,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def serve(handler, environ):
+    statuses = []
+    response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()  # fires request_finished, which closes or keeps the connection
+    return int(statuses[0].split()[0])
+
+
+def measure(handler, path, cookie, iterations, warmup=5):
+    opened = []
+
+    def count(sender, **kwargs):
+        opened.append(1)
+
+    for _ in range(warmup):
+        serve(handler, make_environ(path, cookie))
+
+    connection_created.connect(count)
+    latencies = []
+    errors = 0
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            status = serve(handler, make_environ(path, cookie))
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += status >= 400
+    finally:
+        connection_created.disconnect(count)
+
+    return {
+        'requests': iterations,
+        'errors': errors,
+        'connections_opened': len(opened),
+        'latency_ms': {
+            'mean': round(sum(latencies) / iterations, 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+        },
+    }
+
+
+def connect_cost(samples=20):
+    """Mean milliseconds to open a new connection (including Django's init queries)."""
+    total = 0
+    for _ in range(samples):
+        connection.close()
+        start = time.perf_counter()
+        connection.ensure_connection()
+        total += time.perf_counter() - start
+    connection.close()
+    return round(total / samples * 1000, 3)
+
+
+def compare_connection_modes(user, path, iterations, modes=None):
+    """
+    Run `iterations` authenticated GETs of `path` under each mode and report
+    per-request latency, connections opened and the saving against 'fresh'.
+    """
+    modes = modes or available_modes()
+    client = Client()
+    client.force_login(user)
+    cookie = '; '.join(f'{name}={morsel.value}' for name, morsel in client.cookies.items())
+
+    settings_dict = connection.settings_dict
+    original = {key: settings_dict.get(key) for key in ['CONN_MAX_AGE', 'CONN_HEALTH_CHECKS']}
+    original_options = dict(settings_dict['OPTIONS'])
+    handler = WSGIHandler()
+    results = {}
+    try:
+        with no_throttling():
+            for mode in modes:
+                reset()
+                configure(mode, settings_dict)
+                results[mode] = measure(handler, path, cookie, iterations)
+    finally:
+        reset()
+        settings_dict.update(original)
+        settings_dict['OPTIONS'] = original_options
+
+    baseline = results.get('fresh')
+    if baseline:
+        for result in results.values():
+            result['saving_ms_per_request'] = round(
+                baseline['latency_ms']['mean'] - result['latency_ms']['mean'], 3
+            )
+    return {
+        'meta': {'database': connection.vendor, 'path': path, 'connect_ms': connect_cost()},
+        'results': results,
+    }
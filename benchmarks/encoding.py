@@ -0,0 +1,78 @@
+"""
+JSON encoding benchmark for Mayor K. Guest Palace.
+
+Renders and parses a page of real serializer output (bookings, transactions,
+events, products) with DRF's stdlib-backed JSON renderer/parser and with the
+orjson-backed ones from core.renderers / core.parsers.
+"""
+import io
+import time
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+from core.views import BookingViewSet, TransactionViewSet, SystemEventViewSet
+from inventory.views import ProductViewSet
+
+
+def page_sources():
+    """Endpoint name -> (queryset, serializer class), as the list views use them."""
+    sources = {}
+    for name, viewset in [
+        ('bookings', BookingViewSet),
+        ('transactions', TransactionViewSet),
+        ('events', SystemEventViewSet),
+        ('inventory/products', ProductViewSet),
+    ]:
+        sources[name] = (viewset.queryset, viewset.serializer_class)
+    return sources
+
+
+def build_page(queryset, serializer_class, rows):
+    """A paginated response body with `rows` results; short tables are repeated to fill it."""
+    results = list(serializer_class(queryset[:rows], many=True).data)
+    if results:
+        results = (results * (rows // len(results) + 1))[:rows]
+    return {'count': len(results), 'next': None, 'previous': None, 'results': results}
+
+
+def timed(fn, repeat):
+    """Mean milliseconds per call, best of three batches."""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        mean = (time.perf_counter() - start) / repeat * 1000
+        best = mean if best is None else min(best, mean)
+    return round(best, 3)
+
+
+def compare_encoders(rows=1000, repeat=20):
+    stock_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    stock_parser, fast_parser = JSONParser(), FastJSONParser()
+    results = {}
+    for name, (queryset, serializer_class) in page_sources().items():
+        page = build_page(queryset, serializer_class, rows)
+        if not page['results']:
+            continue
+        stock_body = stock_renderer.render(page)
+        fast_body = fast_renderer.render(page)
+
+        render_stock = timed(lambda: stock_renderer.render(page), repeat)
+        render_fast = timed(lambda: fast_renderer.render(page), repeat)
+        parse_stock = timed(lambda: stock_parser.parse(io.BytesIO(stock_body), 'application/json', {}), repeat)
+        parse_fast = timed(lambda: fast_parser.parse(io.BytesIO(stock_body), 'application/json', {}), repeat)
+        results[name] = {
+            'rows': len(page['results']),
+            'bytes': len(stock_body),
+            'identical_output': stock_body == fast_body,
+            'render_ms': {'drf': render_stock, 'fast': render_fast, 'speedup': round(render_stock / render_fast, 2)},
+            'parse_ms': {'drf': parse_stock, 'fast': parse_fast, 'speedup': round(parse_stock / parse_fast, 2)},
+        }
+    return {
+        'meta': {'orjson': orjson.__version__ if orjson else None, 'repeat': repeat},
+        'results': results,
+    }
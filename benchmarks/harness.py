@@ -0,0 +1,193 @@
+"""
+Benchmark harness for Mayor K. Guest Palace.
+
+Drives API operations through the Django test client from several threads,
+each with its own client and database connection, and reports throughput,
+latency percentiles and queries per operation.
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.models import User
+
+
+class Operation:
+    """
+    One benchmarked API call.
+    Subclasses create whatever rows they need in setup() and issue a single
+    request per call to run(). `i` is unique per call, so write operations
+    can each use their own target row.
+    """
+    name = ''
+    role = User.Role.ADMIN
+    expected_status = (200, 201)
+
+    def setup(self, iterations):
+        pass
+
+    def run(self, client, i):
+        raise NotImplementedError
+
+
+# Loggers that report failed requests (inventory.serializers logs failed orders itself)
+REQUEST_LOGGERS = ('django.request', 'inventory.serializers')
+
+
+@contextmanager
+def quiet_request_logs():
+    """Errors are counted in the report; don't also dump every traceback."""
+    loggers = [logging.getLogger(name) for name in REQUEST_LOGGERS]
+    previous = [logger.level for logger in loggers]
+    for logger in loggers:
+        logger.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        for logger, level in zip(loggers, previous):
+            logger.setLevel(level)
+
+
+def no_throttling():
+    """Disable DRF rate limits for requests served in this process."""
+    return mock.patch.object(SimpleRateThrottle, 'allow_request', lambda self, request, view: True)
+
+
+@contextmanager
+def stock_sqlite():
+    """
+    Run with Django's stock SQLite connection settings instead of the tuned
+    pragmas from config/settings.py: rollback journal, default synchronous and
+    cache, deferred transactions. Connections opened inside pick this up.
+    """
+    settings_dict = connection.settings_dict
+    tuned = settings_dict['OPTIONS']
+    connections.close_all()
+    # journal_mode persists in the database file, so switch it back explicitly
+    settings_dict['OPTIONS'] = {'init_command': 'PRAGMA journal_mode=DELETE'}
+    try:
+        yield
+    finally:
+        connections.close_all()
+        settings_dict['OPTIONS'] = tuned
+        connection.ensure_connection()  # re-applies journal_mode=WAL
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_operation(operation, user, iterations, concurrency):
+    """Run `iterations` calls of `operation` across `concurrency` threads."""
+    latencies = []
+    query_counts = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(client, indexes):
+        try:
+            for i in indexes:
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    try:
+                        response = operation.run(client, i)
+                        failed = response.status_code not in operation.expected_status and response.status_code
+                    except Exception as exc:  # surfaced in the report, not raised
+                        failed = type(exc).__name__
+                    elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    query_counts.append(len(ctx.captured_queries))
+                    if failed:
+                        errors.append(str(failed))
+        finally:
+            connections.close_all()
+
+    operation.setup(iterations)
+    slices = [range(n, iterations, concurrency) for n in range(concurrency)]
+    # Log in up front so session writes don't contend with the measured calls
+    clients = [Client() for _ in slices]
+    for client in clients:
+        client.force_login(user)
+    threads = [threading.Thread(target=worker, args=pair) for pair in zip(clients, slices)]
+
+    # Rate limiting would cap every operation at the per-user throttle
+    with no_throttling(), quiet_request_logs():
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+    return summarize(latencies, query_counts, errors, wall)
+
+
+def summarize(latencies, query_counts, errors, wall):
+    ms = [value * 1000 for value in latencies]
+    count = len(ms)
+    return {
+        'count': count,
+        'errors': len(errors),
+        'error_types': sorted(set(errors)),
+        'throughput_ops_s': round(count / wall, 2) if wall else None,
+        'latency_ms': {
+            'mean': round(sum(ms) / count, 3) if count else None,
+            'p50': round(percentile(ms, 50), 3) if count else None,
+            'p95': round(percentile(ms, 95), 3) if count else None,
+            'p99': round(percentile(ms, 99), 3) if count else None,
+            'max': round(max(ms), 3) if count else None,
+        },
+        'queries_per_op': round(sum(query_counts) / count, 2) if count else None,
+    }
+
+
+# Metrics compared against a baseline, and whether higher is better
+COMPARED_METRICS = [
+    ('throughput_ops_s', lambda r: r['throughput_ops_s'], True),
+    ('p50_ms', lambda r: r['latency_ms']['p50'], False),
+    ('p95_ms', lambda r: r['latency_ms']['p95'], False),
+    ('p99_ms', lambda r: r['latency_ms']['p99'], False),
+    ('queries_per_op', lambda r: r['queries_per_op'], False),
+]
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline report.
+    Returns {operation: {metric: {'baseline', 'current', 'change_pct', 'regressed'}}}.
+    A metric regresses when it moves the wrong way by more than `tolerance` (a fraction).
+    """
+    comparison = {}
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        metrics = {}
+        for metric, read, higher_is_better in COMPARED_METRICS:
+            old, new = read(previous), read(result)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            metrics[metric] = {
+                'baseline': old,
+                'current': new,
+                'change_pct': round(change * 100, 1),
+                'regressed': worse > tolerance,
+            }
+        comparison[name] = metrics
+    return comparison
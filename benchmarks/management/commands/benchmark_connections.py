@@ -0,0 +1,62 @@
+"""
+Django Management Command: benchmark_connections
+
+Measures what database connection setup costs per request by serving the
+same authenticated API request under each connection strategy: a fresh
+connection per request (base settings), persistent connections
+(config.settings_production) and, on PostgreSQL with psycopg[pool], the
+psycopg3 pool.
+
+Usage:
+  # Against the configured database
+  python manage.py benchmark_connections
+
+  # PostgreSQL, a heavier endpoint, more requests
+  DATABASE_URL=postgres://... python manage.py benchmark_connections --path /api/v1/dashboard/ --iterations 1000
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.connections import compare_connection_modes, available_modes, MODES
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request latency with fresh, persistent and pooled database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/users/me/',
+                            help='API path to request (default: /api/v1/users/me/)')
+        parser.add_argument('--iterations', type=int, default=300, help='Requests per mode (default: 300)')
+        parser.add_argument('--modes', nargs='+', help=f"Modes to run (default: all available of {', '.join(MODES)})")
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        modes = options['modes'] or available_modes()
+        unsupported = [mode for mode in modes if mode not in available_modes()]
+        if unsupported:
+            raise CommandError(
+                f"Mode(s) not available on this database: {', '.join(unsupported)}. "
+                f"Available: {', '.join(available_modes())}"
+            )
+
+        user, _ = User.objects.get_or_create(username='bench_admin', defaults={'role': User.Role.ADMIN})
+        report = compare_connection_modes(user, options['path'], options['iterations'], modes)
+
+        self.stderr.write(f"New connection: {report['meta']['connect_ms']} ms ({report['meta']['database']})")
+        for mode, result in report['results'].items():
+            latency = result['latency_ms']
+            self.stderr.write(
+                f"{mode:<12} mean {latency['mean']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  "
+                f"connections {result['connections_opened']:>5}  "
+                f"saving {result.get('saving_ms_per_request', 0):>6.2f} ms/request"
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
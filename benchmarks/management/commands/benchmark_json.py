@@ -0,0 +1,48 @@
+"""
+Django Management Command: benchmark_json
+
+Compares DRF's JSON renderer and parser with the orjson-backed ones used by
+the API, on a page of real serializer output per list endpoint. Run it
+against a database with data, e.g. one filled by generate_load_data.
+
+Usage:
+  python manage.py benchmark_json
+  python manage.py benchmark_json --rows 1000 --repeat 50 --output json_bench.json
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.encoding import compare_encoders
+
+
+class Command(BaseCommand):
+    help = 'Compare stdlib and orjson JSON rendering/parsing on a page of API output'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per page (default: 1000)')
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per timing batch (default: 20)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        report = compare_encoders(options['rows'], options['repeat'])
+        if report['meta']['orjson'] is None:
+            self.stderr.write(self.style.WARNING('orjson is not installed; both sides use the stdlib encoder'))
+
+        self.stderr.write(f"{'endpoint':<22}{'rows':>6}{'KB':>8}{'render drf':>12}{'fast':>8}{'x':>6}"
+                          f"{'parse drf':>11}{'fast':>8}{'x':>6}  identical")
+        for name, result in report['results'].items():
+            render, parse = result['render_ms'], result['parse_ms']
+            self.stderr.write(
+                f"{name:<22}{result['rows']:>6}{result['bytes'] / 1024:>8.0f}"
+                f"{render['drf']:>12.2f}{render['fast']:>8.2f}{render['speedup']:>6.1f}"
+                f"{parse['drf']:>11.2f}{parse['fast']:>8.2f}{parse['speedup']:>6.1f}  {result['identical_output']}"
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
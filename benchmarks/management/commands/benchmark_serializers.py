@@ -0,0 +1,44 @@
+"""
+Django Management Command: benchmark_serializers
+
+Compares ModelSerializer with the values-based list path on transactions and
+audit events, fetch included. Run it against a database with data, e.g. one
+filled by generate_load_data.
+
+Usage:
+  python manage.py benchmark_serializers
+  python manage.py benchmark_serializers --rows 1000 10000 --repeat 5 --output serializers.json
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.serialization import compare_serializers
+
+
+class Command(BaseCommand):
+    help = 'Compare ModelSerializer and values-based serialization of list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 5000],
+                            help='Row counts to serialize (default: 1000 5000)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per timing batch (default: 3)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        report = compare_serializers(options['rows'], options['repeat'])
+
+        self.stderr.write(f"{'list':<22}{'rows':>7}{'model ms':>11}{'values ms':>11}{'x':>7}  identical")
+        for name, result in report['results'].items():
+            self.stderr.write(
+                f"{name:<22}{result['rows']:>7}{result['model_serializer_ms']:>11.1f}"
+                f"{result['values_ms']:>11.1f}{result['speedup']:>7.1f}  {result['identical_output']}"
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
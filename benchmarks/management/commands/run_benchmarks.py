@@ -0,0 +1,151 @@
+"""
+Django Management Command: run_benchmarks
+
+Benchmarks the hot write paths (quick-book, check-out, POS orders,
+audit_stock, expense approval) and the dashboard endpoints through the Django
+test client, against whatever DATABASE_URL points at (SQLite or PostgreSQL).
+
+Operations create their own rows, so point it at a scratch database, ideally
+one filled by generate_load_data.
+
+Usage:
+  # All operations, 200 calls each, 4 concurrent clients
+  python manage.py run_benchmarks --concurrency 4
+
+  # Record a baseline, then compare an optimization branch against it
+  python manage.py run_benchmarks --save-baseline benchmarks/baseline.json
+  python manage.py run_benchmarks --baseline benchmarks/baseline.json --fail-on-regression
+
+  # SQLite: Django's stock connection settings vs the tuned pragmas
+  python manage.py run_benchmarks quick_book pos_order --concurrency 4 --sqlite-stock --save-baseline stock.json
+  python manage.py run_benchmarks quick_book pos_order --concurrency 4 --baseline stock.json
+
+  # Just the POS path, JSON report to a file
+  python manage.py run_benchmarks pos_order --iterations 500 --output bench_output.json
+"""
+import json
+import platform
+from contextlib import nullcontext
+from pathlib import Path
+
+import django
+from django.core import mail
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from benchmarks.harness import run_operation, compare, stock_sqlite
+from benchmarks.operations import OPERATIONS
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot API paths and report throughput, latency percentiles and queries per operation'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'operations', nargs='*',
+            help=f"Operations to run (default: all). Choices: {', '.join(OPERATIONS)}",
+        )
+        parser.add_argument('--iterations', type=int, default=200, help='Calls per operation (default: 200)')
+        parser.add_argument('--concurrency', type=int, default=1, help='Concurrent clients (default: 1)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--baseline', help='Compare against a previously saved JSON report')
+        parser.add_argument('--save-baseline', help='Also write the JSON report here for later comparison')
+        parser.add_argument('--tolerance', type=float, default=0.10,
+                            help='Allowed regression vs baseline as a fraction (default: 0.10)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit non-zero if any metric regressed beyond the tolerance')
+        parser.add_argument('--sqlite-stock', action='store_true',
+                            help="SQLite only: run with Django's stock connection settings (rollback journal, "
+                                 "deferred transactions) instead of the configured pragmas")
+
+    def handle(self, *args, **options):
+        names = options['operations'] or list(OPERATIONS)
+        unknown = [name for name in names if name not in OPERATIONS]
+        if unknown:
+            raise CommandError(f"Unknown operation(s): {', '.join(unknown)}. Choices: {', '.join(OPERATIONS)}")
+        if options['concurrency'] < 1 or options['iterations'] < 1:
+            raise CommandError('--iterations and --concurrency must be at least 1')
+        if options['sqlite_stock'] and connection.vendor != 'sqlite':
+            raise CommandError('--sqlite-stock only applies to SQLite databases')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {exc}")
+
+        # The test client needs the 'testserver' host allowed; skip when already under the test runner
+        own_environment = not hasattr(mail, 'outbox')
+        if own_environment:
+            setup_test_environment()
+        try:
+            results = {}
+            with stock_sqlite() if options['sqlite_stock'] else nullcontext():
+                for name in names:
+                    operation = OPERATIONS[name]
+                    self.stderr.write(f"Running {name} x{options['iterations']} (concurrency {options['concurrency']})...")
+                    results[name] = run_operation(
+                        operation, self.get_user(operation.role), options['iterations'], options['concurrency']
+                    )
+        finally:
+            if own_environment:
+                teardown_test_environment()
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'iterations': options['iterations'],
+                'concurrency': options['concurrency'],
+                'sqlite_stock': options['sqlite_stock'],
+            },
+            'results': results,
+        }
+        if baseline:
+            report['comparison'] = compare(results, baseline, options['tolerance'])
+
+        self.print_summary(report)
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(payload)
+        else:
+            self.stdout.write(payload)
+        if options['save_baseline']:
+            Path(options['save_baseline']).write_text(payload)
+
+        regressions = [
+            f"{name}.{metric}" for name, metrics in report.get('comparison', {}).items()
+            for metric, values in metrics.items() if values['regressed']
+        ]
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"Regressed beyond {options['tolerance']:.0%}: {', '.join(regressions)}")
+
+    def get_user(self, role):
+        user, created = User.objects.get_or_create(
+            username=f'bench_{role.lower()}',
+            defaults={'role': role, 'first_name': role.title(), 'last_name': 'Bench'}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        return user
+
+    def print_summary(self, report):
+        """Human-readable table on stderr so stdout stays pure JSON."""
+        self.stderr.write(f"\n{'operation':<24}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'errors':>8}")
+        for name, result in report['results'].items():
+            latency = result['latency_ms']
+            self.stderr.write(
+                f"{name:<24}{result['throughput_ops_s']:>9}{latency['p50']:>10}{latency['p95']:>10}"
+                f"{latency['p99']:>10}{result['queries_per_op']:>9}{result['errors']:>8}"
+            )
+        for name, metrics in report.get('comparison', {}).items():
+            for metric, values in metrics.items():
+                line = f"  {name}.{metric}: {values['baseline']} -> {values['current']} ({values['change_pct']:+}%)"
+                self.stderr.write(self.style.ERROR(line) if values['regressed'] else line)
@@ -0,0 +1,109 @@
+"""
+Django Management Command: run_scenario
+
+Simulates a full hotel day under concurrent load: walk-ins and short-rest
+turnover at the front desk, housekeeping flipping dirty rooms, bar terminals
+with an evening rush, expenses logged and approved, and stakeholders
+refreshing dashboards. Every terminal is a thread talking HTTP to the
+existing API endpoints.
+
+Reports per-endpoint latency percentiles and error rates as JSON. With the
+default in-process server it also reports, per endpoint, queries per request,
+time spent in write statements (lock waits) and lock errors.
+
+Run it against a scratch database: it creates rooms, products, users and a
+day's worth of bookings, orders and expenses.
+
+Usage:
+  # 60 second day with the default terminal mix
+  python manage.py run_scenario
+
+  # How far does one box go? Re-run with more rooms and terminals
+  python manage.py run_scenario --rooms 120 --front-desk 4 --bar 6 --stakeholders 4 --duration 120
+
+  # A fixed amount of work (200 actions per terminal) rather than a fixed time
+  python manage.py run_scenario --iterations 200
+
+  # Against gunicorn sharing the same DATABASE_URL (client-side numbers only;
+  # raise the DRF throttle rates there or terminals will see 429s)
+  python manage.py run_scenario --base-url http://127.0.0.1:8000 --output scenario.json
+"""
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.scenario import run_hotel_day, DEFAULT_ACTORS
+
+TERMINAL_FLAGS = {
+    '--front-desk': 'front_desk',
+    '--housekeeping': 'housekeeping',
+    '--bar': 'bar',
+    '--managers': 'manager',
+    '--stakeholders': 'stakeholder',
+}
+
+
+class Command(BaseCommand):
+    help = 'Simulate a full hotel day of concurrent terminals and report per-endpoint latency, lock waits and errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=60.0,
+                            help='Wall-clock seconds the simulated day lasts (default: 60)')
+        parser.add_argument('--iterations', type=int,
+                            help='Actions per terminal; the day lasts as long as they take (overrides --duration)')
+        parser.add_argument('--rooms', type=int, default=40,
+                            help='Rooms to create for the run; 0 uses only existing rooms (default: 40)')
+        parser.add_argument('--products', type=int, default=30, help='Bar products to create (default: 30)')
+        parser.add_argument('--think-ms', type=float, default=500,
+                            help="Mean pause between a terminal's actions in ms (default: 500)")
+        for flag, kind in TERMINAL_FLAGS.items():
+            parser.add_argument(flag, dest=kind, type=int, default=DEFAULT_ACTORS[kind],
+                                help=f'{kind.replace("_", " ").capitalize()} terminals (default: {DEFAULT_ACTORS[kind]})')
+        parser.add_argument('--base-url', help='Target an already running server instead of an in-process one')
+        parser.add_argument('--seed', type=int, help='Random seed for a reproducible run')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        actors = {kind: options[kind] for kind in DEFAULT_ACTORS}
+        length = (f"{options['iterations']}-action" if options['iterations'] else f"{options['duration']:g}s")
+        self.stderr.write(
+            f"Simulating a {length} hotel day with "
+            + ', '.join(f'{count} {kind}' for kind, count in actors.items())
+            + f" against {options['base_url'] or 'an in-process server'}..."
+        )
+        report = run_hotel_day(
+            rooms=options['rooms'],
+            products=options['products'],
+            actors=actors,
+            duration=options['duration'],
+            iterations=options['iterations'],
+            think_ms=options['think_ms'],
+            seed=options['seed'],
+            base_url=options['base_url'],
+        )
+
+        self.write_summary(report)
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def write_summary(self, report):
+        self.stderr.write(f"{'endpoint':<28}{'count':>7}{'err%':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+                          f"{'wait p95':>10}{'locks':>7}")
+        for name, result in report['endpoints'].items():
+            latency = result['latency_ms']
+            server = result.get('server', {})
+            self.stderr.write(
+                f"{name:<28}{result['count']:>7}{result['error_rate'] * 100:>7.1f}"
+                f"{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}"
+                f"{server.get('write_wait_ms_p95', float('nan')):>10.1f}{server.get('lock_errors', '-'):>7}"
+            )
+        totals = report['totals']
+        self.stderr.write(self.style.SUCCESS(
+            f"{totals['requests']} requests, {totals['throughput_req_s']} req/s, "
+            f"error rate {totals['error_rate']}, lock errors {totals['lock_errors']}"
+        ))
@@ -0,0 +1,185 @@
+"""
+Benchmarked hot paths: front desk, bar POS, stock, expenses and dashboards.
+
+Write operations create their own targets in setup() (rooms, checked-in
+bookings, pending expenses...) with a per-run prefix, so a run never depends
+on or collides with existing data. Run against a scratch database.
+"""
+import random
+import string
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from benchmarks.harness import Operation
+from bookings.models import RoomType, Room, Guest, Booking
+from core.models import User
+from finance.models import ExpenseCategory, Expense
+from inventory.models import Category, Product
+
+API = '/api/v1'
+
+
+def run_token():
+    return ''.join(random.SystemRandom().choices(string.ascii_uppercase + string.digits, k=3))
+
+
+def benchmark_room_type():
+    room_type, _ = RoomType.objects.get_or_create(
+        name='Benchmark',
+        defaults={
+            'base_rate_short_rest': Decimal('5000.00'),
+            'base_rate_overnight': Decimal('15000.00'),
+        }
+    )
+    return room_type
+
+
+def create_rooms(token, count, state=Room.State.AVAILABLE):
+    room_type = benchmark_room_type()
+    return Room.objects.bulk_create([
+        Room(room_number=f'B{token}{i:05d}', room_type=room_type, current_state=state)
+        for i in range(count)
+    ])
+
+
+class QuickBook(Operation):
+    name = 'quick_book'
+    role = User.Role.RECEPTIONIST
+
+    def setup(self, iterations):
+        self.token = run_token()
+        self.rooms = create_rooms(self.token, iterations)
+
+    def run(self, client, i):
+        return client.post(f'{API}/bookings/quick_book/', {
+            'guest_name': f'Bench Guest {i}',
+            'guest_phone': f'B{self.token}{i:08d}',
+            'room_id': str(self.rooms[i].pk),
+            'stay_type': Booking.StayType.OVERNIGHT,
+            'payment_method': 'CASH',
+            'amount_paid': '15000.00',
+        }, content_type='application/json')
+
+
+class CheckOut(Operation):
+    name = 'check_out'
+    role = User.Role.RECEPTIONIST
+
+    def setup(self, iterations):
+        token = run_token()
+        rooms = create_rooms(token, iterations, state=Room.State.OCCUPIED)
+        guests = Guest.objects.bulk_create([
+            Guest(guest_code=f'B{token}-{i:08d}', name=f'Bench Guest {i}', phone=f'B{token}{i:08d}')
+            for i in range(iterations)
+        ])
+        now = timezone.now()
+        self.bookings = Booking.objects.bulk_create([
+            Booking(
+                booking_ref=f'B{token}{i:08d}',
+                guest=guests[i],
+                room=rooms[i],
+                status=Booking.Status.CHECKED_IN,
+                check_in_date=now.date(),
+                check_in_time=now.time(),
+                expected_checkout=now + timedelta(days=1),
+                room_rate=Decimal('15000.00'),
+                total_amount=Decimal('15000.00'),
+                amount_paid=Decimal('15000.00'),
+            )
+            for i in range(iterations)
+        ])
+
+    def run(self, client, i):
+        return client.post(f'{API}/bookings/{self.bookings[i].pk}/check_out/')
+
+
+class PosOrder(Operation):
+    name = 'pos_order'
+    role = User.Role.BAR_STAFF
+    product_count = 20
+
+    def setup(self, iterations):
+        token = run_token()
+        category, _ = Category.objects.get_or_create(name='Benchmark')
+        self.products = Product.objects.bulk_create([
+            Product(name=f'Bench {token} {i}', category=category, price=Decimal('500.00'),
+                    quantity=iterations * 10)
+            for i in range(self.product_count)
+        ])
+
+    def run(self, client, i):
+        items = [
+            {'product_id': str(self.products[(i + n) % self.product_count].pk), 'quantity': 2}
+            for n in range(3)
+        ]
+        return client.post(f'{API}/inventory/orders/', {
+            'payment_method': 'CASH',
+            'items_data': items,
+        }, content_type='application/json')
+
+
+class AuditStock(Operation):
+    name = 'audit_stock'
+    role = User.Role.MANAGER
+    product_count = 20
+
+    def setup(self, iterations):
+        token = run_token()
+        category, _ = Category.objects.get_or_create(name='Benchmark')
+        self.products = Product.objects.bulk_create([
+            Product(name=f'Bench {token} {i}', category=category, price=Decimal('500.00'), quantity=100)
+            for i in range(self.product_count)
+        ])
+
+    def run(self, client, i):
+        product = self.products[i % self.product_count]
+        # Alternate so every call is a real change
+        return client.post(f'{API}/inventory/products/{product.pk}/audit_stock/', {
+            'new_quantity': 100 + (i % 2) + 1,
+            'reason': 'Benchmark audit',
+        }, content_type='application/json')
+
+
+class ExpenseApproval(Operation):
+    name = 'expense_approval'
+    role = User.Role.MANAGER
+
+    def setup(self, iterations):
+        token = run_token()
+        category, _ = ExpenseCategory.objects.get_or_create(name='Benchmark')
+        self.expenses = Expense.objects.bulk_create([
+            Expense(expense_ref=f'B{token}{i:08d}', category=category, description='Benchmark expense',
+                    amount=Decimal('15000.00'), expense_date=timezone.now().date())
+            for i in range(iterations)
+        ])
+
+    def run(self, client, i):
+        return client.post(f'{API}/expenses/{self.expenses[i].pk}/approve/')
+
+
+class Get(Operation):
+    """Read-only endpoint hit repeatedly."""
+
+    def __init__(self, name, url, role=User.Role.ADMIN):
+        self.name = name
+        self.url = url
+        self.role = role
+
+    def run(self, client, i):
+        return client.get(self.url)
+
+
+OPERATIONS = {
+    operation.name: operation for operation in [
+        QuickBook(),
+        CheckOut(),
+        PosOrder(),
+        AuditStock(),
+        ExpenseApproval(),
+        Get('dashboard', f'{API}/dashboard/', User.Role.MANAGER),
+        Get('stakeholder_dashboard', f'{API}/dashboard/stakeholder/', User.Role.STAKEHOLDER),
+        Get('analytics', f'{API}/analytics/rooms/', User.Role.ADMIN),
+    ]
+}
@@ -0,0 +1,503 @@
+"""
+Full hotel day load scenario for Mayor K. Guest Palace.
+
+Replays a compressed day against a running server over real HTTP: front desk
+terminals booking walk-ins and turning over short rests, housekeeping flipping
+dirty rooms, bar terminals with an evening rush, expenses being logged and
+approved, and stakeholders refreshing dashboards. Each terminal is a thread
+with its own user and session.
+
+By default the server runs in-process (Django's threaded WSGI server), which
+also lets us instrument the database side: queries, time spent in write
+statements (where SQLite busy waits and PostgreSQL row locks land) and lock
+errors, per endpoint. Against an external server (e.g. gunicorn) only the
+client-side numbers are available.
+"""
+import heapq
+import json
+import random
+import secrets
+import string
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections, OperationalError
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+from benchmarks.harness import percentile, no_throttling, quiet_request_logs
+from benchmarks.operations import run_token, create_rooms
+from bookings.models import Room
+from core.models import User
+from finance.models import ExpenseCategory
+from inventory.models import Category, Product
+
+API = '/api/v1'
+ENDPOINT_HEADER = 'X-Scenario-Endpoint'
+
+# Substrings of database errors caused by lock contention (SQLite and PostgreSQL)
+LOCK_ERROR_MARKERS = ('locked', 'deadlock', 'lock timeout', 'could not obtain lock', 'could not serialize')
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'BEGIN')
+
+# Share of the day when the bar rush happens, and how much faster terminals go then
+BAR_RUSH = (0.65, 0.9)
+RUSH_SPEEDUP = 5
+
+# Stay lengths as fractions of the simulated day
+SHORT_REST_STAY = (0.03, 0.08)
+OVERNIGHT_STAY = (0.3, 0.9)
+
+DEFAULT_ACTORS = {
+    'front_desk': 2,
+    'housekeeping': 1,
+    'bar': 2,
+    'manager': 1,
+    'stakeholder': 2,
+}
+
+ACTOR_ROLES = {
+    'front_desk': User.Role.RECEPTIONIST,
+    'housekeeping': User.Role.RECEPTIONIST,
+    'bar': User.Role.BAR_STAFF,
+    'manager': User.Role.MANAGER,
+    'stakeholder': User.Role.STAKEHOLDER,
+}
+
+
+class Recorder:
+    """Thread-safe per-endpoint collector for client and server measurements."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.client = {}
+        self.server = {}
+
+    def record_request(self, endpoint, elapsed, status):
+        with self.lock:
+            entry = self.client.setdefault(endpoint, {'latencies': [], 'statuses': {}})
+            entry['latencies'].append(elapsed)
+            entry['statuses'][str(status)] = entry['statuses'].get(str(status), 0) + 1
+
+    def record_server(self, endpoint, stats):
+        with self.lock:
+            entry = self.server.setdefault(endpoint, {'queries': [], 'db': [], 'write': [], 'lock_errors': 0})
+            entry['queries'].append(stats['queries'])
+            entry['db'].append(stats['db'])
+            entry['write'].append(stats['write'])
+            entry['lock_errors'] += stats['lock_errors']
+
+    def report(self, wall):
+        endpoints = {}
+        totals = {'requests': 0, 'errors': 0, 'lock_errors': 0}
+        for endpoint in sorted(self.client):
+            entry = self.client[endpoint]
+            ms = [value * 1000 for value in entry['latencies']]
+            count = len(ms)
+            errors = sum(n for status, n in entry['statuses'].items() if not status.startswith('2'))
+            result = {
+                'count': count,
+                'errors': errors,
+                'error_rate': round(errors / count, 4),
+                'statuses': entry['statuses'],
+                'latency_ms': {
+                    'p50': round(percentile(ms, 50), 3),
+                    'p95': round(percentile(ms, 95), 3),
+                    'p99': round(percentile(ms, 99), 3),
+                    'max': round(max(ms), 3),
+                },
+            }
+            server = self.server.get(endpoint)
+            if server:
+                write_ms = [value * 1000 for value in server['write']]
+                result['server'] = {
+                    'queries_per_request': round(sum(server['queries']) / len(server['queries']), 2),
+                    'db_ms_p95': round(percentile([value * 1000 for value in server['db']], 95), 3),
+                    'write_wait_ms_p95': round(percentile(write_ms, 95), 3),
+                    'write_wait_ms_total': round(sum(write_ms), 3),
+                    'lock_errors': server['lock_errors'],
+                    'lock_error_rate': round(server['lock_errors'] / len(server['queries']), 4),
+                }
+                totals['lock_errors'] += server['lock_errors']
+            endpoints[endpoint] = result
+            totals['requests'] += count
+            totals['errors'] += errors
+
+        requests = totals['requests']
+        return {
+            'totals': {
+                **totals,
+                'throughput_req_s': round(requests / wall, 2) if wall else None,
+                'error_rate': round(totals['errors'] / requests, 4) if requests else None,
+            },
+            'endpoints': endpoints,
+        }
+
+
+class DatabaseProbe:
+    """
+    Server-side instrumentation for the in-process server.
+    Wraps the WSGI app to tag each request with its scenario endpoint and
+    installs an execute wrapper on every new connection to time statements.
+    """
+
+    def __init__(self, app, recorder):
+        self.app = app
+        self.recorder = recorder
+        self.local = threading.local()
+
+    def __call__(self, environ, start_response):
+        stats = {'queries': 0, 'db': 0.0, 'write': 0.0, 'lock_errors': 0}
+        self.local.stats = stats
+        try:
+            return self.app(environ, start_response)
+        finally:
+            self.local.stats = None
+            endpoint = environ.get('HTTP_' + ENDPOINT_HEADER.upper().replace('-', '_'))
+            if endpoint:
+                self.recorder.record_server(endpoint, stats)
+
+    def execute(self, execute, sql, params, many, context):
+        stats = getattr(self.local, 'stats', None)
+        if stats is None:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as exc:
+            if any(marker in str(exc).lower() for marker in LOCK_ERROR_MARKERS):
+                stats['lock_errors'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats['queries'] += 1
+            stats['db'] += elapsed
+            if sql.lstrip().upper().startswith(WRITE_PREFIXES):
+                stats['write'] += elapsed
+
+    def on_connection_created(self, sender, connection, **kwargs):
+        if self.execute not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self.execute)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServer:
+    """Threaded WSGI server on a free local port, instrumented with a DatabaseProbe."""
+
+    def __init__(self, recorder):
+        self.probe = DatabaseProbe(get_wsgi_application(), recorder)
+        self.httpd = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+        self.httpd.set_app(self.probe)
+        self.base_url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        connection_created.connect(self.probe.on_connection_created)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        connection_created.disconnect(self.probe.on_connection_created)
+
+
+class Terminal:
+    """An HTTP session for one user, authenticated with a server-side session."""
+
+    def __init__(self, base_url, user, recorder):
+        self.base_url = base_url
+        self.recorder = recorder
+        client = Client()
+        client.force_login(user)
+        session = client.cookies[settings.SESSION_COOKIE_NAME].value
+        csrf = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
+        self.headers = {
+            'Cookie': f'{settings.SESSION_COOKIE_NAME}={session}; {settings.CSRF_COOKIE_NAME}={csrf}',
+            'X-CSRFToken': csrf,
+            'Content-Type': 'application/json',
+        }
+
+    def request(self, endpoint, method, path, data=None):
+        """Issue a request; returns the decoded JSON body on 2xx, otherwise None."""
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method=method,
+            headers={**self.headers, ENDPOINT_HEADER: endpoint},
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                status, payload = response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            status, payload = exc.code, None
+            exc.close()
+        except OSError as exc:
+            status, payload = type(exc).__name__, None
+        self.recorder.record_request(endpoint, time.perf_counter() - start, status)
+        return json.loads(payload) if payload else None
+
+    def get(self, endpoint, path):
+        return self.request(endpoint, 'GET', path)
+
+    def post(self, endpoint, path, data=None):
+        return self.request(endpoint, 'POST', path, data if data is not None else {})
+
+
+class Departures:
+    """Shared schedule of checked-in bookings and when they are due to leave."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.heap = []
+
+    def add(self, due, booking_id):
+        with self.lock:
+            heapq.heappush(self.heap, (due, booking_id))
+
+    def pop_due(self, now):
+        with self.lock:
+            if self.heap and self.heap[0][0] <= now:
+                return heapq.heappop(self.heap)[1]
+        return None
+
+
+class HotelDay:
+    """
+    Runs the actors for `duration` seconds of wall time, which stands in for
+    one trading day. `think_ms` is the mean pause between a terminal's actions.
+    With `iterations`, each terminal instead takes exactly that many actions
+    and its own progress through them is the time of day, so a run does the
+    same amount of work however fast the box is.
+    """
+
+    def __init__(self, base_url, recorder, actors, products, expense_category, duration, think_ms, seed,
+                 iterations=None):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.actors = actors
+        self.products = [str(product.pk) for product in products]
+        self.expense_category = str(expense_category.pk)
+        self.duration = duration
+        self.iterations = iterations
+        self.local = threading.local()
+        self.think = think_ms / 1000
+        self.seed = seed
+        self.token = run_token()
+        self.departures = Departures()
+        self.sequence = iter(range(10 ** 9))
+        self.sequence_lock = threading.Lock()
+        self.start = None
+
+    # ---- clock ----
+
+    def phase(self):
+        """Fraction of the day elapsed, 0..1."""
+        if self.iterations:
+            return self.local.actions / self.iterations
+        return (time.perf_counter() - self.start) / self.duration
+
+    def running(self):
+        """Whether the terminal takes another action (counting it, with `iterations`)."""
+        if self.iterations:
+            if self.local.actions >= self.iterations:
+                return False
+            self.local.actions += 1
+            return True
+        return self.phase() < 1
+
+    def pause(self, rng, speedup=1):
+        time.sleep(rng.expovariate(speedup / self.think) if self.think else 0)
+
+    def next_number(self):
+        with self.sequence_lock:
+            return next(self.sequence)
+
+    # ---- actors ----
+
+    def front_desk(self, terminal, rng):
+        while self.running():
+            booking_id = self.departures.pop_due(self.phase())
+            if booking_id:
+                terminal.post('bookings/check_out', f'{API}/bookings/{booking_id}/check_out/')
+            elif rng.random() < 0.15:
+                terminal.get('bookings/today', f'{API}/bookings/today/')
+            elif rng.random() < 0.1:
+                self.log_expense(terminal, rng)
+            else:
+                self.walk_in(terminal, rng)
+            self.pause(rng)
+
+    def walk_in(self, terminal, rng):
+        rooms = terminal.get('rooms/available', f'{API}/rooms/available/')
+        if not rooms:
+            return
+        room = rng.choice(rooms)
+        short_rest = rng.random() < 0.4
+        number = self.next_number()
+        booking = terminal.post('bookings/quick_book', f'{API}/bookings/quick_book/', {
+            'guest_name': f'Scenario Guest {number}',
+            'guest_phone': f'S{self.token}{number:08d}',
+            'room_id': room['id'],
+            'stay_type': 'SHORT_REST' if short_rest else 'OVERNIGHT',
+            'payment_method': rng.choice(['CASH', 'TRANSFER', 'POS']),
+            'amount_paid': '5000.00' if short_rest else '15000.00',
+        })
+        if booking:
+            low, high = SHORT_REST_STAY if short_rest else OVERNIGHT_STAY
+            self.departures.add(self.phase() + rng.uniform(low, high), booking['id'])
+
+    def log_expense(self, terminal, rng):
+        terminal.post('expenses/create', f'{API}/expenses/', {
+            'category': self.expense_category,
+            'description': 'Scenario expense',
+            'amount': str(Decimal(rng.randrange(2000, 90000, 500))),
+            'expense_date': date.today().isoformat(),
+        })
+
+    def housekeeping(self, terminal, rng):
+        while self.running():
+            page = terminal.get('rooms/dirty', f'{API}/rooms/?current_state=DIRTY')
+            if page and page['results']:
+                room = rng.choice(page['results'])
+                terminal.post('rooms/mark_clean', f'{API}/rooms/{room["id"]}/mark_clean/')
+            self.pause(rng)
+
+    def bar(self, terminal, rng):
+        while self.running():
+            rush = BAR_RUSH[0] <= self.phase() < BAR_RUSH[1]
+            items = [
+                {'product_id': product, 'quantity': rng.randint(1, 3)}
+                for product in rng.sample(self.products, k=min(len(self.products), rng.randint(1, 4)))
+            ]
+            order = {'payment_method': rng.choice(['CASH', 'CASH', 'POS', 'TRANSFER']), 'items_data': items}
+            if rng.random() < 0.2:
+                guests = terminal.get('inventory/active-bookings', f'{API}/inventory/active-bookings/')
+                if guests and guests['results']:
+                    order.update(payment_method='ROOM_CHARGE', booking=rng.choice(guests['results'])['id'])
+            terminal.post('inventory/orders/create', f'{API}/inventory/orders/', order)
+            self.pause(rng, RUSH_SPEEDUP if rush else 1)
+
+    def manager(self, terminal, rng):
+        while self.running():
+            roll = rng.random()
+            if roll < 0.4:
+                terminal.get('dashboard', f'{API}/dashboard/')
+            elif roll < 0.5:
+                terminal.get('analytics/rooms', f'{API}/analytics/rooms/')
+            else:
+                page = terminal.get('expenses/pending', f'{API}/expenses/?status=PENDING')
+                if page and page['results']:
+                    expense = rng.choice(page['results'])
+                    terminal.post('expenses/approve', f'{API}/expenses/{expense["id"]}/approve/')
+            self.pause(rng)
+
+    def stakeholder(self, terminal, rng):
+        while self.running():
+            if rng.random() < 0.7:
+                terminal.get('dashboard/stakeholder', f'{API}/dashboard/stakeholder/')
+            else:
+                terminal.get('transactions', f'{API}/transactions/')
+            self.pause(rng)
+
+    # ---- run ----
+
+    def run(self, users):
+        """`users` maps actor kind to one user per terminal. Returns wall-clock seconds."""
+        threads = []
+        for kind, kind_users in users.items():
+            for n, user in enumerate(kind_users):
+                terminal = Terminal(self.base_url, user, self.recorder)
+                rng = random.Random(f'{self.seed}-{kind}-{n}')
+                threads.append(threading.Thread(target=self.actor, args=(getattr(self, kind), terminal, rng)))
+
+        self.start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - self.start
+
+    def actor(self, behaviour, terminal, rng):
+        self.local.actions = 0
+        try:
+            behaviour(terminal, rng)
+        finally:
+            connections.close_all()
+
+
+def prepare(rooms, products, actors):
+    """Create scenario rooms, stock, an expense category and one user per terminal."""
+    token = run_token()
+    if rooms:
+        create_rooms(token, rooms)
+    category, _ = Category.objects.get_or_create(name='Benchmark')
+    stock = Product.objects.bulk_create([
+        Product(name=f'Scenario {token} {i}', category=category, price=Decimal('800.00'), quantity=10 ** 6)
+        for i in range(products)
+    ])
+    expense_category, _ = ExpenseCategory.objects.get_or_create(name='Benchmark')
+
+    password = make_password(None)
+    users = {}
+    for kind, count in actors.items():
+        users[kind] = []
+        for n in range(count):
+            user, _ = User.objects.get_or_create(
+                username=f'scenario_{kind}_{n}',
+                defaults={'role': ACTOR_ROLES[kind], 'password': password},
+            )
+            users[kind].append(user)
+    return users, stock, expense_category
+
+
+def run_hotel_day(rooms=40, products=30, actors=None, duration=60.0, think_ms=500, seed=None, base_url=None,
+                  iterations=None):
+    """
+    Prepare data, run the day and return the report dict.
+    With no `base_url`, an instrumented in-process server is started; with
+    `iterations`, every terminal takes that many actions instead of running
+    for `duration` seconds.
+    """
+    actors = {**DEFAULT_ACTORS, **(actors or {})}
+    users, stock, expense_category = prepare(rooms, products, actors)
+    recorder = Recorder()
+    seed = seed if seed is not None else random.randrange(10 ** 6)
+
+    def day(url):
+        return HotelDay(url, recorder, actors, stock, expense_category, duration, think_ms, seed,
+                        iterations).run(users)
+
+    if base_url:
+        wall = day(base_url.rstrip('/'))
+    else:
+        # In-process rate limits would cap every terminal at the per-user throttle
+        with no_throttling():
+            with LocalServer(recorder) as server, quiet_request_logs():
+                wall = day(server.base_url)
+
+    report = recorder.report(wall)
+    report['meta'] = {
+        'server': base_url or 'in-process',
+        'duration_s': round(wall, 2),
+        'iterations': iterations,
+        'think_ms': think_ms,
+        'seed': seed,
+        'rooms_created': rooms,
+        'active_rooms': Room.objects.filter(is_active=True).count(),
+        'terminals': actors,
+        'database': connections['default'].vendor,
+    }
+    return report
+
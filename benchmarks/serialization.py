@@ -0,0 +1,50 @@
+"""
+List serialization benchmark for Mayor K. Guest Palace.
+
+Serializes the same rows of the high-volume list endpoints (transactions,
+audit events) through their ModelSerializer and through the values-based
+path the list views use (core.serializers.ValuesSerializer), database fetch
+included, and checks the rendered JSON is identical.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.encoding import timed
+from core.serializers import ValuesSerializer
+from core.views import TransactionViewSet, SystemEventViewSet
+
+
+def list_sources():
+    """Endpoint name -> (queryset, serializer class), as the list views use them."""
+    return {
+        'transactions': (TransactionViewSet.queryset, TransactionViewSet.serializer_class),
+        'events': (SystemEventViewSet.queryset, SystemEventViewSet.serializer_class),
+    }
+
+
+def compare_serializers(rows=(1000, 5000), repeat=3):
+    renderer = JSONRenderer()
+    results = {}
+    for name, (queryset, serializer_class) in list_sources().items():
+        fast = ValuesSerializer(serializer_class())
+        for count in rows:
+            page = queryset.all()[:count]
+
+            def model_path():
+                return serializer_class(page.all(), many=True).data
+
+            def values_path():
+                return fast.represent(fast.rows(page.all()))
+
+            model_data, values_data = model_path(), values_path()
+            if not model_data:
+                continue
+            model_ms = timed(model_path, repeat)
+            values_ms = timed(values_path, repeat)
+            results[f'{name}[{count}]'] = {
+                'rows': len(model_data),
+                'identical_output': renderer.render(model_data) == renderer.render(values_data),
+                'model_serializer_ms': model_ms,
+                'values_ms': values_ms,
+                'speedup': round(model_ms / values_ms, 2),
+            }
+    return {'meta': {'repeat': repeat}, 'results': results}
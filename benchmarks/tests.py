@@ -0,0 +1,119 @@
+"""
+Tests for the benchmark harness.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from benchmarks.connections import compare_connection_modes
+from benchmarks.encoding import compare_encoders
+from benchmarks.harness import percentile, compare, quiet_request_logs
+from benchmarks.scenario import run_hotel_day
+from benchmarks.serialization import compare_serializers
+from core.models import User, SystemEvent
+
+
+class HarnessMathTests(SimpleTestCase):
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        def result(ops, p50, queries):
+            return {'throughput_ops_s': ops, 'queries_per_op': queries,
+                    'latency_ms': {'p50': p50, 'p95': p50, 'p99': p50}}
+
+        baseline = {'results': {'quick_book': result(100, 10, 20)}}
+        comparison = compare({'quick_book': result(95, 15, 20)}, baseline, tolerance=0.10)['quick_book']
+        self.assertFalse(comparison['throughput_ops_s']['regressed'])  # -5%
+        self.assertTrue(comparison['p50_ms']['regressed'])  # +50%
+        self.assertEqual(comparison['queries_per_op']['change_pct'], 0)
+
+
+class RunBenchmarksCommandTests(TransactionTestCase):
+
+    def test_reports_json_and_compares_to_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline_path = os.path.join(tmp, 'baseline.json')
+            call_command('run_benchmarks', 'audit_stock', 'dashboard', iterations=4, concurrency=2,
+                         save_baseline=baseline_path, stdout=StringIO(), stderr=StringIO())
+            output = StringIO()
+            call_command('run_benchmarks', 'audit_stock', 'dashboard', iterations=4, concurrency=2,
+                         baseline=baseline_path, tolerance=100, fail_on_regression=True,
+                         stdout=output, stderr=StringIO())
+
+        report = json.loads(output.getvalue())
+        for name in ['audit_stock', 'dashboard']:
+            result = report['results'][name]
+            self.assertEqual(result['count'], 4)
+            self.assertEqual(result['errors'], 0)
+            self.assertGreater(result['queries_per_op'], 0)
+            self.assertIn('p99', result['latency_ms'])
+        self.assertIn('p95_ms', report['comparison']['dashboard'])
+
+
+class HotelDayScenarioTests(TransactionTestCase):
+
+    def test_reports_client_and_server_metrics_per_endpoint(self):
+        actors = {'front_desk': 1, 'housekeeping': 1, 'bar': 1, 'manager': 1, 'stakeholder': 1}
+        with quiet_request_logs():
+            report = run_hotel_day(rooms=5, products=3, actors=actors, iterations=12, think_ms=0, seed=3)
+
+        self.assertEqual(report['meta']['terminals'], actors)
+        self.assertEqual(report['meta']['iterations'], 12)
+        for endpoint in ['bookings/quick_book', 'inventory/orders/create', 'dashboard/stakeholder']:
+            result = report['endpoints'][endpoint]
+            self.assertGreater(result['count'], 0)
+            self.assertIn('p95', result['latency_ms'])
+            self.assertGreater(result['server']['queries_per_request'], 0)
+        self.assertEqual(report['totals']['lock_errors'], 0)
+        self.assertEqual(report['totals']['errors'], 0)
+
+
+class ConnectionBenchmarkTests(TransactionTestCase):
+
+    def test_reports_each_mode_against_fresh_connections(self):
+        user = User.objects.create(username='bench_admin', role=User.Role.ADMIN)
+        report = compare_connection_modes(user, '/api/v1/users/me/', iterations=5, modes=['fresh', 'persistent'])
+
+        self.assertEqual(list(report['results']), ['fresh', 'persistent'])
+        for result in report['results'].values():
+            self.assertEqual(result['requests'], 5)
+            self.assertEqual(result['errors'], 0)
+            self.assertIn('saving_ms_per_request', result)
+        self.assertEqual(report['results']['fresh']['saving_ms_per_request'], 0)
+
+
+class JSONBenchmarkTests(TransactionTestCase):
+
+    def test_fast_encoders_match_drf_output(self):
+        user = User.objects.create(username='bench_admin', role=User.Role.ADMIN)
+        SystemEvent.log('LOGIN', SystemEvent.EventCategory.SECURITY, actor=user, payload={'amount': 1})
+        report = compare_encoders(rows=10, repeat=1)
+
+        result = report['results']['events']
+        self.assertEqual(result['rows'], 10)
+        self.assertTrue(result['identical_output'])
+        self.assertIn('speedup', result['render_ms'])
+
+
+class SerializerBenchmarkTests(TransactionTestCase):
+
+    def test_values_path_matches_model_serializer(self):
+        user = User.objects.create(username='bench_admin', role=User.Role.ADMIN)
+        SystemEvent.log('LOGIN', SystemEvent.EventCategory.SECURITY, actor=user)
+        SystemEvent.log('SYSTEM_TICK', SystemEvent.EventCategory.SYSTEM)
+        report = compare_serializers(rows=[10], repeat=1)
+
+        result = report['results']['events[10]']
+        self.assertEqual(result['rows'], 2)
+        self.assertTrue(result['identical_output'])
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:32
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+
+LEDGER_COLUMNS = {'PAYMENT': 'payments', 'REFUND': 'refunds', 'CORRECTION': 'corrections'}
+
+
+def open_folios(apps, schema_editor):
+    """Build the folio of every existing booking from its source rows (Folio.rebuild, frozen)."""
+    Booking = apps.get_model('bookings', 'Booking')
+    BookingExtension = apps.get_model('bookings', 'BookingExtension')
+    Folio = apps.get_model('bookings', 'Folio')
+    Order = apps.get_model('inventory', 'Order')
+    Transaction = apps.get_model('finance', 'Transaction')
+
+    def totals(queryset, column):
+        return dict(queryset.values('booking_id').annotate(total=Sum(column)).values_list('booking_id', 'total'))
+
+    bookings = Booking.objects.order_by('pk').values_list('pk', 'total_amount', 'discount_amount')
+    last = None
+    while True:
+        rows = list((bookings.filter(pk__gt=last) if last else bookings)[:500])
+        if not rows:
+            return
+        last = rows[-1][0]
+        ids = [row[0] for row in rows]
+        extensions = totals(BookingExtension.objects.filter(booking_id__in=ids), 'additional_amount')
+        bar = totals(Order.objects.filter(booking_id__in=ids), 'total_amount')
+        ledger = {}
+        for entry in Transaction.objects.filter(
+            booking_id__in=ids, status='CONFIRMED', transaction_type__in=list(LEDGER_COLUMNS),
+        ).values('booking_id', 'transaction_type').annotate(total=Sum('amount')):
+            ledger.setdefault(entry['booking_id'], {})[LEDGER_COLUMNS[entry['transaction_type']]] = entry['total']
+
+        folios = []
+        for booking_id, total_amount, discount in rows:
+            paid = ledger.get(booking_id, {})
+            folio = Folio(
+                booking_id=booking_id,
+                room_charges=total_amount - (extensions.get(booking_id) or 0),
+                extension_charges=extensions.get(booking_id) or 0,
+                bar_charges=bar.get(booking_id) or 0,
+                discount=discount,
+                **paid,
+            )
+            folio.balance = (
+                total_amount + folio.bar_charges - discount
+                - (paid.get('payments') or 0) + (paid.get('refunds') or 0) - (paid.get('corrections') or 0)
+            )
+            folios.append(folio)
+        Folio.objects.bulk_create(folios)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_snapshot_watermark_indexes'),
+        ('finance', '0003_transactions_immutable'),
+        ('inventory', '0003_snapshot_watermark_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Folio',
+            fields=[
+                ('booking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='folio', serialize=False, to='bookings.booking')),
+                ('room_charges', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('extension_charges', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('bar_charges', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('discount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('payments', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('refunds', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('corrections', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'booking_folios',
+                'indexes': [models.Index(condition=models.Q(('balance__gt', 0)), fields=['-balance'], name='folio_outstanding_idx')],
+            },
+        ),
+        migrations.RunPython(open_folios, migrations.RunPython.noop),
+    ]
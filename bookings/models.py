@@ -1,10 +1,11 @@
 """
 Booking models for Mayor K. Guest Palace Hotel Management System.
-Contains: RoomType, Room, Guest, Booking, BookingExtension, RoomStateTransition.
+Contains: RoomType, Room, Guest, Booking, BookingExtension, Folio, RoomStateTransition.
 """
 import uuid
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
 from django.utils import timezone
 from core.models import User
 
@@ -193,7 +194,8 @@ class Guest(models.Model):
     def save(self, *args, **kwargs):
         if not self.guest_code:
             # Generate ID: GST-0001
-            last_guest = Guest.objects.all().order_by('created_at').last()
+            # Only GST- codes count; imported/synthetic guests use other prefixes
+            last_guest = Guest.objects.filter(guest_code__startswith='GST-').order_by('created_at').last()
             if last_guest and last_guest.guest_code:
                 try:
                     last_id = int(last_guest.guest_code.split('-')[1])
@@ -286,7 +288,7 @@ class Booking(models.Model):
     )
     
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # snapshot watermark
     
     class Meta:
         db_table = 'bookings'
@@ -305,12 +307,21 @@ class Booking(models.Model):
         # TODO: Add logic for extension charges if separate
         return self.total_amount
 
+    @property
+    def loaded_folio(self):
+        """The folio if it was fetched with this booking (select_related), else None."""
+        if Booking.folio.is_cached(self):
+            return getattr(self, 'folio', None)
+        return None
+
     @property
     def total_bar_charges(self):
         """Sum of all bar orders linked to this booking"""
         # Sum all related orders
         # Note: Importing Order here might cause circular import if not careful, 
         # but since Order depends on Booking via ForeignKey, we can access via related_name
+        if self.loaded_folio:
+            return self.loaded_folio.bar_charges
         bar_total = self.bar_orders.aggregate(total=models.Sum('total_amount'))['total']
         return bar_total or Decimal('0.00')
 
@@ -322,6 +333,8 @@ class Booking(models.Model):
     @property
     def balance_due(self):
         """Total to pay"""
+        if self.loaded_folio:
+            return self.loaded_folio.balance
         return self.grand_total - self.amount_paid - self.discount_amount
 
     @property
@@ -338,7 +351,14 @@ class Booking(models.Model):
     def save(self, *args, **kwargs):
         if not self.booking_ref:
             self.booking_ref = self._generate_booking_ref()
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Folio.open(self)
+            elif update_fields is None or {'total_amount', 'discount_amount'} & set(update_fields):
+                Folio.sync_charges(self)
     
     def _generate_booking_ref(self):
         """Generate unique booking reference: MK-YYMMDD-XXXX"""
@@ -437,3 +457,181 @@ class BookingExtension(models.Model):
     
     def __str__(self):
         return f"Extension for {self.booking.booking_ref}"
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Folio.post(self.booking_id, extension_charges=self.additional_amount)
+
+
+class Folio(models.Model):
+    """
+    Running account of a booking, one row per booking.
+
+    Every posting (ledger entry, extension, bar order, change of the booked
+    charges) adjusts its columns and the stored balance with a single UPDATE,
+    so reading a balance is one primary-key fetch and outstanding balances
+    are a scan of a partial index. Folio.rebuild() recomputes rows from the
+    source tables; a posting that finds no row rebuilds that booking's.
+    """
+    booking = models.OneToOneField(Booking, on_delete=models.CASCADE, primary_key=True, related_name='folio')
+
+    room_charges = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    extension_charges = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    bar_charges = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    discount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    payments = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    refunds = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    corrections = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # How each column moves the balance
+    SIGNS = {
+        'room_charges': 1, 'extension_charges': 1, 'bar_charges': 1, 'refunds': 1,
+        'discount': -1, 'payments': -1, 'corrections': -1,
+    }
+    # Confirmed ledger entry type -> column
+    LEDGER_COLUMNS = {'PAYMENT': 'payments', 'REFUND': 'refunds', 'CORRECTION': 'corrections'}
+    # Bookings per UPDATE / rebuild chunk
+    BATCH_SIZE = 250
+
+    class Meta:
+        db_table = 'booking_folios'
+        indexes = [
+            models.Index(fields=['-balance'], name='folio_outstanding_idx', condition=Q(balance__gt=0)),
+        ]
+
+    def __str__(self):
+        return f"Folio {self.booking_id}: {self.balance}"
+
+    @property
+    def paid(self):
+        """Net money received; matches Booking.amount_paid."""
+        return self.payments - self.refunds + self.corrections
+
+    @classmethod
+    def open(cls, booking):
+        """Create the folio of a new booking (ledger entries post to it later)."""
+        return cls.objects.create(
+            booking_id=booking.pk,
+            room_charges=booking.total_amount,
+            discount=booking.discount_amount,
+            balance=booking.total_amount - booking.discount_amount,
+        )
+
+    @classmethod
+    def sync_charges(cls, booking):
+        """Re-read the booked charges (total_amount includes extensions) and discount from the booking."""
+        total = Value(booking.total_amount)
+        discount = Value(booking.discount_amount)
+        updated = cls.objects.filter(booking_id=booking.pk).update(
+            room_charges=total - F('extension_charges'),
+            discount=discount,
+            balance=total + F('bar_charges') - discount - F('payments') + F('refunds') - F('corrections'),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.rebuild([booking.pk])
+
+    @classmethod
+    def post(cls, booking_id, **changes):
+        """Add {column: amount} to one booking's folio."""
+        if booking_id:
+            cls.post_many({booking_id: changes})
+
+    @classmethod
+    def post_many(cls, changes):
+        """
+        Add {booking_id: {column: amount}} to many folios, one UPDATE per
+        BATCH_SIZE bookings with a CASE per column.
+        """
+        changes = [
+            (booking_id, {column: amount for column, amount in columns.items() if amount})
+            for booking_id, columns in changes.items()
+        ]
+        changes = [(booking_id, columns) for booking_id, columns in changes if columns]
+        now = timezone.now()
+        for start in range(0, len(changes), cls.BATCH_SIZE):
+            chunk = changes[start:start + cls.BATCH_SIZE]
+            for columns in (c for _, c in chunk):
+                columns['balance'] = sum(cls.SIGNS[column] * amount for column, amount in columns.items())
+            updates = {'updated_at': now}
+            for column in {column for _, columns in chunk for column in columns}:
+                if len(chunk) == 1:
+                    updates[column] = F(column) + chunk[0][1][column]
+                else:
+                    updates[column] = F(column) + Case(
+                        *[When(pk=booking_id, then=Value(columns[column]))
+                          for booking_id, columns in chunk if column in columns],
+                        default=Value(Decimal('0.00')),
+                        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+                    )
+            booking_ids = [booking_id for booking_id, _ in chunk]
+            updated = cls.objects.filter(pk__in=booking_ids).update(**updates)
+            if updated < len(chunk):
+                # Postings follow their source row, so a rebuild already includes this one
+                present = set(cls.objects.filter(pk__in=booking_ids).values_list('pk', flat=True))
+                cls.rebuild([booking_id for booking_id in booking_ids if booking_id not in present])
+
+    @classmethod
+    def rebuild(cls, bookings=None):
+        """
+        Recompute folios from bookings, extensions, bar orders and the
+        confirmed ledger, for every booking or for `bookings` (a Booking
+        queryset or booking ids). Three GROUP BY queries per BATCH_SIZE
+        bookings. Returns the number of rows written.
+        """
+        if bookings is None:
+            bookings = Booking.objects.all()
+        elif not isinstance(bookings, models.QuerySet):
+            bookings = Booking.objects.filter(pk__in=list(bookings))
+        bookings = bookings.order_by('pk')
+        Order = Booking._meta.get_field('bar_orders').related_model
+        Transaction = Booking._meta.get_field('transactions').related_model
+
+        written = 0
+        last = None
+        while True:
+            page = bookings.filter(pk__gt=last) if last else bookings
+            rows = list(page.values_list('pk', 'total_amount', 'discount_amount')[:cls.BATCH_SIZE])
+            if not rows:
+                return written
+            last = rows[-1][0]
+            ids = [row[0] for row in rows]
+
+            extensions = dict(
+                BookingExtension.objects.filter(booking_id__in=ids).values('booking_id')
+                .annotate(total=Sum('additional_amount')).values_list('booking_id', 'total')
+            )
+            bar = dict(
+                Order.objects.filter(booking_id__in=ids).values('booking_id')
+                .annotate(total=Sum('total_amount')).values_list('booking_id', 'total')
+            )
+            ledger = {}
+            entries = Transaction.objects.filter(
+                booking_id__in=ids, status='CONFIRMED', transaction_type__in=list(cls.LEDGER_COLUMNS),
+            ).values('booking_id', 'transaction_type').annotate(total=Sum('amount'))
+            for entry in entries:
+                ledger.setdefault(entry['booking_id'], {})[cls.LEDGER_COLUMNS[entry['transaction_type']]] = entry['total']
+
+            folios = []
+            for booking_id, total_amount, discount in rows:
+                extension_charges = extensions.get(booking_id) or Decimal('0.00')
+                folio = cls(
+                    booking_id=booking_id,
+                    room_charges=total_amount - extension_charges,
+                    extension_charges=extension_charges,
+                    bar_charges=bar.get(booking_id) or Decimal('0.00'),
+                    discount=discount,
+                    **ledger.get(booking_id, {}),
+                )
+                folio.balance = sum(cls.SIGNS[column] * getattr(folio, column) for column in cls.SIGNS)
+                folios.append(folio)
+            with transaction.atomic():
+                cls.objects.filter(pk__in=ids).delete()
+                cls.objects.bulk_create(folios)
+            written += len(folios)
@@ -0,0 +1,45 @@
+"""
+Cache configuration for Mayor K. Guest Palace.
+
+One CACHE_URL picks the backend for all named caches:
+  locmem://                 per-process memory (development, tests)
+  file:///var/cache/mayork  files shared by every worker on one box
+  redis://host:6379/0       Redis or a compatible server (pip install redis)
+"""
+from urllib.parse import urlparse
+
+# Named caches and their default timeouts in seconds (None = no expiry;
+# throttle and session entries set their own)
+CACHE_NAMES = {
+    'default': 300,
+    'throttle': None,
+    'sessions': None,
+    'reports': 300,
+}
+
+
+def caches_from_url(url):
+    """Build the CACHES setting for every named cache from one URL."""
+    parsed = urlparse(url)
+    caches = {}
+    for name, timeout in CACHE_NAMES.items():
+        if parsed.scheme == 'locmem':
+            cache = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': name}
+        elif parsed.scheme == 'file':
+            cache = {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': f"{parsed.path.rstrip('/')}/{name}",
+            }
+        elif parsed.scheme in ('redis', 'rediss'):
+            cache = {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': url,
+                'KEY_PREFIX': name,
+            }
+        elif parsed.scheme == 'dummy':
+            cache = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        else:
+            raise ValueError(f"Unsupported CACHE_URL scheme: {parsed.scheme!r}")
+        cache['TIMEOUT'] = timeout
+        caches[name] = cache
+    return caches
@@ -2,10 +2,15 @@
 Django settings for Mayor K. Guest Palace Hotel Management System.
 """
 
+import hashlib
+import os
+import tempfile
 from pathlib import Path
 from decouple import config, Csv
 import dj_database_url
 
+from config.caches import caches_from_url
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Security
@@ -31,6 +36,7 @@ INSTALLED_APPS = [
     'bookings.apps.BookingsConfig',
     'finance.apps.FinanceConfig',
     'inventory.apps.InventoryConfig',
+    'benchmarks.apps.BenchmarksConfig',
 ]
 
 MIDDLEWARE = [
@@ -40,7 +46,8 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -72,6 +79,58 @@ DATABASES = {
     )
 }
 
+# SQLite (single-server branches): WAL lets readers run alongside the writer,
+# and BEGIN IMMEDIATE takes the write lock up front so concurrent writers wait
+# on busy_timeout instead of failing with "database is locked" mid-transaction.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'init_command': ';'.join([
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',
+            'PRAGMA busy_timeout={}'.format(config('SQLITE_BUSY_TIMEOUT_MS', default=20000, cast=int)),
+            'PRAGMA mmap_size={}'.format(config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)),
+            'PRAGMA cache_size=-{}'.format(config('SQLITE_CACHE_SIZE_KB', default=64 * 1024, cast=int)),
+        ]),
+        'transaction_mode': 'IMMEDIATE',
+    })
+    # The test database is a file as well: Django's in-memory one is shared-cache,
+    # whose table locks fail at once whatever busy_timeout says. Named per
+    # checkout so two of them can run their tests side by side.
+    checkout = hashlib.sha1(str(BASE_DIR).encode()).hexdigest()[:8]
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', config(
+        'SQLITE_TEST_NAME', default=os.path.join(tempfile.gettempdir(), f'mayor_k_test_{checkout}.sqlite3')
+    ))
+
+# Read replica for reporting traffic (analytics, dashboards, event and
+# transaction lists). Users who just wrote read from the primary for
+# REPLICA_PIN_SECONDS. To try it locally, point it at a copy of the SQLite file.
+REPLICA_DATABASE_URL = config('REPLICA_DATABASE_URL', default='')
+REPLICA_DATABASE_ALIAS = 'replica' if REPLICA_DATABASE_URL else None
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(REPLICA_DATABASE_URL)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
+# Large exports: rows fetched per round trip (server-side cursor on PostgreSQL)
+# and the statement timeout they run under
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+EXPORT_STATEMENT_TIMEOUT_MS = config('EXPORT_STATEMENT_TIMEOUT_MS', default=300000, cast=int)
+
+# Incremental analytics snapshots (export_snapshots): output directory
+SNAPSHOT_DIR = config('SNAPSHOT_DIR', default=str(BASE_DIR / 'snapshots'))
+
+# Paystack webhooks: deliveries are verified against this secret key (HMAC-SHA512)
+PAYSTACK_SECRET_KEY = config('PAYSTACK_SECRET_KEY', default='')
+
+# Caches: default, throttle (DRF rate limits), sessions and reports. Per-process
+# memory unless CACHE_URL points at a shared file or Redis cache.
+CACHES = caches_from_url(config('CACHE_URL', default='locmem://'))
+
+# Sessions are read from the `sessions` cache and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
 # Custom User Model
 AUTH_USER_MODEL = 'core.User'
 
@@ -106,6 +165,16 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # orjson-backed when installed, otherwise identical to DRF's JSON renderer/parser
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
@@ -117,8 +186,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'core.throttling.AnonRateThrottle',
+        'core.throttling.UserRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '5/minute',  # Anonymous users: 5 requests per minute (prevents brute force)
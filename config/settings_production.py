@@ -0,0 +1,48 @@
+"""
+Production settings for Mayor K. Guest Palace Hotel Management System.
+
+Use with DJANGO_SETTINGS_MODULE=config.settings_production. Everything in
+config/settings.py applies; this profile tunes the database connection for a
+PostgreSQL deployment behind gunicorn.
+
+Connections are either kept open between requests (DB_CONN_MAX_AGE, with
+health checks) or, with DB_POOL=True, handed out by psycopg3's connection
+pool. The two are mutually exclusive.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, config
+from .caches import caches_from_url
+
+DEBUG = False
+
+# Rate limits and the cache must be shared by all gunicorn workers
+CACHES = caches_from_url(config('CACHE_URL', default=f"file://{BASE_DIR / '.cache'}"))
+
+_database = DATABASES['default']
+
+if _database['ENGINE'] == 'django.db.backends.postgresql':
+    _options = _database.setdefault('OPTIONS', {})
+
+    if config('DB_POOL', default=False, cast=bool):
+        # Requires psycopg[pool]; Django returns connections to the pool at request end
+        _database['CONN_MAX_AGE'] = 0
+        _options['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+    else:
+        _database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=600, cast=int)
+        _database['CONN_HEALTH_CHECKS'] = True
+
+    # Kill runaway queries; exports raise this per transaction (see core.db.stream_queryset)
+    _options['options'] = '-c statement_timeout={}'.format(
+        config('DB_STATEMENT_TIMEOUT_MS', default=30000, cast=int)
+    )
+else:
+    _database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=600, cast=int)
+    _database['CONN_HEALTH_CHECKS'] = True
+
+# Server-side cursors are incompatible with transaction-pooling PgBouncer
+_database['DISABLE_SERVER_SIDE_CURSORS'] = config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool)
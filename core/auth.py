@@ -0,0 +1,49 @@
+"""
+Cached request user for Mayor K. Guest Palace.
+
+Sessions live in the cached_db engine (the `sessions` cache), and the user a
+session points at is cached there too. A steady-state authenticated request
+therefore resolves request.user without a django_session or users query.
+Any save or delete of a user drops the cached copy (see core.signals), which
+covers activation, password resets and role changes made through the ORM.
+That only reaches other workers when they share the cache (CACHE_URL set to
+a file or Redis cache); under the per-process locmem default, and for
+QuerySet.update(), raw SQL or fixture loads, which send no signals, a stale
+copy lives until USER_CACHE_TIMEOUT.
+"""
+from django.contrib.auth import get_user, SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+
+USER_CACHE = 'sessions'
+# Seconds a cached user is trusted; the sessions cache itself never expires entries
+USER_CACHE_TIMEOUT = 300
+
+
+def _user_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def get_cached_user(request):
+    """Drop-in for django.contrib.auth.get_user that reads through the cache."""
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return AnonymousUser()
+
+    cache = caches[USER_CACHE]
+    user = cache.get(_user_key(user_id))
+    # Same session-hash check get_user() does: a password change logs out other sessions
+    if user is not None and constant_time_compare(
+        request.session.get(HASH_SESSION_KEY, ''), user.get_session_auth_hash()
+    ):
+        return user
+
+    user = get_user(request)
+    if user.is_authenticated:
+        cache.set(_user_key(user_id), user, timeout=USER_CACHE_TIMEOUT)
+    return user
+
+
+def forget_cached_user(user_id):
+    caches[USER_CACHE].delete(_user_key(user_id))
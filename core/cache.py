@@ -0,0 +1,106 @@
+"""
+Application cache helpers for Mayor K. Guest Palace.
+
+Cached values belong to an invalidation group (e.g. 'rooms', 'products',
+'dashboard'). Each group has a version number that is passed as the cache
+`version`, so invalidating a group is a single increment: every key cached
+under the old version simply stops matching and expires on its own.
+
+    rooms = cache_get_or_set('rooms', 'board', build_room_board)
+    ...
+    invalidate('rooms', 'dashboard')   # after a room changes state
+
+Groups also record when they last changed. The `table:<db_table>` groups are
+per-table change counters, bumped by core.signals whenever a tracked model is
+saved or deleted; group_state() turns them into ETag / Last-Modified values
+without touching the database.
+"""
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+# Cache used when callers don't name one
+DEFAULT_CACHE = 'reports'
+
+
+def _version_key(group):
+    return f'cache-group:{group}'
+
+
+def _modified_key(group):
+    return f'cache-group-modified:{group}'
+
+
+def _seed(cache, group):
+    # Seeded from the clock, so a version lost to eviction or a restart
+    # can't come back as a number that still matches old entries
+    cache.add(_modified_key(group), time.time(), timeout=None)
+    cache.add(_version_key(group), time.time_ns(), timeout=None)
+
+
+def table_group(model):
+    """Name of the change-counter group for a model's table."""
+    return f'table:{model._meta.db_table}'
+
+
+def group_version(group, alias=DEFAULT_CACHE):
+    """Current version of `group`."""
+    cache = caches[alias]
+    version = cache.get(_version_key(group))
+    if version is None:
+        _seed(cache, group)
+        version = cache.get(_version_key(group))
+    return version
+
+
+def group_state(*groups, alias=DEFAULT_CACHE):
+    """
+    (versions, last_modified) for several groups in one cache round trip:
+    a tuple of their versions and the latest change time (epoch seconds).
+    """
+    cache = caches[alias]
+    keys = [_version_key(group) for group in groups] + [_modified_key(group) for group in groups]
+    found = cache.get_many(keys)
+    if len(found) < len(keys):
+        for group in groups:
+            _seed(cache, group)
+        found = cache.get_many(keys)
+    versions = tuple(found[_version_key(group)] for group in groups)
+    last_modified = max(found[_modified_key(group)] for group in groups)
+    return versions, last_modified
+
+
+def invalidate(*groups, alias=DEFAULT_CACHE):
+    """Drop every value cached under the given groups."""
+    cache = caches[alias]
+    for group in groups:
+        try:
+            cache.incr(_version_key(group))
+        except ValueError:  # no version yet, so nothing cached either
+            continue
+        cache.set(_modified_key(group), time.time(), timeout=None)
+
+
+def make_key(*parts):
+    return ':'.join(str(part) for part in parts)
+
+
+def cache_get(group, key, default=None, alias=DEFAULT_CACHE):
+    return caches[alias].get(key, default, version=group_version(group, alias))
+
+
+def cache_set(group, key, value, timeout=DEFAULT_TIMEOUT, alias=DEFAULT_CACHE):
+    caches[alias].set(key, value, timeout, version=group_version(group, alias))
+
+
+def cache_get_or_set(group, key, compute, timeout=DEFAULT_TIMEOUT, alias=DEFAULT_CACHE):
+    """Return the cached value, computing and storing it with `compute()` on a miss."""
+    cache = caches[alias]
+    version = group_version(group, alias)
+    missing = object()
+    value = cache.get(key, missing, version=version)
+    if value is missing:
+        value = compute()
+        cache.set(key, value, timeout, version=version)
+    return value
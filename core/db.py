@@ -0,0 +1,98 @@
+"""
+Database helpers for Mayor K. Guest Palace.
+Contains: the read-replica router with its read-your-writes pinning, and
+streaming iteration for large exports.
+"""
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+
+# Set while a reporting view serves a safe request (see ReplicaReadMixin)
+_replica_reads = ContextVar('replica_reads', default=False)
+# Models written during the current request (see ReadYourWritesMiddleware)
+_request_writes = ContextVar('request_writes', default=None)
+
+
+def replica_configured():
+    return bool(settings.REPLICA_DATABASE_ALIAS) and settings.REPLICA_DATABASE_ALIAS in connections.settings
+
+
+@contextmanager
+def replica_reads():
+    """Route reads inside the block to the replica, if one is configured."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def track_writes():
+    """Collect the models written inside the block; yields the list."""
+    writes = []
+    token = _request_writes.set(writes)
+    try:
+        yield writes
+    finally:
+        _request_writes.reset(token)
+
+
+def _pin_key(user_id):
+    return f'db:primary-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """Serve this user's reads from the primary for REPLICA_PIN_SECONDS."""
+    cache.set(_pin_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return bool(user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica inside replica_reads(), everything else to the
+    primary. Writes always go to the primary, even for instances that were
+    loaded from the replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and replica_configured():
+            return settings.REPLICA_DATABASE_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes.append(model)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so objects from either can be related
+        return True
+
+
+def stream_queryset(queryset, chunk_size=None):
+    """
+    Iterate a large queryset without loading it into memory.
+
+    On PostgreSQL, .iterator() uses a server-side cursor. Inside a transaction
+    it streams `chunk_size` rows per round trip instead of materializing the
+    result, and the transaction gets EXPORT_STATEMENT_TIMEOUT_MS instead of
+    the (shorter) request statement timeout.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    alias = queryset.db
+    connection = connections[alias]
+    postgres = connection.vendor == 'postgresql' and not connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')
+
+    with transaction.atomic(using=alias) if postgres else nullcontext():
+        if postgres:
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL statement_timeout = %s', [settings.EXPORT_STATEMENT_TIMEOUT_MS])
+        yield from queryset.using(alias).iterator(chunk_size=chunk_size)
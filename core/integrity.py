@@ -0,0 +1,235 @@
+"""
+Ledger integrity checks for Mayor K. Guest Palace.
+
+Several columns are running totals of other tables:
+- Booking.amount_paid: confirmed PAYMENT + CORRECTION - REFUND transactions
+- Folio: its booking, extensions, bar orders and confirmed ledger entries
+- Guest.total_stays / total_spent: the guest's checked-out bookings
+- Product.quantity: new_quantity of the product's latest StockLog
+
+Each check finds every disagreeing row with one grouped (or correlated) SQL
+query, so it costs a scan of the tables involved rather than a Python loop
+over them. Repairs recompute the running totals from their sources with
+set-based UPDATEs; the ledger itself is never written.
+"""
+import time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from bookings.models import Booking, BookingExtension, Folio, Guest
+from core.cache import invalidate, table_group
+from core.models import SystemEvent
+from finance.models import Transaction, signed_amount_sql
+from inventory.models import Order, Product, StockLog
+
+ZERO = Value(Decimal('0.00'))
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+LEDGER_TYPES = list(Folio.LEDGER_COLUMNS)
+# Rows per repair UPDATE
+BATCH_SIZE = 500
+
+
+def confirmed_ledger(prefix=''):
+    """Q for the confirmed entries that move a balance, through `prefix` (e.g. 'transactions__')."""
+    return Q(**{f'{prefix}status': Transaction.Status.CONFIRMED, f'{prefix}transaction_type__in': LEDGER_TYPES})
+
+
+def signed(prefix=''):
+    """Transaction.signed_amount as SQL."""
+    return signed_amount_sql(prefix)
+
+
+def ledger_total(column='pk'):
+    """Correlated subquery: net confirmed ledger total of the booking OuterRef(column)."""
+    return Coalesce(Subquery(
+        Transaction.objects.filter(confirmed_ledger(), booking=OuterRef(column))
+        .values('booking').annotate(total=Sum(signed())).values('total')
+    ), ZERO, output_field=MONEY)
+
+
+def sum_of(queryset, column, field):
+    """Correlated subquery: Sum(field) of queryset rows whose `column` is the outer pk."""
+    return Coalesce(Subquery(
+        queryset.filter(**{column: OuterRef('pk')}).values(column).annotate(total=Sum(field)).values('total')
+    ), ZERO, output_field=MONEY)
+
+
+# ============ CHECKS ============
+
+class Check:
+    """
+    One invariant. mismatches() returns a values() queryset of the rows that
+    break it, each with a 'label' and per-column actual/expected pairs;
+    repair(ids) makes those rows consistent again.
+    """
+
+    def __init__(self, name, description, mismatches, repair):
+        self.name = name
+        self.description = description
+        self.mismatches = mismatches
+        self.repair = repair
+
+
+def booking_payments():
+    return Booking.objects.annotate(
+        label=F('booking_ref'),
+        expected_amount_paid=Coalesce(Sum(signed('transactions__'), filter=confirmed_ledger('transactions__')),
+                                      ZERO, output_field=MONEY),
+    ).exclude(amount_paid=F('expected_amount_paid')).values('pk', 'label', 'amount_paid', 'expected_amount_paid')
+
+
+def repair_booking_payments(ids):
+    return Booking.objects.filter(pk__in=ids).update(amount_paid=ledger_total(), updated_at=timezone.now())
+
+
+def folio_ledger():
+    ledger = {
+        f'expected_{column}': Coalesce(
+            Sum('booking__transactions__amount', filter=confirmed_ledger('booking__transactions__')
+                & Q(booking__transactions__transaction_type=entry_type)),
+            ZERO, output_field=MONEY,
+        )
+        for entry_type, column in Folio.LEDGER_COLUMNS.items()
+    }
+    return Folio.objects.annotate(label=F('booking__booking_ref'), **ledger).exclude(
+        payments=F('expected_payments'), refunds=F('expected_refunds'), corrections=F('expected_corrections'),
+    ).values('pk', 'label', 'payments', 'expected_payments', 'refunds', 'expected_refunds',
+             'corrections', 'expected_corrections')
+
+
+def folio_charges():
+    return Folio.objects.annotate(
+        label=F('booking__booking_ref'),
+        expected_extension_charges=sum_of(BookingExtension.objects, 'booking', 'additional_amount'),
+        expected_bar_charges=sum_of(Order.objects, 'booking', 'total_amount'),
+        booked=F('booking__total_amount'),
+        expected_booked=F('room_charges') + F('extension_charges'),
+        expected_discount=F('booking__discount_amount'),
+        expected_balance=(F('room_charges') + F('extension_charges') + F('bar_charges') - F('discount')
+                          - F('payments') + F('refunds') - F('corrections')),
+    ).exclude(
+        extension_charges=F('expected_extension_charges'), bar_charges=F('expected_bar_charges'),
+        booked=F('expected_booked'), discount=F('expected_discount'), balance=F('expected_balance'),
+    ).values('pk', 'label', 'extension_charges', 'expected_extension_charges', 'bar_charges',
+             'expected_bar_charges', 'booked', 'expected_booked', 'discount', 'expected_discount',
+             'balance', 'expected_balance')
+
+
+def missing_folios():
+    return Booking.objects.filter(folio__isnull=True).annotate(label=F('booking_ref')).values('pk', 'label')
+
+
+def repair_folios(ids):
+    return Folio.rebuild(ids)
+
+
+def guest_stats():
+    stay = Q(bookings__status=Booking.Status.CHECKED_OUT)
+    return Guest.objects.annotate(
+        label=F('guest_code'),
+        expected_total_stays=Count('bookings', filter=stay),
+        expected_total_spent=Coalesce(Sum('bookings__amount_paid', filter=stay), ZERO, output_field=MONEY),
+    ).exclude(
+        total_stays=F('expected_total_stays'), total_spent=F('expected_total_spent'),
+    ).values('pk', 'label', 'total_stays', 'expected_total_stays', 'total_spent', 'expected_total_spent')
+
+
+def repair_guest_stats(ids):
+    checked_out = Booking.objects.filter(guest=OuterRef('pk'), status=Booking.Status.CHECKED_OUT).values('guest')
+    return Guest.objects.filter(pk__in=ids).update(
+        total_stays=Coalesce(Subquery(checked_out.annotate(n=Count('pk')).values('n')), Value(0)),
+        total_spent=Coalesce(Subquery(checked_out.annotate(total=Sum('amount_paid')).values('total')),
+                             ZERO, output_field=MONEY),
+    )
+
+
+def latest_stock_quantity():
+    return Subquery(
+        StockLog.objects.filter(product=OuterRef('pk')).order_by('-created_at').values('new_quantity')[:1]
+    )
+
+
+def product_stock():
+    return Product.objects.annotate(
+        label=F('name'), expected_quantity=latest_stock_quantity(),
+    ).filter(expected_quantity__isnull=False).exclude(
+        quantity=F('expected_quantity'),
+    ).values('pk', 'label', 'quantity', 'expected_quantity')
+
+
+def repair_product_stock(ids):
+    updated = Product.objects.filter(pk__in=ids).update(quantity=latest_stock_quantity())
+    if updated:
+        # queryset.update() sends no signals, so drop the cached product lists by hand
+        invalidate(table_group(Product))
+    return updated
+
+
+CHECKS = {check.name: check for check in [
+    Check('booking_payments', 'Booking.amount_paid equals its confirmed ledger total',
+          booking_payments, repair_booking_payments),
+    Check('folio_missing', 'Every booking has a folio', missing_folios, repair_folios),
+    Check('folio_ledger', 'Folio payments / refunds / corrections equal the confirmed ledger',
+          folio_ledger, repair_folios),
+    Check('folio_charges', 'Folio charges and balance agree with the booking, extensions and bar orders',
+          folio_charges, repair_folios),
+    Check('guest_stats', 'Guest.total_stays / total_spent equal their checked-out bookings',
+          guest_stats, repair_guest_stats),
+    Check('product_stock', "Product.quantity equals its latest StockLog's new_quantity",
+          product_stock, repair_product_stock),
+]}
+
+
+# ============ RUNNER ============
+
+def _jsonable(row):
+    return {
+        key: f'{value:.2f}' if isinstance(value, Decimal) else value if isinstance(value, (int, str)) else str(value)
+        for key, value in row.items()
+    }
+
+
+def run_check(check, repair=False, sample=20, actor=None):
+    """
+    Run one check (and its repair). Returns a report dict with the mismatch
+    count, up to `sample` offending rows and, when repairing, rows fixed and
+    what is left.
+    """
+    start = time.perf_counter()
+    ids = []
+    rows = []
+    for row in check.mismatches().iterator():
+        ids.append(row['pk'])
+        if len(rows) < sample:
+            rows.append(_jsonable(row))
+    report = {
+        'check': check.name,
+        'description': check.description,
+        'mismatches': len(ids),
+        'sample': rows,
+    }
+
+    if repair and ids:
+        with transaction.atomic():
+            repaired = sum(check.repair(ids[i:i + BATCH_SIZE]) for i in range(0, len(ids), BATCH_SIZE))
+            SystemEvent.log(
+                event_type='INTEGRITY_REPAIRED',
+                category=SystemEvent.EventCategory.SYSTEM,
+                actor=actor,
+                payload={'check': check.name, 'repaired': repaired, 'sample': rows},
+                description=f'{check.name}: recomputed {repaired} of {len(ids)} mismatched rows',
+            )
+        report['repaired'] = repaired
+        report['remaining'] = check.mismatches().count()
+
+    report['seconds'] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def verify(names=None, repair=False, sample=20, actor=None):
+    """Run the named checks (default: all, in dependency order) and return their reports."""
+    return [run_check(CHECKS[name], repair=repair, sample=sample, actor=actor) for name in (names or CHECKS)]
@@ -0,0 +1,504 @@
+"""
+Django Management Command: generate_load_data
+
+Generates years of synthetic hotel history at production volume for
+benchmarking: bookings, ledger transactions, bar orders, stock movements,
+expenses, shifts, room transitions and SystemEvents.
+
+Everything is written with chunked bulk_create, so memory stays flat no matter
+how much history is requested. The ledger is kept consistent:
+- Booking.amount_paid == sum of CONFIRMED PAYMENT + CORRECTION - REFUND transactions
+- Guest.total_stays / total_spent match their checked-out bookings
+- Product.quantity == new_quantity of its latest StockLog
+- every booking has a Folio rebuilt from the rows above
+
+Usage:
+  # One year, 40 rooms, defaults for everything else
+  python manage.py generate_load_data
+
+  # ~330k bookings, ~600k transactions, ~2M events
+  python manage.py generate_load_data --rooms 120 --years 3 --bookings-per-day 300 --seed 1
+"""
+import random
+import string
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum, OuterRef, Subquery, Value, DecimalField, IntegerField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.cache import invalidate, table_group
+from core.models import User, SystemEvent, WorkShift
+from bookings.models import RoomType, Room, Guest, Booking, Folio, RoomStateTransition
+from finance.models import Transaction, ExpenseCategory, Expense
+from inventory.models import Category, Vendor, Product, StockLog, Order, OrderItem
+
+TIMESTAMPED_MODELS = [
+    Guest, Booking, RoomStateTransition, Transaction, Expense,
+    Order, StockLog, SystemEvent, WorkShift,
+]
+
+ROOM_TYPES = [
+    # name, short rest, overnight, lodge, share of rooms
+    ('Standard', Decimal('5000.00'), Decimal('15000.00'), None, 0.5),
+    ('Deluxe', Decimal('8000.00'), Decimal('25000.00'), Decimal('150000.00'), 0.35),
+    ('VIP Suite', Decimal('12000.00'), Decimal('40000.00'), Decimal('250000.00'), 0.15),
+]
+
+PAYMENT_METHODS = [Transaction.Method.CASH] * 9 + [Transaction.Method.TRANSFER] * 6 + [Transaction.Method.POS] * 5
+BAR_PAYMENT_METHODS = ['CASH'] * 5 + ['TRANSFER'] * 2 + ['POS'] * 2 + ['ROOM_CHARGE'] * 2
+EXPENSE_CATEGORIES = ['Maintenance', 'Utilities', 'Supplies', 'Fuel', 'Staff', 'Laundry']
+RESTOCK_QUANTITY = 120
+
+
+@contextmanager
+def historical_timestamps(models):
+    """
+    Temporarily turn off auto_now/auto_now_add so bulk_create keeps the
+    backdated timestamps we set, instead of stamping every row with now().
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic hotel history at production volume for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=40, help='Number of rooms to create (default: 40)')
+        parser.add_argument('--years', type=float, default=1, help='Years of history ending today (default: 1)')
+        parser.add_argument('--bookings-per-day', type=int, default=30, help='Bookings per day (default: 30)')
+        parser.add_argument('--bar-orders-per-day', type=int, default=60, help='Bar orders per day (default: 60)')
+        parser.add_argument('--products', type=int, default=80, help='Bar products to create (default: 80)')
+        parser.add_argument('--expenses-per-day', type=int, default=3, help='Expenses per day (default: 3)')
+        parser.add_argument('--guests', type=int, default=None, help='Guest pool size (default: 50 per room)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk insert (default: 5000)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        # Unique per run so refs never collide with earlier runs or real data
+        self.token = ''.join(random.SystemRandom().choices(string.ascii_uppercase + string.digits, k=3))
+        self.counts = Counter()
+        self.buffers = {model: [] for model in [
+            Booking, Order, Transaction, OrderItem, StockLog,
+            RoomStateTransition, SystemEvent, Expense, WorkShift,
+        ]}
+        self.seq = Counter()
+
+        started = time.perf_counter()
+        self.stdout.write(f"Generating load data (run {self.token})...")
+
+        with historical_timestamps(TIMESTAMPED_MODELS):
+            self.setup_reference_data(options)
+            self.generate_history(options)
+            self.finalize()
+
+        elapsed = time.perf_counter() - started
+        for model, count in sorted(self.counts.items()):
+            self.stdout.write(f"  {model:<22} {count:>12,}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {sum(self.counts.values()):,} rows in {elapsed:.1f}s."
+        ))
+
+    # ---------- reference data ----------
+
+    def setup_reference_data(self, options):
+        self.users = {}
+        password = make_password('test123')  # hash once, not once per role
+        for role in User.Role.values:
+            user, _ = User.objects.get_or_create(
+                username=f'load_{role.lower()}',
+                defaults={'role': role, 'first_name': role.title(), 'last_name': 'Load', 'password': password}
+            )
+            self.users[role] = user
+
+        room_types = []
+        for name, short_rest, overnight, lodge, share in ROOM_TYPES:
+            room_type, _ = RoomType.objects.get_or_create(
+                name=name,
+                defaults={
+                    'base_rate_short_rest': short_rest,
+                    'base_rate_overnight': overnight,
+                    'base_rate_lodge': lodge,
+                }
+            )
+            room_types.extend([room_type] * int(share * 100))
+
+        self.rooms = Room.objects.bulk_create([
+            Room(
+                room_number=f'L{self.token}{i:04d}',
+                room_type=room_types[i * len(room_types) // options['rooms']],
+                floor=1 + i // 20,
+            )
+            for i in range(options['rooms'])
+        ], batch_size=self.chunk_size)
+        self.counts['Room'] += len(self.rooms)
+
+        guest_count = options['guests'] or options['rooms'] * 50
+        history_start = timezone.now() - timedelta(days=int(options['years'] * 365) + 1)
+        self.guests = []
+        for start in range(0, guest_count, self.chunk_size):
+            chunk = [
+                Guest(
+                    guest_code=f'L{self.token}-{i:08d}',
+                    name=f'Load Guest {i}',
+                    phone=f'L{self.token}{i:010d}',
+                    created_at=history_start,
+                    updated_at=history_start,
+                )
+                for i in range(start, min(start + self.chunk_size, guest_count))
+            ]
+            Guest.objects.bulk_create(chunk)
+            self.guests.extend(chunk)
+        self.counts['Guest'] += len(self.guests)
+
+        category_names = ['Drinks', 'Alcohol', 'Snacks', 'Essentials']
+        categories = [Category.objects.get_or_create(name=name)[0] for name in category_names]
+        vendors = Vendor.objects.bulk_create([
+            Vendor(name=f'Load Vendor {self.token}-{i}') for i in range(max(1, options['products'] // 10))
+        ])
+        self.products = Product.objects.bulk_create([
+            Product(
+                name=f'Load Product {self.token}-{i}',
+                category=categories[i % len(categories)],
+                preferred_vendor=vendors[i % len(vendors)],
+                price=Decimal(self.rng.choice([150, 300, 400, 500, 600, 1500, 3000])),
+                cost_price=Decimal('100.00'),
+                quantity=0,
+            )
+            for i in range(options['products'])
+        ])
+        self.stock = {product.pk: 0 for product in self.products}
+        self.counts['Vendor'] += len(vendors)
+        self.counts['Product'] += len(self.products)
+
+        self.expense_categories = [
+            ExpenseCategory.objects.get_or_create(name=name)[0] for name in EXPENSE_CATEGORIES
+        ]
+
+    # ---------- history ----------
+
+    def generate_history(self, options):
+        now = timezone.now()
+        today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        days = max(1, int(options['years'] * 365))
+
+        for offset in range(days - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            self.generate_day(day, now, is_today=offset == 0, options=options)
+            if sum(len(rows) for rows in self.buffers.values()) >= self.chunk_size:
+                self.flush()
+            if offset % 30 == 0:
+                self.stdout.write(f"  {day.date()} ({days - offset}/{days} days)")
+        self.flush()
+
+    def generate_day(self, day, now, is_today, options):
+        rng = self.rng
+        reception = self.users[User.Role.RECEPTIONIST]
+        cash_collected = Decimal('0.00')
+        in_house = []  # bookings a bar order can be charged to
+        free_rooms = list(self.rooms)
+        rng.shuffle(free_rooms)
+
+        def moment(start_hour=0, end_hour=24):
+            at = day + timedelta(seconds=rng.randint(start_hour * 3600, end_hour * 3600 - 1))
+            return at if at <= now else now - timedelta(minutes=rng.randint(1, 60))
+
+        for _ in range(options['bookings_per_day']):
+            short_rest = rng.random() < 0.3
+            # Today's guests are still in house, one per room
+            checked_in = is_today and free_rooms and rng.random() < 0.6
+            room = free_rooms.pop() if checked_in else rng.choice(self.rooms)
+            room_type = room.room_type
+
+            if short_rest:
+                check_in = moment(8, 22)
+                expected_checkout = check_in + timedelta(hours=4)
+                stay_type, nights, rate = Booking.StayType.SHORT_REST, 1, room_type.base_rate_short_rest
+            else:
+                check_in = moment(12, 24)
+                nights = 1 if rng.random() < 0.9 else rng.randint(2, 5)
+                expected_checkout = (check_in + timedelta(days=nights)).replace(hour=12, minute=0, second=0)
+                stay_type, rate = Booking.StayType.OVERNIGHT, room_type.base_rate_overnight
+            total = rate * nights
+            discount = (total * Decimal('0.10')).quantize(Decimal('1')) if rng.random() < 0.08 else Decimal('0.00')
+            actual_checkout = None if checked_in else min(expected_checkout, max(now, check_in))
+
+            booking = Booking(
+                booking_ref=self.next_ref(Booking, 'L', 8),
+                guest=rng.choice(self.guests),
+                room=room,
+                stay_type=stay_type,
+                status=Booking.Status.CHECKED_IN if checked_in else Booking.Status.CHECKED_OUT,
+                source=rng.choice(Booking.Source.values),
+                check_in_date=check_in.date(),
+                check_in_time=check_in.time(),
+                expected_checkout=expected_checkout,
+                actual_checkout=actual_checkout,
+                num_nights=nights,
+                room_rate=rate,
+                total_amount=total,
+                discount_amount=discount,
+                discount_reason='Loyal guest' if discount else '',
+                created_by=reception,
+                created_at=check_in,
+                updated_at=actual_checkout or check_in,
+            )
+            self.buffers[Booking].append(booking)
+            self.event('BOOKING_QUICK_CREATED', SystemEvent.EventCategory.BOOKING, reception, booking,
+                       check_in, {'booking_ref': booking.booking_ref, 'room': room.room_number})
+            self.room_transition(room, Room.State.AVAILABLE, Room.State.OCCUPIED, check_in)
+
+            # Payments: usually in full up front, sometimes deposit + balance
+            due = total - discount
+            if rng.random() < 0.25:
+                deposit = (due / 2).quantize(Decimal('1'))
+                cash_collected += self.payment(booking, deposit, check_in)
+                if not checked_in:
+                    cash_collected += self.payment(booking, due - deposit, actual_checkout)
+            else:
+                cash_collected += self.payment(booking, due, check_in)
+            if rng.random() < 0.01:
+                # Double charge caught and reversed at the desk
+                duplicate = self.payment(booking, due, check_in, method=Transaction.Method.POS)
+                self.correction(booking, due, check_in + timedelta(minutes=5))
+                cash_collected += duplicate
+
+            if checked_in or rng.random() < 0.3:
+                in_house.append(booking)
+            if not checked_in:
+                self.room_transition(room, Room.State.OCCUPIED, Room.State.DIRTY, actual_checkout)
+                self.room_transition(room, Room.State.DIRTY, Room.State.AVAILABLE,
+                                     actual_checkout + timedelta(minutes=rng.randint(20, 180)))
+                self.event('BOOKING_CHECKED_OUT', SystemEvent.EventCategory.BOOKING, reception, booking,
+                           actual_checkout, {'booking_ref': booking.booking_ref, 'room': room.room_number})
+
+        # Stock levels are sequential, so orders must be generated in time order
+        order_times = sorted(moment(10, 24) for _ in range(options['bar_orders_per_day']))
+        for i in range(1, len(order_times)):
+            order_times[i] = max(order_times[i], order_times[i - 1] + timedelta(milliseconds=1))
+
+        room_charges = Counter()
+        for at in order_times:
+            order = self.bar_order(at, in_house)
+            if order.booking_id:
+                room_charges[order.booking] += order.total_amount
+
+        # Room-charged bar tabs are settled at checkout
+        for booking, amount in room_charges.items():
+            if booking.status == Booking.Status.CHECKED_OUT:
+                cash_collected += self.payment(booking, amount, booking.actual_checkout)
+
+        for _ in range(options['expenses_per_day']):
+            self.expense(day, moment(8, 18), pending=(now - day).days < 7)
+
+        self.buffers[WorkShift].append(WorkShift(
+            user=reception,
+            status=WorkShift.Status.OPEN if is_today else WorkShift.Status.CLOSED,
+            start_time=day + timedelta(hours=7),
+            end_time=None if is_today else day + timedelta(hours=23),
+            opening_balance=Decimal('20000.00'),
+            closing_balance=None if is_today else Decimal('20000.00') + cash_collected,
+            system_cash_total=cash_collected,
+        ))
+
+    def payment(self, booking, amount, at, method=None):
+        """Buffer a confirmed payment and return the cash it put in the drawer."""
+        method = method or self.rng.choice(PAYMENT_METHODS)
+        self.buffers[Transaction].append(Transaction(
+            transaction_ref=self.next_ref(Transaction, 'TXN-L', 10),
+            booking=booking,
+            transaction_type=Transaction.Type.PAYMENT,
+            payment_method=method,
+            status=Transaction.Status.CONFIRMED,
+            amount=amount,
+            processed_by=booking.created_by,
+            created_at=at,
+        ))
+        booking.amount_paid += amount
+        self.event('PAYMENT_RECEIVED', SystemEvent.EventCategory.PAYMENT, booking.created_by, booking, at,
+                   {'booking_ref': booking.booking_ref, 'amount': str(amount), 'method': method})
+        return amount if method == Transaction.Method.CASH else Decimal('0.00')
+
+    def correction(self, booking, amount, at):
+        self.buffers[Transaction].append(Transaction(
+            transaction_ref=self.next_ref(Transaction, 'TXN-L', 10),
+            booking=booking,
+            transaction_type=Transaction.Type.CORRECTION,
+            payment_method=Transaction.Method.POS,
+            status=Transaction.Status.CONFIRMED,
+            amount=-amount,
+            correction_reason='Duplicate POS charge',
+            processed_by=self.users[User.Role.MANAGER],
+            created_at=at,
+        ))
+        booking.amount_paid -= amount
+        self.event('TRANSACTION_CORRECTED', SystemEvent.EventCategory.PAYMENT, self.users[User.Role.MANAGER],
+                   booking, at, {'booking_ref': booking.booking_ref, 'correction_amount': str(-amount)})
+
+    def bar_order(self, at, in_house):
+        rng = self.rng
+        bar_staff = self.users[User.Role.BAR_STAFF]
+        payment_method = rng.choice(BAR_PAYMENT_METHODS)
+        if payment_method == 'ROOM_CHARGE' and not in_house:
+            payment_method = 'CASH'
+        order = Order(
+            reference=self.next_ref(Order, 'BAR-L', 10),
+            user=bar_staff,
+            booking=rng.choice(in_house) if payment_method == 'ROOM_CHARGE' else None,
+            payment_method=payment_method,
+            status='PAID',
+            created_at=at,
+        )
+        total = Decimal('0.00')
+        for product in rng.sample(self.products, k=min(len(self.products), rng.randint(1, 3))):
+            quantity = rng.randint(1, 4)
+            if self.stock[product.pk] < quantity:
+                self.stock_movement(product, 'RESTOCK', RESTOCK_QUANTITY, at - timedelta(microseconds=1),
+                                    self.users[User.Role.MANAGER], 'Restock from supplier')
+            self.stock_movement(product, 'SALE', -quantity, at, bar_staff, f'Sale Order {order.reference}')
+            self.buffers[OrderItem].append(OrderItem(
+                order=order, product=product, quantity=quantity,
+                unit_price=product.price, total_price=product.price * quantity,
+            ))
+            total += product.price * quantity
+        order.total_amount = total
+        self.buffers[Order].append(order)
+
+        if payment_method != 'ROOM_CHARGE':
+            self.buffers[Transaction].append(Transaction(
+                transaction_ref=self.next_ref(Transaction, 'TXN-L', 10),
+                transaction_type=Transaction.Type.PAYMENT,
+                payment_method=payment_method,
+                status=Transaction.Status.CONFIRMED,
+                amount=total,
+                processed_by=bar_staff,
+                notes=f'Bar Order {order.reference}',
+                external_ref=order.reference,
+                created_at=at,
+            ))
+        return order
+
+    def stock_movement(self, product, action, change, at, user, notes):
+        old_quantity = self.stock[product.pk]
+        self.stock[product.pk] = old_quantity + change
+        self.buffers[StockLog].append(StockLog(
+            product=product, action=action, quantity_change=change,
+            old_quantity=old_quantity, new_quantity=old_quantity + change,
+            user=user, notes=notes, created_at=at,
+        ))
+
+    def expense(self, day, at, pending):
+        rng = self.rng
+        manager = self.users[User.Role.MANAGER]
+        status = Expense.Status.PENDING if pending else (
+            Expense.Status.REJECTED if rng.random() < 0.05 else Expense.Status.APPROVED
+        )
+        expense = Expense(
+            expense_ref=self.next_ref(Expense, 'EXL', 8),
+            category=rng.choice(self.expense_categories),
+            description='Generated expense',
+            amount=Decimal(rng.choice([5000, 15000, 45000, 80000, 120000])),
+            status=status,
+            logged_by=self.users[User.Role.RECEPTIONIST],
+            approved_by=manager if status == Expense.Status.APPROVED else None,
+            approved_at=at if status == Expense.Status.APPROVED else None,
+            rejection_reason='Not budgeted' if status == Expense.Status.REJECTED else '',
+            expense_date=day.date(),
+            created_at=at,
+            updated_at=at,
+        )
+        self.buffers[Expense].append(expense)
+        payload = {'expense_ref': expense.expense_ref, 'amount': str(expense.amount)}
+        self.event('EXPENSE_CREATED', SystemEvent.EventCategory.EXPENSE, expense.logged_by, expense, at, payload)
+        if status != Expense.Status.PENDING:
+            self.event(f'EXPENSE_{status}', SystemEvent.EventCategory.EXPENSE, manager, expense, at, payload)
+
+    def room_transition(self, room, from_state, to_state, at):
+        actor = self.users[User.Role.RECEPTIONIST if to_state != Room.State.AVAILABLE else User.Role.HOUSEKEEPING]
+        self.buffers[RoomStateTransition].append(RoomStateTransition(
+            room=room, from_state=from_state, to_state=to_state,
+            transitioned_by=actor, transitioned_at=at,
+        ))
+        self.event(f'ROOM_{to_state}', SystemEvent.EventCategory.ROOM, actor, room, at,
+                   {'room_number': room.room_number, 'from_state': from_state, 'to_state': to_state})
+
+    def event(self, event_type, category, actor, target, at, payload):
+        self.buffers[SystemEvent].append(SystemEvent(
+            event_type=event_type,
+            event_category=category,
+            actor=actor,
+            actor_role=actor.role,
+            target_table=target._meta.db_table,
+            target_id=target.pk,
+            payload=payload,
+            created_at=at,
+        ))
+
+    def next_ref(self, model, prefix, digits):
+        self.seq[model] += 1
+        return f'{prefix}{self.token}{self.seq[model]:0{digits}d}'
+
+    # ---------- persistence ----------
+
+    def flush(self):
+        """Insert buffered rows parents-first, one transaction per flush."""
+        with transaction.atomic():
+            for model, rows in self.buffers.items():
+                for start in range(0, len(rows), self.chunk_size):
+                    model.objects.bulk_create(rows[start:start + self.chunk_size])
+                self.counts[model.__name__] += len(rows)
+                rows.clear()
+
+    def finalize(self):
+        with transaction.atomic():
+            for product in self.products:
+                product.quantity = self.stock[product.pk]
+            Product.objects.bulk_update(self.products, ['quantity'], batch_size=self.chunk_size)
+
+            # Guest stats in one set-based UPDATE rather than a CASE per guest
+            checked_out = Booking.objects.filter(
+                guest=OuterRef('pk'), status=Booking.Status.CHECKED_OUT
+            ).values('guest')
+            Guest.objects.filter(guest_code__startswith=f'L{self.token}-').update(
+                total_stays=Coalesce(
+                    Subquery(checked_out.annotate(n=Count('pk')).values('n')),
+                    Value(0), output_field=IntegerField()
+                ),
+                total_spent=Coalesce(
+                    Subquery(checked_out.annotate(total=Sum('amount_paid')).values('total')),
+                    Value(Decimal('0.00')), output_field=DecimalField(max_digits=12, decimal_places=2)
+                ),
+            )
+
+            Room.objects.filter(
+                pk__in=Booking.objects.filter(
+                    room__in=self.rooms, status=Booking.Status.CHECKED_IN
+                ).values('room_id')
+            ).update(current_state=Room.State.OCCUPIED)
+
+        # Folios are posted by Booking/Transaction/Order.save(), which bulk_create skips
+        Folio.rebuild(Booking.objects.filter(guest__guest_code__startswith=f'L{self.token}-'))
+
+        # bulk_create / bulk_update skip the signals that bump the reference-data ETags
+        invalidate(*(table_group(model) for model in [RoomType, Room, ExpenseCategory, Category, Vendor, Product]))
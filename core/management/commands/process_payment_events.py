@@ -0,0 +1,53 @@
+"""
+Django Management Command: process_payment_events
+
+Posts stored Paystack webhook events to the ledger in batches (see
+finance/webhooks.py). The webhook only stores events, so run this next to
+the web server: under a process supervisor with --loop, or from cron.
+
+Usage:
+  # Drain the queue once
+  python manage.py process_payment_events
+
+  # Keep polling every 2 seconds, 500 events per transaction
+  python manage.py process_payment_events --loop --interval 2 --batch-size 500
+
+  # Queue failed events again (e.g. after creating a missing booking)
+  python manage.py process_payment_events --retry-failed
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from finance.models import PaymentEvent
+from finance.webhooks import BATCH_SIZE, process_events
+
+
+class Command(BaseCommand):
+    help = 'Post stored payment webhook events to the ledger in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f'Events per database transaction (default: {BATCH_SIZE})')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty (with --loop, default: 1)')
+        parser.add_argument('--retry-failed', action='store_true', help='Queue FAILED events again first')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = PaymentEvent.objects.filter(status=PaymentEvent.Status.FAILED).update(
+                status=PaymentEvent.Status.RECEIVED, error='', processed_at=None,
+            )
+            self.stderr.write(f'Requeued {requeued} failed events')
+
+        while True:
+            start = time.perf_counter()
+            counts = process_events(options['batch_size'])
+            if counts:
+                summary = ', '.join(f'{count} {status.lower()}' for status, count in sorted(counts.items()))
+                self.stderr.write(f'{summary} in {time.perf_counter() - start:.2f}s')
+            if not options['loop']:
+                break
+            if not counts:
+                time.sleep(options['interval'])
@@ -0,0 +1,73 @@
+"""
+Django Management Command: reconcile_statement
+
+Matches the credit lines of a bank statement or POS settlement CSV against
+PENDING / AWAITING_TRANSFER transactions and confirms the matches in bulk.
+See finance/reconciliation.py for the accepted columns and matching rules.
+
+Usage:
+  # See what would match, without confirming anything
+  python manage.py reconcile_statement statement.csv --dry-run
+
+  # POS settlement file, POS transactions only, +/- 1 day
+  python manage.py reconcile_statement settlement.csv --method POS --window-days 1
+
+  # Confirm as a given user, JSON report to a file
+  python manage.py reconcile_statement statement.csv --user manager1 --output reconciliation.json
+"""
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import User
+from finance.models import Transaction
+from finance.reconciliation import DEFAULT_WINDOW_DAYS, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Match a bank statement or POS settlement CSV against pending transactions and confirm the matches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='CSV file with date, amount and (optionally) reference columns')
+        parser.add_argument('--method', nargs='+', choices=Transaction.Method.values,
+                            help='Only match pending transactions with these payment methods')
+        parser.add_argument('--window-days', type=int, default=DEFAULT_WINDOW_DAYS,
+                            help=f'Days a line may be booked from its transaction (default: {DEFAULT_WINDOW_DAYS})')
+        parser.add_argument('--user', help='Username recorded as verified_by (default: none)')
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without confirming them')
+        parser.add_argument('--sample', type=int, default=50, help='Matched/unmatched lines to include (default: 50)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        actor = None
+        if options['user']:
+            actor = User.objects.filter(username=options['user']).first()
+            if actor is None:
+                raise CommandError(f"No user {options['user']!r}")
+
+        try:
+            with open(options['statement'], 'rb') as handle:
+                report = reconcile(
+                    handle, actor=actor, window=options['window_days'], payment_methods=options['method'],
+                    dry_run=options['dry_run'], source_name=os.path.basename(options['statement']),
+                    sample=options['sample'],
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+
+        self.stderr.write(
+            f"{report['lines']} lines: {report['matched']} matched (₦{report['matched_total']}), "
+            f"{report['confirmed']} confirmed, {report['unmatched_count']} unmatched, "
+            f"{len(report['rejected'])} rejected"
+        )
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -111,7 +111,6 @@ class Command(BaseCommand):
                     actual_checkout=checkout if status == 'CHECKED_OUT' else None,
                     room_rate=rate,
                     total_amount=rate,
-                    amount_paid=rate,
                     created_by=reception
                 )
                 
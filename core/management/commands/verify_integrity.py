@@ -0,0 +1,58 @@
+"""
+Django Management Command: verify_integrity
+
+Checks that the running totals agree with the rows they summarize
+(booking amount_paid vs the ledger, folios, guest stats, product stock),
+each as one set-based SQL query, and optionally recomputes the ones that
+don't. See core/integrity.py for the checks.
+
+Usage:
+  # Report only
+  python manage.py verify_integrity
+
+  # Some checks, recompute what is wrong, JSON report to a file
+  python manage.py verify_integrity --checks booking_payments guest_stats --repair --output integrity.json
+
+  # Exit non-zero if anything is (still) inconsistent, e.g. from cron or CI
+  python manage.py verify_integrity --fail-on-mismatch
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.integrity import CHECKS, verify
+
+
+class Command(BaseCommand):
+    help = 'Verify (and optionally repair) ledger-derived totals with set-based SQL checks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', nargs='+', choices=list(CHECKS), default=list(CHECKS),
+                            help='Checks to run (default: all)')
+        parser.add_argument('--repair', action='store_true',
+                            help='Recompute mismatched rows from their sources and log a SystemEvent per check')
+        parser.add_argument('--sample', type=int, default=20, help='Mismatched rows to include per check (default: 20)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--fail-on-mismatch', action='store_true',
+                            help='Exit with an error if any mismatch remains')
+
+    def handle(self, *args, **options):
+        reports = verify(options['checks'], repair=options['repair'], sample=options['sample'])
+
+        for report in reports:
+            line = f"{report['check']:<18} {report['mismatches']:>8} mismatched  {report['seconds']:>8.3f}s"
+            if 'repaired' in report:
+                line += f"  repaired {report['repaired']}, remaining {report['remaining']}"
+            self.stderr.write(line)
+
+        output = json.dumps(reports, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        remaining = sum(report.get('remaining', report['mismatches']) for report in reports)
+        if options['fail_on_mismatch'] and remaining:
+            raise CommandError(f'{remaining} inconsistent rows')
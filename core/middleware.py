@@ -0,0 +1,34 @@
+"""
+Middleware for Mayor K. Guest Palace.
+"""
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from core.auth import get_cached_user
+from core.db import track_writes, pin_to_primary, replica_configured
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware that loads request.user through the user cache."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a request that wrote to the database, pin the user to the primary
+    for REPLICA_PIN_SECONDS, so their next reads don't hit a lagging replica.
+    Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_writes() as writes:
+            response = self.get_response(request)
+        if writes and replica_configured() and request.user.is_authenticated:
+            pin_to_primary(request.user)
+        return response
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:29
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+METHOD_FIELDS = {
+    'CASH': 'system_cash_total',
+    'TRANSFER': 'system_transfer_total',
+    'POS': 'system_pos_total',
+    'PAYSTACK': 'system_paystack_total',
+}
+SIGNS = {'PAYMENT': 1, 'CORRECTION': 1, 'REFUND': -1}
+
+
+def backfill_open_shifts(apps, schema_editor):
+    """
+    Open shifts start counting from their start_time, from the ledger as it
+    stands. Closed shifts keep the totals they were closed with.
+    """
+    WorkShift = apps.get_model('core', 'WorkShift')
+    Transaction = apps.get_model('finance', 'Transaction')
+    for shift in WorkShift.objects.filter(status='OPEN'):
+        totals = {}
+        rows = Transaction.objects.filter(
+            processed_by_id=shift.user_id, status='CONFIRMED',
+            transaction_type__in=SIGNS, created_at__gte=shift.start_time,
+        ).values('payment_method', 'transaction_type').annotate(total=Sum('amount'))
+        for row in rows:
+            field = METHOD_FIELDS.get(row['payment_method'], 'system_other_total')
+            totals[field] = totals.get(field, 0) + SIGNS[row['transaction_type']] * row['total']
+        if totals:
+            WorkShift.objects.filter(pk=shift.pk).update(**totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_workshift'),
+        ('finance', '0003_transactions_immutable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workshift',
+            name='system_other_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Split payments without a usable breakdown', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='workshift',
+            name='system_paystack_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='workshift',
+            name='system_pos_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='workshift',
+            name='system_transfer_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_open_shifts, migrations.RunPython.noop),
+    ]
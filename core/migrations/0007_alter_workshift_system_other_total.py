@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_workshift_method_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workshift',
+            name='system_other_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Legacy split payments whose breakdown fell short of the amount', max_digits=12),
+        ),
+    ]
@@ -178,6 +178,43 @@ class SystemEvent(models.Model):
     
     def __str__(self):
         return f"{self.event_type} - {self.actor} - {self.created_at}"
+    
+    @classmethod
+    def log(cls, event_type, category, actor=None, target=None, payload=None, request=None, description=''):
+        """
+        Helper method to create audit log entries.
+        """
+        event = cls.build(event_type, category, actor, target, payload, request, description)
+        event.save()
+        return event
+
+    @classmethod
+    def build(cls, event_type, category, actor=None, target=None, payload=None, request=None, description=''):
+        """An unsaved entry, as log() would write it, for bulk_create()."""
+        event = cls(
+            event_type=event_type,
+            event_category=category,
+            actor=actor,
+            actor_role=actor.role if actor else '',
+            payload=payload or {},
+            description=description,
+        )
+        
+        if target:
+            event.target_table = target._meta.db_table
+            event.target_id = target.pk
+        
+        if request:
+            event.ip_address = cls._get_client_ip(request)
+            event.user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
+        return event
+    
+    @staticmethod
+    def _get_client_ip(request):
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            return x_forwarded_for.split(',')[0].strip()
+        return request.META.get('REMOTE_ADDR')
 
 
 class WorkShift(models.Model):
@@ -199,14 +236,51 @@ class WorkShift(models.Model):
     opening_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0.00, help_text="Cash in drawer at start")
     closing_balance = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, help_text="Cash declared at end")
     system_cash_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00, help_text="Cash recorded by system during shift")
+    # Other takings, kept as running totals by the ledger like system_cash_total
+    system_transfer_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    system_pos_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    system_paystack_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    system_other_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00, help_text="Legacy split payments whose breakdown fell short of the amount")
     
     notes = models.TextField(blank=True, help_text="Handover notes or variance explanation")
     
+    # Payment method -> running total column; anything else lands in system_other_total
+    METHOD_FIELDS = {
+        'CASH': 'system_cash_total',
+        'TRANSFER': 'system_transfer_total',
+        'POS': 'system_pos_total',
+        'PAYSTACK': 'system_paystack_total',
+    }
+    OTHER_FIELD = 'system_other_total'
+    
     class Meta:
         ordering = ['-start_time']
         
     def __str__(self):
         return f"{self.user.username} - {self.start_time.date()} ({self.status})"
+
+    @classmethod
+    def record_takings(cls, user_id, amounts):
+        """
+        Add {method: amount} to the running totals of the user's open shift in
+        one UPDATE (no-op without an open shift). Returns the rows updated.
+        """
+        changes = {}
+        for method, amount in amounts.items():
+            if amount:
+                field = cls.METHOD_FIELDS.get(method, cls.OTHER_FIELD)
+                changes[field] = changes.get(field, 0) + amount
+        if not user_id or not changes:
+            return 0
+        return cls.objects.filter(user_id=user_id, status=cls.Status.OPEN).update(
+            **{field: models.F(field) + amount for field, amount in changes.items()}
+        )
+
+    @property
+    def method_totals(self):
+        totals = {method: getattr(self, field) for method, field in self.METHOD_FIELDS.items()}
+        totals['OTHER'] = self.system_other_total
+        return totals
         
     @property
     def discrepancy(self):
@@ -222,36 +296,6 @@ class WorkShift(models.Model):
         self.end_time = timezone.now()
         self.status = self.Status.CLOSED
         self.notes = notes
-        self.save()
-    
-    @classmethod
-    def log(cls, event_type, category, actor=None, target=None, payload=None, request=None, description=''):
-        """
-        Helper method to create audit log entries.
-        """
-        event = cls(
-            event_type=event_type,
-            event_category=category,
-            actor=actor,
-            actor_role=actor.role if actor else '',
-            payload=payload or {},
-            description=description,
-        )
-        
-        if target:
-            event.target_table = target._meta.db_table
-            event.target_id = target.pk
-        
-        if request:
-            event.ip_address = cls._get_client_ip(request)
-            event.user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
-        
-        event.save()
-        return event
-    
-    @staticmethod
-    def _get_client_ip(request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            return x_forwarded_for.split(',')[0].strip()
-        return request.META.get('REMOTE_ADDR')
+        # Leave the running totals alone: the ledger may have moved them since this row was read
+        self.save(update_fields=['closing_balance', 'end_time', 'status', 'notes'])
+        self.refresh_from_db(fields=[self.OTHER_FIELD, *self.METHOD_FIELDS.values()])
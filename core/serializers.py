@@ -2,17 +2,78 @@
 API Serializers for Mayor K. Guest Palace.
 """
 from decimal import Decimal
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError as DjangoValidationError
+from django.db import models, transaction
 from django.db.models import Sum
+from django.utils.encoding import force_str
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from django.utils import timezone
 from core.models import User, SystemEvent, WorkShift
-from bookings.models import RoomType, Room, Guest, Booking, BookingExtension, RoomStateTransition
-from finance.models import Transaction, ExpenseCategory, Expense
+from bookings.models import RoomType, Room, Guest, Booking, BookingExtension, Folio, RoomStateTransition
+from finance.models import Transaction, ExpenseCategory, Expense, AccountingPeriod, PeriodSnapshot
+from finance import expenses
+from finance.ledger import MAX_BATCH
+from finance.reconciliation import DEFAULT_WINDOW_DAYS
+
+
+# ============ SPARSE FIELDSETS ============
+
+def query_list(request, param):
+    """A comma-separated query parameter as a set of names, or None when absent."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def wants_fields(request, *names):
+    """Whether the response will include any of `names` (everything, without ?fields=)."""
+    fields = query_list(request, 'fields')
+    return fields is None or not fields.isdisjoint(names)
+
+
+def wants_expanded(request, *names):
+    """Whether ?expand= names any of `names`."""
+    return not (query_list(request, 'expand') or set()).isdisjoint(names)
+
+
+class SparseFieldsetMixin:
+    """
+    `?fields=id,name` limits a GET response to those fields and
+    `?expand=guest` replaces a related id with the nested object listed in
+    Meta.expandable_fields. Dropped fields are never evaluated, so computed
+    fields cost nothing unless asked for; views use wants_fields() to skip
+    the annotations and joins behind them as well.
+
+    The same can be passed explicitly: `GuestSerializer(guest, fields=[...])`.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = kwargs.get('context', {}).get('request')
+        if fields is None:
+            fields = query_list(request, 'fields')
+        if expand is None:
+            expand = query_list(request, 'expand')
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        expand = {name for name in expand or () if name in expandable}
+        if fields is not None:
+            keep = set(fields) | expand
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+        for name in expand:
+            serializer_class, options = expandable[name]
+            self.fields[name] = serializer_class(read_only=True, **options)
 
 
 # ============ CORE SERIALIZERS ============
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     role_display = serializers.CharField(source='get_role_display', read_only=True)
     full_name = serializers.SerializerMethodField()
     password = serializers.CharField(write_only=True, required=False, style={'input_type': 'password'})
@@ -44,18 +105,23 @@ class UserSerializer(serializers.ModelSerializer):
         return instance
 
 
-class SystemEventSerializer(serializers.ModelSerializer):
+# Nested representation of a user for ?expand=
+USER_SUMMARY = {'fields': ['id', 'username', 'full_name', 'role']}
+
+
+class SystemEventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     actor_name = serializers.CharField(source='actor.get_full_name', read_only=True)
     
     class Meta:
         model = SystemEvent
         fields = ['id', 'event_type', 'event_category', 'actor', 'actor_name',
                   'actor_role', 'target_table', 'target_id', 'payload', 'created_at']
+        expandable_fields = {'actor': (UserSerializer, USER_SUMMARY)}
 
 
 # ============ BOOKING SERIALIZERS ============
 
-class RoomTypeSerializer(serializers.ModelSerializer):
+class RoomTypeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     room_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -65,21 +131,24 @@ class RoomTypeSerializer(serializers.ModelSerializer):
                   'amenities', 'is_active', 'room_count']
     
     def get_room_count(self, obj):
+        if hasattr(obj, 'room_total'):
+            return obj.room_total
         return obj.rooms.count()
 
     def get_price(self, obj):
         return obj.room_type.base_rate_overnight
 
-class WorkShiftSerializer(serializers.ModelSerializer):
+class WorkShiftSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     discrepancy = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    method_totals = serializers.DictField(child=serializers.DecimalField(max_digits=12, decimal_places=2), read_only=True)
     
     class Meta:
         model = WorkShift
         fields = [
             'id', 'user', 'user_name', 'status', 'start_time', 'end_time',
             'opening_balance', 'closing_balance', 'system_cash_total',
-            'discrepancy', 'notes'
+            'method_totals', 'discrepancy', 'notes'
         ]
         read_only_fields = ['user', 'start_time', 'end_time', 'status', 'system_cash_total', 'discrepancy']
 
@@ -90,10 +159,10 @@ class WorkShiftSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You already have an open shift.")
         
         validated_data['user'] = user
-        return super().create(validated_data)()
+        return super().create(validated_data)
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     room_type_name = serializers.CharField(source='room_type.name', read_only=True)
     state_display = serializers.CharField(source='get_current_state_display', read_only=True)
     current_booking_id = serializers.SerializerMethodField()
@@ -118,6 +187,9 @@ class RoomSerializer(serializers.ModelSerializer):
                   'current_state', 'state_display', 'notes', 'is_active', 'is_available',
                   'overnight_rate', 'short_rest_rate', 'price',
                   'current_booking_id', 'booking_stay_info']
+        expandable_fields = {'room_type': (RoomTypeSerializer, {'fields': [
+            'id', 'name', 'base_rate_short_rest', 'base_rate_overnight', 'base_rate_lodge', 'capacity'
+        ]})}
 
     def get_current_booking_id(self, obj):
         if obj.current_state == 'OCCUPIED':
@@ -141,15 +213,16 @@ class RoomSerializer(serializers.ModelSerializer):
         return None
 
     def _get_active_booking(self, room):
-        # Optimization: storing this in context or prefetching would be better, 
-        # but for now a simple helper works.
+        # RoomViewSet prefetches checked-in bookings for list/retrieve
+        if hasattr(room, 'active_bookings'):
+            return room.active_bookings[0] if room.active_bookings else None
         return Booking.objects.filter(
             room=room, 
             status=Booking.Status.CHECKED_IN
-        ).order_by('-check_in_date', '-created_at').first()
+        ).select_related('guest').order_by('-check_in_date', '-created_at').first()
 
 
-class RoomAvailabilitySerializer(serializers.ModelSerializer):
+class RoomAvailabilitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for room availability display."""
     room_type_name = serializers.CharField(source='room_type.name', read_only=True)
     overnight_rate = serializers.DecimalField(
@@ -171,7 +244,7 @@ class RoomAvailabilitySerializer(serializers.ModelSerializer):
                   'current_state', 'overnight_rate', 'short_rest_rate', 'price']
 
 
-class GuestSerializer(serializers.ModelSerializer):
+class GuestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     total_stays = serializers.SerializerMethodField()
     total_spent = serializers.SerializerMethodField()
     last_visit = serializers.SerializerMethodField()
@@ -184,12 +257,16 @@ class GuestSerializer(serializers.ModelSerializer):
     
     def get_total_stays(self, obj):
         """Count all completed and active bookings for this guest."""
+        if hasattr(obj, 'stay_count'):
+            return obj.stay_count
         return obj.bookings.filter(
             status__in=[Booking.Status.CHECKED_IN, Booking.Status.CHECKED_OUT]
         ).count()
     
     def get_total_spent(self, obj):
         """Sum of all payments from this guest (both current and past stays)."""
+        if hasattr(obj, 'amount_spent'):
+            return obj.amount_spent or Decimal('0.00')
         total = obj.bookings.filter(
             status__in=[Booking.Status.CHECKED_IN, Booking.Status.CHECKED_OUT]
         ).aggregate(total=Sum('amount_paid'))['total']
@@ -197,6 +274,8 @@ class GuestSerializer(serializers.ModelSerializer):
     
     def get_last_visit(self, obj):
         """Most recent check-in or checkout date."""
+        if hasattr(obj, 'last_checkout'):
+            return obj.last_checkout or obj.last_check_in_date
         # First try checked-out bookings
         last_booking = obj.bookings.filter(
             status=Booking.Status.CHECKED_OUT
@@ -215,7 +294,7 @@ class GuestCreateSerializer(serializers.ModelSerializer):
         fields = ['name', 'phone', 'email', 'notes']
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     guest_name = serializers.CharField(source='guest.name', read_only=True)
     guest_phone = serializers.CharField(source='guest.phone', read_only=True)
     room_number = serializers.CharField(source='room.room_number', read_only=True)
@@ -248,6 +327,39 @@ class BookingSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'booking_ref', 'created_at', 'updated_at']
+        expandable_fields = {
+            'guest': (GuestSerializer, {'fields': ['id', 'guest_code', 'name', 'phone', 'email', 'is_blocked']}),
+            'room': (RoomAvailabilitySerializer, {}),
+            'created_by': (UserSerializer, USER_SUMMARY),
+        }
+
+
+class FolioSerializer(serializers.ModelSerializer):
+    booking_ref = serializers.CharField(source='booking.booking_ref', read_only=True)
+    guest_name = serializers.CharField(source='booking.guest.name', read_only=True)
+    room_number = serializers.CharField(source='booking.room.room_number', read_only=True)
+    booking_status = serializers.CharField(source='booking.status', read_only=True)
+    paid = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Folio
+        fields = [
+            'booking', 'booking_ref', 'guest_name', 'room_number', 'booking_status',
+            'room_charges', 'extension_charges', 'bar_charges', 'discount',
+            'payments', 'refunds', 'corrections', 'paid', 'balance', 'updated_at'
+        ]
+
+
+class BookingBalanceSerializer(serializers.ModelSerializer):
+    """A folio on its own: what a single-row balance read returns."""
+    paid = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Folio
+        fields = [
+            'booking', 'room_charges', 'extension_charges', 'bar_charges', 'discount',
+            'payments', 'refunds', 'corrections', 'paid', 'balance', 'updated_at'
+        ]
 
 
 class QuickBookSerializer(serializers.Serializer):
@@ -268,6 +380,7 @@ class QuickBookSerializer(serializers.Serializer):
     # Payment info
     payment_method = serializers.ChoiceField(choices=Transaction.Method.choices)
     amount_paid = serializers.DecimalField(max_digits=10, decimal_places=2)
+    split_details = serializers.JSONField(required=False, allow_null=True)
     
     # Optional
     notes = serializers.CharField(required=False, allow_blank=True)
@@ -286,8 +399,17 @@ class QuickBookSerializer(serializers.Serializer):
         except Room.DoesNotExist:
             raise serializers.ValidationError("Room not found.")
         return value
+
+    def validate(self, attrs):
+        if attrs['payment_method'] == Transaction.Method.SPLIT:
+            error = Transaction.split_details_error(attrs['amount_paid'], attrs.get('split_details'))
+            if error:
+                raise serializers.ValidationError({'split_details': error})
+        return attrs
     
+    @transaction.atomic
     def create(self, validated_data):
+        """Booking, room state and payment commit together or not at all."""
         from decimal import Decimal
         from django.utils import timezone
         from datetime import timedelta
@@ -330,7 +452,6 @@ class QuickBookSerializer(serializers.Serializer):
             num_guests=validated_data['num_guests'],
             room_rate=room_rate,
             total_amount=total_amount,
-            amount_paid=validated_data['amount_paid'],
             discount_amount=discount,
             discount_reason=validated_data.get('discount_reason', ''),
             notes=validated_data.get('notes', ''),
@@ -340,13 +461,14 @@ class QuickBookSerializer(serializers.Serializer):
         # Mark room as occupied
         room.change_state(Room.State.OCCUPIED, changed_by=user, notes=f'Booking {booking.booking_ref}')
         
-        # Create transaction
+        # Create transaction (posts amount_paid to the booking)
         Transaction.objects.create(
             booking=booking,
             transaction_type=Transaction.Type.PAYMENT,
             payment_method=validated_data['payment_method'],
             status=Transaction.Status.CONFIRMED,
             amount=validated_data['amount_paid'],
+            split_details=validated_data.get('split_details'),
             processed_by=user,
             notes=f'Walk-in booking {booking.booking_ref}'
         )
@@ -371,7 +493,7 @@ class QuickBookSerializer(serializers.Serializer):
 
 # ============ FINANCE SERIALIZERS ============
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_transaction_type_display', read_only=True)
     method_display = serializers.CharField(source='get_payment_method_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -388,15 +510,54 @@ class TransactionSerializer(serializers.ModelSerializer):
             'processed_by_name', 'verification_notes', 'verified_by',
             'verified_at', 'external_ref', 'notes', 'created_at'
         ]
+        expandable_fields = {
+            'booking': (BookingSerializer, {'fields': ['id', 'booking_ref', 'guest_name', 'room_number', 'status']}),
+            'processed_by': (UserSerializer, USER_SUMMARY),
+        }
+
+
+class LedgerEntrySerializer(serializers.Serializer):
+    """One entry of a batch posting (see finance.ledger.post_entries)."""
+    booking = serializers.UUIDField()
+    transaction_type = serializers.ChoiceField(choices=Transaction.Type.choices)
+    payment_method = serializers.ChoiceField(choices=Transaction.Method.choices)
+    status = serializers.ChoiceField(choices=Transaction.Status.choices, default=Transaction.Status.CONFIRMED)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    split_details = serializers.JSONField(required=False, allow_null=True)
+    original_transaction = serializers.UUIDField(required=False, allow_null=True)
+    correction_reason = serializers.CharField(required=False, allow_blank=True, default='')
+    external_ref = serializers.CharField(required=False, allow_blank=True, default='', max_length=100)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if attrs['payment_method'] == Transaction.Method.SPLIT:
+            error = Transaction.split_details_error(attrs['amount'], attrs.get('split_details'))
+            if error:
+                raise serializers.ValidationError({'split_details': error})
+        return attrs
+
+
+class LedgerBatchSerializer(serializers.Serializer):
+    source = serializers.CharField(required=False, allow_blank=True, default='', max_length=100)
+    entries = LedgerEntrySerializer(many=True, allow_empty=False, max_length=MAX_BATCH)
+
+
+class StatementReconcileSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    payment_methods = serializers.ListField(
+        child=serializers.ChoiceField(choices=Transaction.Method.choices), required=False, allow_empty=True,
+    )
+    window_days = serializers.IntegerField(required=False, min_value=0, max_value=31, default=DEFAULT_WINDOW_DAYS)
+    dry_run = serializers.BooleanField(required=False, default=False)
 
 
-class ExpenseCategorySerializer(serializers.ModelSerializer):
+class ExpenseCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ExpenseCategory
         fields = ['id', 'name', 'description', 'is_active']
 
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     logged_by_name = serializers.CharField(source='logged_by.get_full_name', read_only=True)
@@ -412,6 +573,11 @@ class ExpenseSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'expense_ref', 'logged_by', 'approved_by', 
                            'approved_at', 'rejection_reason']
+        expandable_fields = {
+            'category': (ExpenseCategorySerializer, {}),
+            'logged_by': (UserSerializer, USER_SUMMARY),
+            'approved_by': (UserSerializer, USER_SUMMARY),
+        }
 
 
 class ExpenseCreateSerializer(serializers.ModelSerializer):
@@ -421,6 +587,48 @@ class ExpenseCreateSerializer(serializers.ModelSerializer):
         fields = ['category', 'description', 'amount', 'vendor_name', 
                   'receipt_image', 'expense_date']
 
+    def validate(self, attrs):
+        days = [attrs.get('expense_date')]
+        if self.instance is not None:
+            days.append(self.instance.expense_date)
+        try:
+            AccountingPeriod.ensure_open(*days)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'expense_date': e.messages})
+        return attrs
+
+
+class ExpenseReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=expenses.MAX_BATCH)
+    action = serializers.ChoiceField(choices=[expenses.APPROVE, expenses.REJECT])
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if attrs['action'] == expenses.REJECT and not attrs['reason']:
+            raise serializers.ValidationError({'reason': 'Reason is required'})
+        return attrs
+
+
+class AccountingPeriodSerializer(serializers.ModelSerializer):
+    closed_by_name = serializers.CharField(source='closed_by.get_full_name', read_only=True, default=None)
+
+    class Meta:
+        model = AccountingPeriod
+        fields = ['id', 'month', 'closed_by', 'closed_by_name', 'closed_at', 'notes']
+        read_only_fields = fields
+
+
+class PeriodCloseSerializer(serializers.Serializer):
+    month = serializers.RegexField(r'^\d{4}-\d{2}$', help_text='YYYY-MM')
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class PeriodReportSerializer(serializers.Serializer):
+    start = serializers.RegexField(r'^\d{4}-\d{2}$', required=False)
+    end = serializers.RegexField(r'^\d{4}-\d{2}$', required=False)
+    dimension = serializers.ChoiceField(choices=PeriodSnapshot.Dimension.choices, default=PeriodSnapshot.Dimension.METHOD)
+    compare = serializers.ChoiceField(choices=['previous_year'], required=False)
+
 
 # ============ DASHBOARD SERIALIZERS ============
 
@@ -446,6 +654,9 @@ class StakeholderDashboardSerializer(serializers.Serializer):
     total_revenue_today = serializers.DecimalField(max_digits=12, decimal_places=2)
     total_revenue_week = serializers.DecimalField(max_digits=12, decimal_places=2)
     total_revenue_month = serializers.DecimalField(max_digits=12, decimal_places=2)
+    revenue_by_method_month = serializers.DictField(
+        child=serializers.DecimalField(max_digits=12, decimal_places=2)
+    )
     
     # Expenses
     total_expenses_today = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -463,3 +674,96 @@ class StakeholderDashboardSerializer(serializers.Serializer):
     
     # Anomalies / Alerts
     anomalies = serializers.ListField(child=serializers.DictField())
+
+
+# ============ FAST READ PATH ============
+
+class ValuesSerializer:
+    """
+    Read-only stand-in for a ModelSerializer on large list pages and exports.
+
+    Rows come from queryset.values_list() with the joins the serializer needs
+    and are mapped straight to dicts through the serializer's own fields, so
+    the output matches `serializer.data` (including ?fields=) without building
+    a model instance per row. Understands model fields, related ids,
+    get_FOO_display, `relation.field` and `relation.get_full_name` sources;
+    anything else raises ImproperlyConfigured when the serializer is wrapped.
+    """
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.lookups = []
+        self.columns = []  # (name, row -> value, positions that omit the field when None)
+        model = serializer.Meta.model
+        for name, field in serializer.fields.items():
+            if not field.write_only:
+                self.columns.append((name, *self._column(model, field)))
+
+    def _position(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def _represent(self, field, position):
+        def represent(row):
+            value = row[position]
+            return None if value is None else field.to_representation(value)
+        return represent
+
+    def _column(self, model, field):
+        try:
+            return self._lookup_column(model, field)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                f"{type(self.serializer).__name__}.{field.field_name}: source '{field.source}' "
+                f"isn't supported by ValuesSerializer"
+            )
+
+    def _lookup_column(self, model, field):
+        *relations, attr = field.source.split('.')
+        # DRF skips a dotted source when a relation on the way is empty
+        guards = [self._position('__'.join(relations[:depth + 1])) for depth in range(len(relations))]
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        prefix = ''.join(f'{relation}__' for relation in relations)
+
+        if attr == 'get_full_name' and relations:
+            first, last = self._position(f'{prefix}first_name'), self._position(f'{prefix}last_name')
+            return (lambda row: f'{row[first]} {row[last]}'.strip()), guards
+
+        if attr.startswith('get_') and attr.endswith('_display'):
+            model_field = model._meta.get_field(attr[len('get_'):-len('_display')])
+            labels = {value: force_str(label) for value, label in model_field.flatchoices}
+            position = self._position(prefix + model_field.name)
+            return (lambda row: labels.get(row[position], row[position])), guards
+
+        model_field = model._meta.get_field(attr)
+        position = self._position(prefix + attr)
+        if model_field.is_relation:
+            # PrimaryKeyRelatedField renders the related id as is
+            return (lambda row: row[position]), guards
+        if isinstance(model_field, models.FileField):
+            # FileField/ImageField render a URL from the stored name
+            return (lambda row: field.to_representation(model_field.attr_class(None, model_field, row[position]))), guards
+        return self._represent(field, position), guards
+
+    @property
+    def field_names(self):
+        return [name for name, _, _ in self.columns]
+
+    def rows(self, queryset):
+        """The queryset as value tuples for to_representation()."""
+        return queryset.values_list(*self.lookups)
+
+    def to_representation(self, row):
+        data = {}
+        for name, value, guards in self.columns:
+            for position in guards:
+                if row[position] is None:
+                    break
+            else:
+                data[name] = value(row)
+        return data
+
+    def represent(self, rows):
+        return [self.to_representation(row) for row in rows]
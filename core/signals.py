@@ -1,6 +1,13 @@
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import SystemEvent
+from bookings.models import RoomType, Room
+from finance.models import ExpenseCategory
+from inventory.models import Category, Vendor, Product
+from .auth import forget_cached_user
+from .cache import invalidate, table_group
+from .models import SystemEvent, User
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
@@ -23,3 +30,32 @@ def log_user_logout(sender, request, user, **kwargs):
             description=f"User {user.username} logged out",
             request=request
         )
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    # Again on commit, in case a concurrent request re-cached the old row meanwhile
+    forget_cached_user(instance.pk)
+    transaction.on_commit(lambda: forget_cached_user(instance.pk))
+
+
+# Per-table change counters behind the ETags of the reference endpoints
+# (core.views.ConditionalGetMixin). Bumped again on commit, so a reader that
+# saw the new version before the commit can't pin it to the old rows.
+def bump_table(sender, **kwargs):
+    group = table_group(sender)
+    invalidate(group)
+    transaction.on_commit(lambda: invalidate(group))
+
+
+def bump_room_counts(sender, created=False, update_fields=None, **kwargs):
+    # Room types show a room count; state changes save with update_fields and don't affect it
+    if created or update_fields is None or 'room_type' in update_fields:
+        bump_table(sender)
+
+
+for model in [RoomType, ExpenseCategory, Category, Vendor, Product]:
+    post_save.connect(bump_table, sender=model, dispatch_uid=f'bump-table-{model._meta.label}')
+    post_delete.connect(bump_table, sender=model, dispatch_uid=f'bump-table-{model._meta.label}')
+post_save.connect(bump_room_counts, sender=Room, dispatch_uid='bump-table-rooms')
+post_delete.connect(bump_table, sender=Room, dispatch_uid='bump-table-rooms')
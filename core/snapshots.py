@@ -0,0 +1,223 @@
+"""
+Incremental analytics snapshots for Mayor K. Guest Palace.
+
+Each dataset is appended to a directory of date-partitioned files:
+
+    <SNAPSHOT_DIR>/transactions/date=2025-03-14/part-20250315T020000-0001.parquet
+
+Only rows whose watermark column moved past the previous run's watermark
+are read (one range query per dataset, streamed in chunks), so a run costs
+what changed since the last one. Rows that change after being exported
+(bookings, verified transactions) are appended again in a later file, so
+readers keep the last copy of each `id`:
+
+    df = pd.read_parquet('snapshots/bookings')
+    df = df.sort_values('snapshot_at').drop_duplicates('id', keep='last')
+
+Parquet needs pyarrow. The csv format writes gzipped CSV in the same layout
+for machines without it.
+"""
+import csv
+import gzip
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from bookings.models import Booking
+from core.db import replica_reads, stream_queryset
+from core.models import SystemEvent
+from finance.models import Transaction
+from inventory.models import Order, StockLog
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional: only the parquet format needs it
+    pyarrow = None
+
+STATE_FILE = '_state.json'
+
+
+class Dataset:
+    """
+    A model exported as a snapshot dataset.
+    `watermarks`: columns whose change re-exports a row; the first orders the read.
+    `partition_by`: date column (or datetime, taken in local time) the files are split by.
+    """
+
+    def __init__(self, model, watermarks, partition_by):
+        self.model = model
+        self.watermarks = watermarks
+        self.partition_by = partition_by
+        self.columns = [f.attname for f in model._meta.concrete_fields]
+
+    def model_field(self, column):
+        return next(f for f in self.model._meta.concrete_fields if column in (f.attname, f.name))
+
+
+DATASETS = {
+    'bookings': Dataset(Booking, ['updated_at'], 'check_in_date'),
+    'transactions': Dataset(Transaction, ['created_at', 'verified_at'], 'created_at'),
+    'orders': Dataset(Order, ['created_at'], 'created_at'),
+    'stock_logs': Dataset(StockLog, ['created_at'], 'created_at'),
+    'events': Dataset(SystemEvent, ['created_at'], 'created_at'),
+}
+
+
+# ---------- state ----------
+
+def load_state(directory):
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_state(directory, state):
+    # Written to a temp file and swapped in, so a crash never leaves it half-written
+    path = os.path.join(directory, STATE_FILE)
+    with open(f'{path}.tmp', 'w') as handle:
+        json.dump(state, handle, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+# ---------- writers ----------
+
+def _cell(model_field, value):
+    if value is None:
+        return None
+    if isinstance(model_field, models.JSONField):
+        return json.dumps(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _arrow_type(model_field):
+    if model_field.is_relation:
+        model_field = model_field.target_field
+    if isinstance(model_field, models.DecimalField):
+        return pyarrow.decimal128(model_field.max_digits, model_field.decimal_places)
+    if isinstance(model_field, models.DateTimeField):
+        return pyarrow.timestamp('us', tz='UTC')
+    if isinstance(model_field, models.DateField):
+        return pyarrow.date32()
+    if isinstance(model_field, models.TimeField):
+        return pyarrow.time64('us')
+    if isinstance(model_field, models.BooleanField):
+        return pyarrow.bool_()
+    if isinstance(model_field, (models.IntegerField, models.AutoField)):
+        return pyarrow.int64()
+    return pyarrow.string()
+
+
+class ParquetWriter:
+    extension = 'parquet'
+
+    def __init__(self, dataset):
+        self.schema = pyarrow.schema(
+            [(column, _arrow_type(dataset.model_field(column))) for column in dataset.columns]
+            + [('snapshot_at', pyarrow.timestamp('us', tz='UTC'))]
+        )
+
+    def write(self, path, columns):
+        pyarrow.parquet.write_table(pyarrow.table(columns, schema=self.schema), path, compression='zstd')
+
+
+class CSVWriter:
+    extension = 'csv.gz'
+
+    def __init__(self, dataset):
+        self.header = dataset.columns + ['snapshot_at']
+
+    def write(self, path, columns):
+        with gzip.open(path, 'wt', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(self.header)
+            writer.writerows(zip(*(columns[name] for name in self.header)))
+
+
+WRITERS = {'parquet': ParquetWriter, 'csv': CSVWriter}
+
+
+# ---------- export ----------
+
+def changed_rows(dataset, since, until):
+    """Rows whose watermark columns moved into (since, until], oldest first."""
+    window = Q()
+    for column in dataset.watermarks:
+        bounds = {f'{column}__lte': until}
+        if since is not None:
+            bounds[f'{column}__gt'] = since
+        window |= Q(**bounds)
+    return dataset.model.objects.filter(window).order_by(dataset.watermarks[0], 'pk').values_list(*dataset.columns)
+
+
+def export_dataset(name, directory, writer_class, batch_size=50000, lag=timedelta(seconds=60), state=None):
+    """
+    Append the rows of dataset `name` that changed since its watermark and
+    advance the watermark. Rows newer than now - `lag` wait for the next run,
+    so transactions still in flight can't commit behind the watermark.
+    Returns a summary dict.
+    """
+    dataset = DATASETS[name]
+    os.makedirs(directory, exist_ok=True)
+    state = load_state(directory) if state is None else state
+    since = state.get(name, {}).get('watermark')
+    since = parse_datetime(since) if since else None
+    until = timezone.now() - lag
+    run = timezone.now().strftime('%Y%m%dT%H%M%S')
+
+    writer = writer_class(dataset)
+    model_fields = [dataset.model_field(column) for column in dataset.columns]
+    partition_index = dataset.columns.index(dataset.partition_by)
+    partition_is_datetime = isinstance(model_fields[partition_index], models.DateTimeField)
+
+    buffers = defaultdict(lambda: defaultdict(list))
+    summary = {'rows': 0, 'files': 0, 'partitions': set()}
+    buffered = 0
+
+    def flush():
+        for day, columns in buffers.items():
+            folder = os.path.join(directory, name, f'date={day}')
+            os.makedirs(folder, exist_ok=True)
+            summary['files'] += 1
+            writer.write(os.path.join(folder, f"part-{run}-{summary['files']:04d}.{writer.extension}"), columns)
+            summary['partitions'].add(day)
+        buffers.clear()
+
+    # Reads go to the replica when one is configured
+    with replica_reads():
+        queryset = changed_rows(dataset, since, until)
+        for row in stream_queryset(queryset.using(queryset.db)):
+            day = row[partition_index]
+            if partition_is_datetime:
+                day = timezone.localtime(day).date()
+            columns = buffers[day.isoformat()]
+            for column, model_field, value in zip(dataset.columns, model_fields, row):
+                columns[column].append(_cell(model_field, value))
+            columns['snapshot_at'].append(until)
+            buffered += 1
+            if buffered >= batch_size:
+                flush()
+                summary['rows'] += buffered
+                buffered = 0
+    flush()
+    summary['rows'] += buffered
+
+    state[name] = {
+        'watermark': until.isoformat(),
+        'rows': state.get(name, {}).get('rows', 0) + summary['rows'],
+        'last_run': run,
+    }
+    save_state(directory, state)
+    summary['partitions'] = len(summary['partitions'])
+    return summary
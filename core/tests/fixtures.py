@@ -0,0 +1,215 @@
+"""
+Shared test dataset for Mayor K. Guest Palace.
+
+Builds a small but realistic hotel: every staff role, a full floor of rooms,
+repeat guests, bookings in every state, ledger entries, bar orders, stock
+movements, expenses, shifts and audit events. Sizes are chosen so every list
+endpoint returns a full page (PAGE_SIZE rows), which is what makes an N+1 in a
+serializer show up as a blown query budget.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from core.models import User, SystemEvent, WorkShift
+from bookings.models import RoomType, Room, Guest, Booking, Folio, RoomStateTransition
+from finance.models import Transaction, ExpenseCategory, Expense
+from inventory.models import Category, Vendor, Product, StockLog, Order, OrderItem
+
+DATASET_SIZE = 30  # > PAGE_SIZE so list pages are always full
+PASSWORD = 'test123'
+
+
+def seed_dataset(size=DATASET_SIZE, seed=42):
+    """
+    Populate the database and return a dict of the objects tests need.
+    Deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    users = {}
+    for role in User.Role.values:
+        user = User(
+            username=role.lower(),
+            role=role,
+            first_name=role.title(),
+            last_name='Tester',
+            email=f'{role.lower()}@mayork.local',
+        )
+        user.set_password(PASSWORD)
+        user.save()
+        users[role] = user
+    staff = list(users.values())
+    reception = users[User.Role.RECEPTIONIST]
+
+    # Rooms
+    standard = RoomType.objects.create(
+        name='Standard', base_rate_short_rest=Decimal('5000.00'),
+        base_rate_overnight=Decimal('15000.00'), amenities=['AC', 'TV'],
+    )
+    deluxe = RoomType.objects.create(
+        name='Deluxe', base_rate_short_rest=Decimal('8000.00'),
+        base_rate_overnight=Decimal('25000.00'), base_rate_lodge=Decimal('150000.00'),
+        amenities=['AC', 'TV', 'WiFi'],
+    )
+    rooms = Room.objects.bulk_create([
+        Room(
+            room_number=str(101 + i),
+            room_type=standard if i % 3 else deluxe,
+            floor=1 + i // 10,
+        )
+        for i in range(size)
+    ])
+
+    guests = Guest.objects.bulk_create([
+        Guest(guest_code=f'GST-{i + 1:04d}', name=f'Guest {i + 1}', phone=f'0801{i:07d}')
+        for i in range(size)
+    ])
+
+    # Bookings: half checked in (occupying their room), the rest spread over history
+    bookings = []
+    occupied = []
+    for i in range(size * 2):
+        room = rooms[i % size]
+        rate = room.room_type.base_rate_overnight
+        checked_in = i < size // 2
+        check_in = now - timedelta(days=0 if checked_in else rng.randint(1, 60))
+        bookings.append(Booking(
+            booking_ref=f'MK-T{i:07d}',
+            guest=guests[i % size],
+            room=room,
+            stay_type=Booking.StayType.OVERNIGHT,
+            status=Booking.Status.CHECKED_IN if checked_in else Booking.Status.CHECKED_OUT,
+            check_in_date=check_in.date(),
+            check_in_time=check_in.time(),
+            expected_checkout=check_in + timedelta(days=1),
+            actual_checkout=None if checked_in else check_in + timedelta(days=1),
+            room_rate=rate,
+            total_amount=rate,
+            amount_paid=rate,
+            created_by=reception,
+        ))
+        if checked_in:
+            room.current_state = Room.State.OCCUPIED
+            occupied.append(room)
+    Booking.objects.bulk_create(bookings)
+    Room.objects.bulk_update(occupied, ['current_state'])
+    # Guest stats as Booking.check_out() leaves them
+    for booking in bookings:
+        if booking.status == Booking.Status.CHECKED_OUT:
+            booking.guest.total_stays += 1
+            booking.guest.total_spent += booking.amount_paid
+    Guest.objects.bulk_update(guests, ['total_stays', 'total_spent'])
+
+    transactions = Transaction.objects.bulk_create([
+        Transaction(
+            transaction_ref=f'TXN-T{i:07d}',
+            booking=booking,
+            transaction_type=Transaction.Type.PAYMENT,
+            payment_method=rng.choice([Transaction.Method.CASH, Transaction.Method.TRANSFER, Transaction.Method.POS]),
+            amount=booking.amount_paid,
+            processed_by=reception,
+        )
+        for i, booking in enumerate(bookings)
+    ])
+
+    RoomStateTransition.objects.bulk_create([
+        RoomStateTransition(room=room, from_state=Room.State.AVAILABLE,
+                            to_state=Room.State.OCCUPIED, transitioned_by=reception)
+        for room in occupied
+    ])
+
+    # Bar
+    drinks = Category.objects.create(name='Drinks')
+    vendor_list = Vendor.objects.bulk_create([
+        Vendor(name=f'Vendor {i + 1}', phone=f'0702{i:07d}') for i in range(size)
+    ])
+    products = Product.objects.bulk_create([
+        Product(
+            name=f'Product {i + 1}', category=drinks, preferred_vendor=vendor_list[i],
+            price=Decimal('500.00'), cost_price=Decimal('300.00'), quantity=100,
+        )
+        for i in range(size)
+    ])
+    stock_logs = StockLog.objects.bulk_create([
+        StockLog(product=product, action='RESTOCK', quantity_change=100,
+                 old_quantity=0, new_quantity=100, user=reception)
+        for product in products
+    ])
+    orders = Order.objects.bulk_create([
+        Order(
+            reference=f'BAR-T{i:05d}',
+            user=users[User.Role.BAR_STAFF],
+            booking=bookings[i] if i < size // 2 else None,
+            total_amount=Decimal('1000.00'),
+            payment_method='ROOM_CHARGE' if i < size // 2 else 'CASH',
+            status='PAID',
+        )
+        for i in range(size)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=products[(i + j) % size], quantity=1,
+                  unit_price=Decimal('500.00'), total_price=Decimal('500.00'))
+        for i, order in enumerate(orders)
+        for j in range(2)
+    ])
+
+    # Finance
+    categories = ExpenseCategory.objects.bulk_create([
+        ExpenseCategory(name=name) for name in ['Maintenance', 'Utilities', 'Supplies', 'Fuel']
+    ])
+    expenses = Expense.objects.bulk_create([
+        Expense(
+            expense_ref=f'EXP-T{i:05d}',
+            category=categories[i % len(categories)],
+            description=f'Expense {i + 1}',
+            amount=Decimal(rng.choice([15000, 45000, 120000])),
+            status=Expense.Status.PENDING if i % 2 else Expense.Status.APPROVED,
+            logged_by=reception,
+            approved_by=None if i % 2 else users[User.Role.MANAGER],
+            expense_date=(now - timedelta(days=i)).date(),
+        )
+        for i in range(size)
+    ])
+
+    shifts = WorkShift.objects.bulk_create([
+        WorkShift(user=staff[i % len(staff)], status=WorkShift.Status.CLOSED,
+                  end_time=now, closing_balance=Decimal('0.00'))
+        for i in range(size)
+    ])
+
+    events = SystemEvent.objects.bulk_create([
+        SystemEvent(
+            event_type='BOOKING_QUICK_CREATED',
+            event_category=SystemEvent.EventCategory.BOOKING,
+            actor=staff[i % len(staff)],
+            actor_role=staff[i % len(staff)].role,
+            target_table='bookings',
+            target_id=bookings[i].pk,
+            payload={'booking_ref': bookings[i].booking_ref},
+        )
+        for i in range(size)
+    ])
+
+    Folio.rebuild()  # bulk_create skips the postings that keep folios current
+
+    return {
+        'users': users,
+        'room_types': [standard, deluxe],
+        'rooms': rooms,
+        'guests': guests,
+        'bookings': bookings,
+        'transactions': transactions,
+        'categories': [drinks],
+        'vendors': vendor_list,
+        'products': products,
+        'stock_logs': stock_logs,
+        'orders': orders,
+        'expense_categories': categories,
+        'expenses': expenses,
+        'shifts': shifts,
+        'events': events,
+    }
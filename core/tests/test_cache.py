@@ -0,0 +1,62 @@
+"""
+Tests for the named caches and the group-versioned cache helpers.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from config.caches import caches_from_url
+from core.cache import cache_get, cache_set, cache_get_or_set, invalidate, make_key, group_version
+from core.throttling import UserRateThrottle
+
+
+class CacheConfigurationTests(SimpleTestCase):
+
+    def test_every_named_cache_is_configured(self):
+        self.assertEqual(set(settings.CACHES), {'default', 'throttle', 'sessions', 'reports'})
+
+    def test_backends_from_url(self):
+        redis = caches_from_url('redis://cache:6379/1')
+        self.assertEqual(redis['throttle']['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+        self.assertEqual(redis['throttle']['KEY_PREFIX'], 'throttle')
+        files = caches_from_url('file:///var/cache/mayork')
+        self.assertEqual(files['reports']['LOCATION'], '/var/cache/mayork/reports')
+        with self.assertRaises(ValueError):
+            caches_from_url('memcached://localhost')
+
+    def test_throttles_use_the_throttle_cache(self):
+        self.assertIs(UserRateThrottle.cache, caches['throttle'])
+
+
+class GroupCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        caches['reports'].clear()
+
+    def test_invalidating_a_group_drops_only_its_keys(self):
+        cache_set('rooms', make_key('board', 'floor', 1), 'rooms v1')
+        cache_set('products', 'catalog', 'products v1')
+
+        invalidate('rooms')
+
+        self.assertIsNone(cache_get('rooms', make_key('board', 'floor', 1)))
+        self.assertEqual(cache_get('products', 'catalog'), 'products v1')
+
+    def test_get_or_set_computes_once_per_version(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(cache_get_or_set('dashboard', 'stats', compute), 1)
+        self.assertEqual(cache_get_or_set('dashboard', 'stats', compute), 1)
+        invalidate('dashboard')
+        self.assertEqual(cache_get_or_set('dashboard', 'stats', compute), 2)
+
+    def test_lost_version_does_not_revive_old_entries(self):
+        cache_set('rooms', 'board', 'stale')
+        caches['reports'].delete('cache-group:rooms')  # evicted
+
+        self.assertIsNone(cache_get('rooms', 'board'))
+        self.assertIsInstance(group_version('rooms'), int)
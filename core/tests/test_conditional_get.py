@@ -0,0 +1,84 @@
+"""
+Tests for ETag / Last-Modified on the reference-data endpoints.
+"""
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils.http import http_date
+
+from bookings.models import RoomType, Room
+from core.models import User
+from inventory.models import Category, Product
+
+API = '/api/v1'
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user(username='manager', password='test123', role=User.Role.MANAGER)
+        cls.room_type = RoomType.objects.create(
+            name='Standard', base_rate_short_rest=Decimal('5000'), base_rate_overnight=Decimal('15000')
+        )
+        cls.drinks = Category.objects.create(name='Drinks')
+        cls.product = Product.objects.create(name='Malt', category=cls.drinks, price=Decimal('800'), quantity=20)
+
+    def setUp(self):
+        caches['throttle'].clear()
+        caches['sessions'].clear()
+        self.client.force_login(self.manager)
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_resource_is_not_modified_without_queries(self):
+        for url in [f'{API}/room-types/', f'{API}/expense-categories/', f'{API}/inventory/categories/',
+                    f'{API}/inventory/vendors/', f'{API}/inventory/products/',
+                    f'{API}/inventory/products/{self.product.pk}/']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+
+                with self.assertNumQueries(0):
+                    again = self.revalidate(url, response)
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again['ETag'], response['ETag'])
+                self.assertEqual(again.content, b'')
+
+    def test_change_to_the_table_or_a_joined_table_changes_the_etag(self):
+        url = f'{API}/inventory/products/'
+        response = self.client.get(url)
+
+        self.drinks.name = 'Soft Drinks'
+        self.drinks.save()
+        changed = self.revalidate(url, response)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['results'][0]['category_name'], 'Soft Drinks')
+
+        self.assertEqual(self.revalidate(url, changed).status_code, 304)
+
+    def test_room_count_changes_but_room_state_does_not(self):
+        url = f'{API}/room-types/'
+        response = self.client.get(url)
+
+        room = Room.objects.create(room_number='101', room_type=self.room_type, floor=1)
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['room_count'], 1)
+
+        room.change_state(Room.State.OCCUPIED, self.manager)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+    def test_if_modified_since(self):
+        url = f'{API}/inventory/categories/'
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(0)).status_code, 200)
+
+    def test_writes_are_not_conditional(self):
+        response = self.client.post(f'{API}/inventory/categories/', {'name': 'Snacks'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,107 @@
+"""
+Tests for bulk expense approval and rejection.
+"""
+import itertools
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import SystemEvent, User
+from core.tests.utils import QueryBudgetTestCase
+from finance import expenses, periods
+from finance.models import Expense
+
+API = '/api/v1'
+REFS = itertools.count()
+
+
+class ExpenseReviewTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = self.data['users'][User.Role.MANAGER]
+
+    def expense(self, amount='20000.00', day=None, **kwargs):
+        return Expense.objects.create(
+            expense_ref=f'EXP-R{next(REFS):05d}', category=self.data['expense_categories'][0], description='Diesel', amount=Decimal(amount),
+            logged_by=self.data['users'][User.Role.RECEPTIONIST], expense_date=day or timezone.localdate(), **kwargs,
+        )
+
+    def review(self, ids, action='approve', **data):
+        return self.client.post(f'{API}/expenses/review/', {
+            'ids': [str(pk) for pk in ids], 'action': action, **data,
+        }, content_type='application/json')
+
+    def test_approves_in_constant_queries(self):
+        small = [self.expense() for _ in range(3)]
+        with CaptureQueriesContext(connection) as ctx:
+            expenses.review([e.pk for e in small], self.manager, expenses.APPROVE)
+        few = len(ctx.captured_queries)
+        many = [self.expense() for _ in range(30)]
+        with CaptureQueriesContext(connection) as ctx:
+            results = expenses.review([e.pk for e in many], self.manager, expenses.APPROVE)
+        self.assertEqual(len(ctx.captured_queries), few)
+        self.assertTrue(all(result['ok'] for result in results))
+
+        self.assertEqual(Expense.objects.filter(pk__in=[e.pk for e in many + small],
+                                                status=Expense.Status.APPROVED, approved_by=self.manager).count(), 33)
+        events = SystemEvent.objects.filter(event_type='EXPENSE_APPROVED', target_id__in=[e.pk for e in many])
+        self.assertEqual(events.count(), 30)
+        self.assertEqual(events.first().actor_role, User.Role.MANAGER)
+
+    def test_per_item_results(self):
+        self.client.force_login(self.manager)
+        ok = self.expense()
+        large = self.expense('150000.00')
+        done = self.expense(status=Expense.Status.APPROVED)
+        missing = uuid.uuid4()
+
+        response = self.review([ok.pk, large.pk, done.pk, missing])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['processed'], body['skipped']), (1, 3))
+        results = {result['id']: result for result in body['results']}
+        self.assertEqual(results[str(ok.pk)]['status'], 'APPROVED')
+        self.assertIn('₦100,000.00', results[str(large.pk)]['error'])
+        self.assertEqual(results[str(large.pk)]['status'], 'PENDING')
+        self.assertEqual(results[str(done.pk)]['error'], 'Only pending expenses can be approved')
+        self.assertEqual(results[str(missing)]['error'], 'Expense not found')
+
+        large.refresh_from_db()
+        self.assertEqual(large.status, Expense.Status.PENDING)
+        # An admin is not limited
+        self.client.force_login(self.data['users'][User.Role.ADMIN])
+        self.assertEqual(self.review([large.pk]).json()['processed'], 1)
+
+    def test_reject_needs_a_reason(self):
+        pending = [self.expense(), self.expense('150000.00')]
+        self.assertEqual(self.review([e.pk for e in pending], 'reject').status_code, 400)
+
+        self.client.force_login(self.manager)
+        body = self.review([e.pk for e in pending], 'reject', reason='Duplicate receipts').json()
+        self.assertEqual(body['processed'], 2)  # the approval limit doesn't apply to rejections
+        self.assertEqual(set(Expense.objects.filter(pk__in=[e.pk for e in pending])
+                             .values_list('status', 'rejection_reason')),
+                         {(Expense.Status.REJECTED, 'Duplicate receipts')})
+        self.assertEqual(SystemEvent.objects.filter(event_type='EXPENSE_REJECTED').count(), 2)
+
+    def test_closed_periods_are_skipped(self):
+        month = periods.month_start(timezone.localdate().replace(day=1) - timedelta(days=80))
+        periods.close_period(month, self.data['users'][User.Role.ADMIN])
+        # A pending row left in the closed month (written around Expense.save)
+        old = self.expense()
+        Expense.objects.filter(pk=old.pk).update(expense_date=month + timedelta(days=3))
+
+        result = self.review([old.pk]).json()['results'][0]
+        self.assertFalse(result['ok'])
+        self.assertIn('closed accounting period', result['error'])
+        old.refresh_from_db()
+        self.assertEqual(old.status, Expense.Status.PENDING)
+
+    def test_permissions(self):
+        self.client.force_login(self.data['users'][User.Role.RECEPTIONIST])
+        self.assertEqual(self.review([self.expense().pk]).status_code, 403)
@@ -0,0 +1,64 @@
+"""
+Tests for the streaming CSV / JSON-lines exports.
+"""
+import csv
+import io
+import json
+from unittest import mock
+
+from django.http import StreamingHttpResponse
+
+from core import exports
+from core.models import SystemEvent
+from core.tests.utils import QueryBudgetTestCase
+from finance.models import Transaction, Expense
+
+API = '/api/v1'
+
+
+class ExportTests(QueryBudgetTestCase):
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, getattr(response, 'content', b''))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_has_every_row_and_the_list_columns(self):
+        response, body = self.export(f'{API}/transactions/export/')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="transactions-', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), Transaction.objects.count())
+        listed = self.client.get(f'{API}/transactions/').json()['results'][0]
+        self.assertEqual(list(rows[0]), list(listed))
+        exported = next(row for row in rows if row['id'] == listed['id'])
+        self.assertEqual(exported['amount'], listed['amount'])
+        self.assertEqual(exported['method_display'], listed['method_display'])
+
+    def test_jsonl_rows_match_the_list_view_with_its_filters(self):
+        query = 'status=CONFIRMED&ordering=-amount'
+        _, body = self.export(f'{API}/transactions/export/?as=jsonl&{query}')
+        rows = [json.loads(line) for line in body.splitlines()]
+
+        self.assertEqual(len(rows), Transaction.objects.filter(status='CONFIRMED').count())
+        self.assertEqual(rows[:20], self.client.get(f'{API}/transactions/?{query}').json()['results'])
+
+    def test_fields_pick_columns(self):
+        _, body = self.export(f'{API}/expenses/export/?fields=expense_ref,amount,category_name')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), Expense.objects.count())
+        self.assertEqual(list(rows[0]), ['expense_ref', 'category_name', 'amount'])  # serializer order
+
+    def test_events_export_streams_in_batches(self):
+        with mock.patch.object(exports, 'BATCH_SIZE', 7):
+            chunks = list(self.client.get(f'{API}/events/export/?as=jsonl').streaming_content)
+        self.assertEqual(len(chunks), -(-SystemEvent.objects.count() // 7))
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get(f'{API}/events/export/?as=xlsx').status_code, 400)
+
+    def test_events_export_is_manager_only(self):
+        self.client.force_login(self.data['users']['RECEPTIONIST'])
+        self.assertEqual(self.client.get(f'{API}/events/export/').status_code, 403)
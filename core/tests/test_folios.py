@@ -0,0 +1,118 @@
+"""
+Tests for the materialized booking folios.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking, Folio, Room
+from core.tests.utils import QueryBudgetTestCase
+from finance.models import Transaction
+from inventory.models import Order
+
+API = '/api/v1'
+COLUMNS = ['room_charges', 'extension_charges', 'bar_charges', 'discount',
+           'payments', 'refunds', 'corrections', 'balance']
+
+
+class FolioTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.booking = Booking.objects.get(pk=self.data['bookings'][0].pk)  # checked in
+
+    def folio(self, booking=None):
+        return Folio.objects.get(pk=(booking or self.booking).pk)
+
+    def assertMatchesRebuild(self, booking):
+        posted = self.folio(booking)
+        Folio.rebuild([booking.pk])
+        rebuilt = self.folio(booking)
+        self.assertEqual([getattr(posted, c) for c in COLUMNS], [getattr(rebuilt, c) for c in COLUMNS])
+
+    def test_postings_keep_the_folio_current(self):
+        opening = self.folio()
+        response = self.client.post(f'{API}/bookings/{self.booking.pk}/extend/', {'type': 'NIGHTS', 'units': 1},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        rate = self.booking.room.room_type.base_rate_overnight
+
+        product = self.data['products'][0]
+        response = self.client.post(f'{API}/inventory/orders/', {
+            'payment_method': 'ROOM_CHARGE', 'booking': str(self.booking.pk),
+            'items_data': [{'product_id': str(product.pk), 'quantity': 3}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        Transaction.objects.create(
+            booking=self.booking, transaction_type=Transaction.Type.PAYMENT,
+            payment_method=Transaction.Method.CASH, amount=Decimal('4000.00'),
+        )
+
+        folio = self.folio()
+        self.assertEqual(folio.extension_charges, rate)
+        self.assertEqual(folio.bar_charges, opening.bar_charges + Decimal('1500.00'))
+        self.assertEqual(folio.balance, opening.balance + rate + Decimal('1500.00') - Decimal('4000.00'))
+        self.assertEqual(folio.paid, Booking.objects.get(pk=self.booking.pk).amount_paid)
+        self.assertMatchesRebuild(self.booking)
+
+        Order.objects.get(pk=response.json()['id']).delete()
+        self.assertEqual(self.folio().bar_charges, opening.bar_charges)
+
+    def test_quick_book_opens_a_folio(self):
+        room = Room.objects.filter(current_state=Room.State.AVAILABLE).first()
+        response = self.client.post(f'{API}/bookings/quick_book/', {
+            'guest_name': 'Walk In', 'guest_phone': '08099999998', 'room_id': str(room.pk),
+            'stay_type': Booking.StayType.OVERNIGHT, 'payment_method': Transaction.Method.CASH,
+            'amount_paid': '5000.00',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+
+        booking = Booking.objects.get(pk=response.json()['id'])
+        self.assertEqual(self.folio(booking).balance, booking.total_amount - Decimal('5000.00'))
+        self.assertEqual(Decimal(response.json()['balance_due']), self.folio(booking).balance)
+        self.assertMatchesRebuild(booking)
+
+    def test_editing_charges_resyncs(self):
+        response = self.client.patch(f'{API}/bookings/{self.booking.pk}/', {'discount_amount': '2000.00'},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.folio().discount, Decimal('2000.00'))
+        self.assertMatchesRebuild(self.booking)
+
+    def test_missing_folio_is_rebuilt_by_the_next_posting(self):
+        paid = self.folio().payments
+        Folio.objects.filter(pk=self.booking.pk).delete()
+        Transaction.objects.create(
+            booking=self.booking, transaction_type=Transaction.Type.PAYMENT,
+            payment_method=Transaction.Method.CASH, amount=Decimal('1000.00'),
+        )
+        self.assertEqual(self.folio().payments, paid + Decimal('1000.00'))
+
+    def test_balance_is_one_row_read(self):
+        self.client.get(f'{API}/users/me/')  # warm the session
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'{API}/bookings/{self.booking.pk}/balance/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()['balance']), self.folio().balance)
+        folio_reads = [q for q in ctx.captured_queries if 'booking_folios' in q['sql']]
+        self.assertEqual(len(folio_reads), 1)
+        self.assertNotIn('JOIN', folio_reads[0]['sql'])
+
+    def test_outstanding_report_uses_the_partial_index(self):
+        owing = [self.data['bookings'][i] for i in (1, 2)]
+        Folio.objects.filter(pk=owing[0].pk).update(balance=Decimal('800000.00'))
+        Folio.objects.filter(pk=owing[1].pk).update(balance=Decimal('900000.00'))
+
+        response = self.client.get(f'{API}/bookings/outstanding/')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([row['booking'] for row in results[:2]], [str(owing[1].pk), str(owing[0].pk)])
+        self.assertTrue(all(Decimal(row['balance']) > 0 for row in results))
+
+        if connection.vendor == 'sqlite':
+            sql, params = Folio.objects.filter(balance__gt=0).order_by('-balance').query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = ' '.join(str(row) for row in cursor.fetchall())
+            self.assertIn('folio_outstanding_idx', plan)
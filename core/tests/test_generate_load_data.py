@@ -0,0 +1,51 @@
+"""
+generate_load_data must produce a ledger that reconciles.
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum, OuterRef, Subquery
+from django.test import TestCase
+
+from bookings.models import Booking, Guest
+from core.models import SystemEvent
+from finance.models import Transaction
+from inventory.models import Product, StockLog
+
+
+class GenerateLoadDataTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_load_data', rooms=6, years=0.05, bookings_per_day=8,
+            bar_orders_per_day=10, products=5, seed=7, stdout=StringIO(),
+        )
+
+    def test_generates_history(self):
+        self.assertGreater(Booking.objects.count(), 100)
+        self.assertGreater(Transaction.objects.count(), Booking.objects.count())
+        self.assertGreater(SystemEvent.objects.count(), Booking.objects.count())
+        # Timestamps are backdated, not all stamped at insert time
+        self.assertGreater(Booking.objects.dates('created_at', 'day').count(), 10)
+
+    def test_amount_paid_matches_ledger(self):
+        ledger = Transaction.objects.filter(
+            booking=OuterRef('pk'),
+            status=Transaction.Status.CONFIRMED,
+            transaction_type__in=[Transaction.Type.PAYMENT, Transaction.Type.CORRECTION],
+        ).values('booking').annotate(total=Sum('amount')).values('total')
+        mismatched = Booking.objects.exclude(amount_paid=Subquery(ledger))
+        self.assertFalse(mismatched.exists())
+
+    def test_guest_totals_match_bookings(self):
+        for guest in Guest.objects.filter(total_stays__gt=0)[:20]:
+            checked_out = guest.bookings.filter(status=Booking.Status.CHECKED_OUT)
+            self.assertEqual(guest.total_stays, checked_out.count())
+            self.assertEqual(guest.total_spent, checked_out.aggregate(total=Sum('amount_paid'))['total'])
+
+    def test_product_quantity_matches_latest_stock_log(self):
+        for product in Product.objects.all():
+            latest = StockLog.objects.filter(product=product).order_by('-created_at').first()
+            self.assertIsNotNone(latest)
+            self.assertEqual(product.quantity, latest.new_quantity)
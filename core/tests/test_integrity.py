@@ -0,0 +1,77 @@
+"""
+Tests for the set-based integrity checks and the verify_integrity command.
+"""
+import io
+import json
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking, Folio, Guest
+from core.cache import group_version, table_group
+from core.integrity import CHECKS, run_check, verify
+from core.models import SystemEvent
+from core.tests.utils import QueryBudgetTestCase
+from inventory.models import Product
+
+
+class IntegrityTests(QueryBudgetTestCase):
+
+    def break_things(self):
+        bookings = self.data['bookings']
+        Booking.objects.filter(pk=bookings[0].pk).update(amount_paid=Decimal('1.00'))
+        Folio.objects.filter(pk=bookings[1].pk).update(payments=Decimal('0.00'))
+        Folio.objects.filter(pk=bookings[2].pk).delete()
+        Guest.objects.filter(pk=self.data['guests'][0].pk).update(total_stays=99)
+        Product.objects.filter(pk=self.data['products'][0].pk).update(quantity=-5)
+        return bookings
+
+    def test_seeded_data_is_consistent(self):
+        self.assertEqual({r['check']: r['mismatches'] for r in verify()}, dict.fromkeys(CHECKS, 0))
+
+    def test_each_check_is_one_query(self):
+        self.break_things()
+        for check in CHECKS.values():
+            with CaptureQueriesContext(connection) as ctx:
+                report = run_check(check)
+            self.assertEqual(len(ctx.captured_queries), 1, check.name)
+            self.assertEqual(report['mismatches'], 1, check.name)
+
+    def test_reports_what_disagrees(self):
+        bookings = self.break_things()
+        reports = {r['check']: r for r in verify()}
+
+        row = reports['booking_payments']['sample'][0]
+        self.assertEqual(row['label'], bookings[0].booking_ref)
+        self.assertEqual(row['amount_paid'], '1.00')
+        self.assertEqual(Decimal(row['expected_amount_paid']), bookings[0].total_amount)
+        self.assertEqual(reports['folio_missing']['sample'][0]['label'], bookings[2].booking_ref)
+        self.assertEqual(reports['product_stock']['sample'][0]['expected_quantity'], 100)
+
+    def test_repair_recomputes_and_logs(self):
+        self.break_things()
+        products = group_version(table_group(Product))
+        reports = verify(repair=True)
+
+        self.assertTrue(all(r['remaining'] == 0 for r in reports if r['mismatches']))
+        self.assertEqual({r['check']: r['mismatches'] for r in verify()}, dict.fromkeys(CHECKS, 0))
+        repaired = [r['check'] for r in reports if r['mismatches']]
+        self.assertIn('booking_payments', repaired)
+        # The repaired stock level reaches cached product lists and ETags
+        self.assertGreater(group_version(table_group(Product)), products)
+        self.assertEqual(SystemEvent.objects.filter(event_type='INTEGRITY_REPAIRED').count(), len(repaired))
+
+    def test_command(self):
+        self.break_things()
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('verify_integrity', '--checks', 'booking_payments', 'product_stock', stdout=stdout, stderr=stderr)
+        report = json.loads(stdout.getvalue())
+        self.assertEqual([r['check'] for r in report], ['booking_payments', 'product_stock'])
+        self.assertIn('booking_payments', stderr.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('verify_integrity', '--fail-on-mismatch', stdout=io.StringIO(), stderr=io.StringIO())
+        call_command('verify_integrity', '--repair', '--fail-on-mismatch', stdout=io.StringIO(), stderr=io.StringIO())
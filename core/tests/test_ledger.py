@@ -0,0 +1,157 @@
+"""
+Tests for the insert-only ledger and its booking balance update.
+"""
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking, Room
+from core.models import SystemEvent, User
+from core.tests.utils import QueryBudgetTestCase
+from finance.models import Transaction
+
+API = '/api/v1'
+
+
+def statements(ctx):
+    """Captured SQL without the savepoint bookkeeping of atomic()."""
+    return [
+        query['sql'].split()[0].upper() for query in ctx.captured_queries
+        if 'SAVEPOINT' not in query['sql'].upper()
+    ]
+
+
+class LedgerTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.booking = self.data['bookings'][0]
+        self.booking.refresh_from_db()
+
+    def test_payment_is_one_insert_and_balance_updates(self):
+        paid = self.booking.amount_paid
+        with CaptureQueriesContext(connection) as ctx:
+            self.record('2500.00', processed_by=None)  # no shift takings to update
+
+        self.assertEqual(statements(ctx), ['INSERT', 'UPDATE', 'UPDATE'])  # entry, amount_paid, folio
+        self.assertEqual(self.booking.amount_paid, paid + Decimal('2500.00'))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.amount_paid, paid + Decimal('2500.00'))
+
+    def test_stale_instances_do_not_lose_payments(self):
+        paid = self.booking.amount_paid
+        first = Booking.objects.get(pk=self.booking.pk)
+        second = Booking.objects.get(pk=self.booking.pk)
+        self.record('1000.00', booking=first)
+        self.record('1500.00', booking=second)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.amount_paid, paid + Decimal('2500.00'))
+
+    def test_corrections_post_and_pending_payments_do_not(self):
+        paid = self.booking.amount_paid
+        original = self.record('4000.00')
+        self.record('9999.00', status=Transaction.Status.PENDING)
+        Transaction.create_correction(original, 'Wrong amount', self.data['users']['ADMIN'])
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.amount_paid, paid)
+
+    def test_saving_an_existing_entry_is_refused_without_a_query(self):
+        entry = self.record('500.00')
+        entry.amount = Decimal('5.00')
+        with CaptureQueriesContext(connection) as ctx, self.assertRaises(ValidationError):
+            entry.save()
+        self.assertEqual(ctx.captured_queries, [])
+
+    def test_database_rejects_raw_updates_of_ledger_fields(self):
+        entry = self.record('500.00')
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            Transaction.objects.filter(pk=entry.pk).update(amount=Decimal('5.00'))
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            Transaction.objects.filter(pk=entry.pk).update(status=Transaction.Status.FAILED)
+        self.assertEqual(Transaction.objects.get(pk=entry.pk).amount, Decimal('500.00'))
+
+    def test_database_allows_verifying_a_pending_entry(self):
+        entry = self.record('500.00', status=Transaction.Status.PENDING)
+        Transaction.objects.filter(pk=entry.pk).update(
+            status=Transaction.Status.CONFIRMED,
+            verified_by=self.data['users']['ADMIN'],
+            verification_notes='Seen on statement',
+        )
+        self.assertEqual(Transaction.objects.get(pk=entry.pk).status, Transaction.Status.CONFIRMED)
+
+    def test_quick_book_counts_the_payment_once(self):
+        room = Room.objects.filter(current_state=Room.State.AVAILABLE).first()
+        response = self.client.post(f'{API}/bookings/quick_book/', {
+            'guest_name': 'Walk In', 'guest_phone': '08099999999', 'room_id': str(room.pk),
+            'stay_type': Booking.StayType.OVERNIGHT, 'payment_method': Transaction.Method.CASH,
+            'amount_paid': '15000.00',
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Decimal(response.json()['amount_paid']), Decimal('15000.00'))
+        booking = Booking.objects.get(pk=response.json()['id'])
+        self.assertEqual(booking.amount_paid, Decimal('15000.00'))
+
+
+class LedgerBatchTests(QueryBudgetTestCase):
+
+    def entry(self, booking, amount, transaction_type=Transaction.Type.PAYMENT, **extra):
+        return {
+            'booking': str(booking.pk), 'transaction_type': transaction_type,
+            'payment_method': Transaction.Method.POS, 'amount': amount, **extra,
+        }
+
+    def post(self, entries, **body):
+        return self.client.post(f'{API}/transactions/post_batch/', {'entries': entries, **body},
+                                content_type='application/json')
+
+    def test_batch_posts_every_entry_with_one_balance_update(self):
+        bookings = self.data['bookings'][:3]
+        before = {b.pk: Booking.objects.get(pk=b.pk).amount_paid for b in bookings}
+        entries = [self.entry(b, '1000.00') for b in bookings for _ in range(20)]
+        entries.append(self.entry(bookings[0], '300.00', Transaction.Type.REFUND))
+        entries.append(self.entry(bookings[1], '-200.00', Transaction.Type.CORRECTION,
+                                  correction_reason='Duplicate swipe'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post(entries, source='POS settlement')
+        self.assertEqual(response.status_code, 201, response.content)
+
+        booking_updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "bookings"')]
+        self.assertEqual(len(booking_updates), 1)
+        # auth, two existence checks, chunked bulk INSERTs, the UPDATE and the event
+        self.assertLessEqual(len(ctx.captured_queries), 12)
+        self.assertEqual(response.json()['posted'], 62)
+        self.assertEqual(response.json()['bookings_updated'], 3)
+
+        expected = {bookings[0].pk: Decimal('19700.00'), bookings[1].pk: Decimal('19800.00'),
+                    bookings[2].pk: Decimal('20000.00')}
+        for booking in Booking.objects.filter(pk__in=expected):
+            self.assertEqual(booking.amount_paid, before[booking.pk] + expected[booking.pk])
+
+        event = SystemEvent.objects.get(pk=response.json()['event'])
+        self.assertEqual(event.event_type, 'LEDGER_BATCH_POSTED')
+        self.assertEqual(event.payload['totals']['PAYMENT'], '60000.00')
+        self.assertEqual(event.payload['source'], 'POS settlement')
+
+    def test_one_bad_entry_rejects_the_batch(self):
+        booking = self.data['bookings'][0]
+        count = Transaction.objects.count()
+        response = self.post([
+            self.entry(booking, '1000.00'),
+            self.entry(booking, '-5.00'),
+            self.entry(booking, '10.00', Transaction.Type.CORRECTION),
+            {**self.entry(booking, '1.00'), 'booking': '00000000-0000-0000-0000-000000000000'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['entries']), {'1', '2', '3'})
+        self.assertEqual(Transaction.objects.count(), count)
+
+    def test_managers_only(self):
+        self.client.force_login(self.data['users'][User.Role.RECEPTIONIST])
+        response = self.post([self.entry(self.data['bookings'][0], '1000.00')])
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,148 @@
+"""
+Tests for closing accounting periods, their snapshots and the period lock.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from core.models import SystemEvent, User
+from core.tests.utils import QueryBudgetTestCase
+from finance import periods
+from finance.models import AccountingPeriod, Expense, PeriodSnapshot, Transaction
+
+API = '/api/v1'
+Dimension = PeriodSnapshot.Dimension
+
+
+class AccountingPeriodTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        this_month = timezone.localdate().replace(day=1)
+        # Three months back: older than anything pending in the seeded data
+        self.month = periods.month_start(this_month - timedelta(days=80))
+        self.key = self.month.strftime('%Y-%m')
+        self.booking = self.data['bookings'][0]
+        self.admin = self.data['users'][User.Role.ADMIN]
+
+    def at(self, day):
+        return datetime.combine(day, time(12), tzinfo=timezone.get_current_timezone())
+
+    def backdate(self, amount, method=Transaction.Method.CASH, day=None, **kwargs):
+        # created_at is immutable, so post the entry with the clock turned back
+        with mock.patch('django.utils.timezone.now', return_value=self.at(day or self.month + timedelta(days=4))):
+            return self.record(amount, method, **kwargs)
+
+    def expense(self, day, **kwargs):
+        fields = {'status': Expense.Status.APPROVED, 'amount': Decimal('20000.00')} | kwargs
+        return Expense.objects.create(
+            category=self.data['expense_categories'][0], description='Generator repair',
+            logged_by=self.admin, expense_date=day, **fields,
+        )
+
+    def test_close_freezes_the_live_aggregates(self):
+        self.backdate('10000.00', split_details={'cash': 4000, 'transfer': 6000}, method=Transaction.Method.SPLIT)
+        self.backdate('2500.00', Transaction.Method.POS, day=self.month + timedelta(days=9))
+        self.expense(self.month + timedelta(days=2))
+        live = {dimension: periods.aggregate(self.month, dimension) for dimension in Dimension.values}
+
+        period = periods.close_period(self.key, self.admin)
+
+        frozen = {dimension: {} for dimension in Dimension.values}
+        for dimension, key, amount in period.snapshots.values_list('dimension', 'key', 'amount'):
+            frozen[dimension][key] = amount
+        self.assertEqual(frozen, live)
+        self.assertEqual(frozen[Dimension.METHOD], {
+            'CASH': Decimal('4000.00'), 'TRANSFER': Decimal('6000.00'), 'POS': Decimal('2500.00'),
+        })
+        self.assertEqual(len(frozen[Dimension.DAY]), 2)
+        self.assertEqual(sum(frozen[Dimension.CATEGORY].values()), Decimal('20000.00'))
+        self.assertEqual(AccountingPeriod.locked_until(), periods.next_month(self.month) - timedelta(days=1))
+        self.assertTrue(SystemEvent.objects.filter(event_type='PERIOD_CLOSED').exists())
+
+    def test_close_rules(self):
+        with self.assertRaises(ValidationError):
+            periods.close_period(timezone.localdate(), self.admin)  # still running
+        pending = self.expense(self.month, status=Expense.Status.PENDING)
+        with self.assertRaisesMessage(ValidationError, '1 pending expenses'):
+            periods.close_period(self.month, self.admin)
+        pending.delete()
+
+        periods.close_period(self.month, self.admin)
+        with self.assertRaises(ValidationError):
+            periods.close_period(self.month, self.admin)  # already closed
+        self.assertEqual(AccountingPeriod.objects.count(), 1)
+
+    def test_closed_months_are_locked_for_expenses(self):
+        expense = self.expense(self.month + timedelta(days=3))
+        periods.close_period(self.month, self.admin)
+
+        with self.assertRaises(ValidationError):
+            self.expense(self.month + timedelta(days=5))
+        with self.assertRaises(ValidationError):
+            expense.delete()
+        response = self.client.post(f'{API}/expenses/', {
+            'category': self.data['expense_categories'][0].pk, 'description': 'Late receipt',
+            'amount': '5000.00', 'expense_date': str(self.month + timedelta(days=1)),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expense_date', response.json())
+        response = self.client.delete(f'{API}/expenses/{expense.pk}/')
+        self.assertEqual(response.status_code, 400)
+        # The month after is open
+        self.expense(periods.next_month(self.month))
+
+    def test_report_reads_snapshots_for_closed_months(self):
+        entry = self.backdate('7000.00')
+        periods.close_period(self.month, self.admin)
+        self.backdate('3000.00', day=periods.next_month(self.month) + timedelta(days=2))
+        # Rows removed behind the period's back don't move its totals
+        Transaction.objects.filter(pk=entry.pk).delete()
+        self.assertEqual(periods.aggregate(self.month, Dimension.METHOD), {})
+
+        rows = periods.report(self.month, periods.next_month(self.month), Dimension.METHOD)
+        self.assertEqual([(r['month'], r['closed']) for r in rows], [
+            (self.key, True), (periods.next_month(self.month).strftime('%Y-%m'), False),
+        ])
+        self.assertEqual(rows[0]['totals'], {'CASH': Decimal('7000.00')})
+        self.assertEqual(rows[1]['totals'], periods.aggregate(periods.next_month(self.month), Dimension.METHOD))
+
+    def test_reopen(self):
+        period = periods.close_period(self.month, self.admin)
+        with self.assertRaises(ValidationError):
+            periods.reopen_period(period, self.admin, '')
+        periods.reopen_period(period, self.admin, 'Missed an invoice')
+        self.assertFalse(AccountingPeriod.objects.exists())
+        self.assertFalse(PeriodSnapshot.objects.exists())
+        self.expense(self.month)
+
+    def test_endpoints(self):
+        self.backdate('7000.00')
+        self.client.force_login(self.data['users'][User.Role.MANAGER])
+        response = self.client.post(f'{API}/periods/', {'month': self.key, 'notes': 'Reconciled'})
+        self.assertEqual(response.status_code, 201)
+        period_id = response.json()['id']
+        self.assertEqual(self.client.post(f'{API}/periods/', {'month': self.key}).status_code, 400)
+        self.assertEqual(self.client.post(f'{API}/periods/{period_id}/reopen/', {'reason': 'x'}).status_code, 403)
+
+        response = self.client.get(f'{API}/periods/report/', {
+            'start': self.key, 'end': self.key, 'compare': 'previous_year',
+        })
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['dimension'], 'METHOD')
+        self.assertTrue(body['months'][0]['closed'])
+        self.assertEqual(Decimal(str(body['months'][0]['totals']['CASH'])), Decimal('7000.00'))
+        self.assertEqual(len(body['previous_year']), 1)
+        self.assertFalse(body['previous_year'][0]['closed'])
+
+        self.client.force_login(self.data['users'][User.Role.RECEPTIONIST])
+        self.assertEqual(self.client.get(f'{API}/periods/report/').status_code, 403)
+        self.assertEqual(self.client.post(f'{API}/periods/', {'month': self.key}).status_code, 403)
+
+        self.client.force_login(self.admin)
+        response = self.client.post(f'{API}/periods/{period_id}/reopen/', {'reason': 'Missed an invoice'})
+        self.assertEqual(response.status_code, 204)
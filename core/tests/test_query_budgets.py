@@ -0,0 +1,52 @@
+"""
+Query and wall-time budgets for every router endpoint in core/urls.py.
+
+Each list budget is fixed regardless of page size, so a serializer field that
+issues a query per row (an N+1) blows the budget on the seeded page of 20.
+"""
+from core.tests.utils import QueryBudgetTestCase
+
+API = '/api/v1'
+
+
+class CoreEndpointQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_users(self):
+        self.assertQueryBudget(f'{API}/users/', 5)
+        self.assertQueryBudget(f"{API}/users/{self.data['users']['MANAGER'].pk}/", 4)
+
+    def test_events(self):
+        self.assertQueryBudget(f'{API}/events/', 5)
+        self.assertQueryBudget(f"{API}/events/{self.data['events'][0].pk}/", 4)
+
+    def test_room_types(self):
+        self.assertQueryBudget(f'{API}/room-types/', 5)
+        self.assertQueryBudget(f"{API}/room-types/{self.data['room_types'][0].pk}/", 4)
+
+    def test_rooms(self):
+        self.assertQueryBudget(f'{API}/rooms/', 6)
+        self.assertQueryBudget(f"{API}/rooms/{self.data['rooms'][0].pk}/", 5)
+
+    def test_guests(self):
+        self.assertQueryBudget(f'{API}/guests/', 5)
+        self.assertQueryBudget(f"{API}/guests/{self.data['guests'][0].pk}/", 4)
+
+    def test_bookings(self):
+        self.assertQueryBudget(f'{API}/bookings/', 5)
+        self.assertQueryBudget(f"{API}/bookings/{self.data['bookings'][0].pk}/", 4)
+
+    def test_transactions(self):
+        self.assertQueryBudget(f'{API}/transactions/', 5)
+        self.assertQueryBudget(f"{API}/transactions/{self.data['transactions'][0].pk}/", 4)
+
+    def test_expense_categories(self):
+        self.assertQueryBudget(f'{API}/expense-categories/', 5)
+        self.assertQueryBudget(f"{API}/expense-categories/{self.data['expense_categories'][0].pk}/", 4)
+
+    def test_expenses(self):
+        self.assertQueryBudget(f'{API}/expenses/', 5)
+        self.assertQueryBudget(f"{API}/expenses/{self.data['expenses'][0].pk}/", 4)
+
+    def test_shifts(self):
+        self.assertQueryBudget(f'{API}/shifts/', 5)
+        self.assertQueryBudget(f"{API}/shifts/{self.data['shifts'][0].pk}/", 4)
@@ -0,0 +1,126 @@
+"""
+Tests for bank statement / POS settlement reconciliation.
+"""
+import io
+import json
+import tempfile
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.models import Booking, Folio
+from core.models import SystemEvent, User
+from core.tests.utils import QueryBudgetTestCase
+from finance.models import Transaction
+from finance.reconciliation import parse_statement, reconcile
+
+API = '/api/v1'
+
+
+class ReconciliationTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.data['users'][self.role]
+        self.booking = self.data['bookings'][0]
+        self.today = timezone.localdate().isoformat()
+
+    def pending(self, amount, method=Transaction.Method.TRANSFER, **kwargs):
+        return self.record(amount, method, status=Transaction.Status.AWAITING_TRANSFER, **kwargs)
+
+    def statement(self, *rows):
+        header = 'Transaction Date,Narration,Debit,Credit\n'
+        return header + ''.join(f'{date},{ref},,"{amount}"\n' for date, ref, amount in rows)
+
+    def test_parses_common_layouts(self):
+        lines, rejected = parse_statement(
+            'Value Date,Description,Debit,Credit\n'
+            '19/10/2026,NIP TRF FROM ADA,,"₦25,000.00"\n'
+            '2026-10-19,CHARGES,50.00,\n'
+            'yesterday,???,,100\n'
+        )
+        self.assertEqual([(line.date.isoformat(), line.amount) for line in lines],
+                         [('2026-10-19', Decimal('25000.00'))])
+        self.assertEqual(rejected, [(4, 'Unreadable date or amount')])
+
+    def test_matches_by_reference_then_unique_amount(self):
+        named = self.pending('15000.00', external_ref='PSK-77812')
+        twin = self.pending('15000.00')
+        unique = self.pending('22500.00')
+        self.pending('9000.00')
+        self.pending('9000.00')
+
+        report = reconcile(self.statement(
+            (self.today, '9000 transfer', '9000'),          # two candidates: ambiguous
+            (self.today, 'NIP/psk 77812/ADA', '15,000.00'),  # names `named`
+            (self.today, 'TRF FROM OBI', '22500'),
+            (self.today, 'TRF FROM EZE', '15000'),           # `twin` is the only one left
+            (self.today, 'TRF', '1234'),
+        ), actor=self.user)
+
+        self.assertEqual((report['matched'], report['confirmed'], report['unmatched_count']), (3, 3, 2))
+        self.assertEqual({m['transaction_ref']: m['matched_on'] for m in report['matches']}, {
+            named.transaction_ref: 'reference', unique.transaction_ref: 'amount', twin.transaction_ref: 'amount',
+        })
+        confirmed = Transaction.objects.filter(status=Transaction.Status.CONFIRMED, verified_by=self.user)
+        self.assertEqual(set(confirmed.values_list('pk', flat=True)), {named.pk, twin.pk, unique.pk})
+        self.assertIn('by reference', Transaction.objects.get(pk=named.pk).verification_notes)
+        self.assertEqual(SystemEvent.objects.filter(event_type='STATEMENT_RECONCILED').count(), 1)
+
+    def test_confirming_posts_to_the_booking_and_folio(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        folio = Folio.objects.get(pk=booking.pk)
+        entries = [self.pending(f'{1000 + i}.00') for i in range(20)]
+        total = sum(entry.amount for entry in entries)
+
+        csv = self.statement(*[(self.today, '', str(entry.amount)) for entry in entries])
+        with CaptureQueriesContext(connection) as ctx:
+            report = reconcile(csv, actor=self.user)
+        self.assertEqual(report['confirmed'], 20)
+        self.assertLessEqual(len(ctx.captured_queries), 12)
+
+        self.assertEqual(Booking.objects.get(pk=booking.pk).amount_paid, booking.amount_paid + total)
+        self.assertEqual(Folio.objects.get(pk=booking.pk).payments, folio.payments + total)
+
+    def test_date_window_dry_run_and_reruns(self):
+        entry = self.pending('5000.00')
+        far = (timezone.localdate() + timezone.timedelta(days=5)).isoformat()
+        self.assertEqual(reconcile(self.statement((far, '', '5000')), actor=self.user)['matched'], 0)
+
+        csv = self.statement((self.today, '', '5000'))
+        self.assertEqual(reconcile(csv, actor=self.user, dry_run=True)['confirmed'], 0)
+        self.assertEqual(Transaction.objects.get(pk=entry.pk).status, Transaction.Status.AWAITING_TRANSFER)
+        self.assertEqual(reconcile(csv, actor=self.user, payment_methods=['POS'])['matched'], 0)
+
+        self.assertEqual(reconcile(csv, actor=self.user)['confirmed'], 1)
+        self.assertEqual(reconcile(csv, actor=self.user)['matched'], 0)  # nothing pending any more
+
+    def test_endpoint(self):
+        entry = self.pending('7000.00', method=Transaction.Method.POS)
+        upload = SimpleUploadedFile('settlement.csv', self.statement((self.today, 'RRN 000123', '7000')).encode())
+        response = self.client.post(f'{API}/transactions/reconcile/', {'file': upload, 'payment_methods': ['POS']})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['confirmed'], 1)
+        self.assertEqual(Transaction.objects.get(pk=entry.pk).status, Transaction.Status.CONFIRMED)
+
+        bad = SimpleUploadedFile('bad.csv', b'foo,bar\n1,2\n')
+        response = self.client.post(f'{API}/transactions/reconcile/', {'file': bad})
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_login(self.data['users'][User.Role.RECEPTIONIST])
+        upload = SimpleUploadedFile('s.csv', b'date,amount\n2026-01-01,1\n')
+        self.assertEqual(self.client.post(f'{API}/transactions/reconcile/', {'file': upload}).status_code, 403)
+
+    def test_command(self):
+        self.pending('3000.00')
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as handle:
+            handle.write(self.statement((self.today, '', '3000')))
+            handle.flush()
+            call_command('reconcile_statement', handle.name, '--dry-run', stdout=stdout, stderr=stderr)
+        self.assertEqual(json.loads(stdout.getvalue())['matched'], 1)
+        self.assertIn('1 matched', stderr.getvalue())
@@ -0,0 +1,66 @@
+"""
+The orjson-backed renderer and parser must behave exactly like DRF's.
+"""
+import io
+import uuid
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+SAMPLE = {
+    'id': uuid.UUID('6f1c2d7e-8a4b-4c3d-9e2f-1a2b3c4d5e6f'),
+    'amount': Decimal('15000.50'),
+    'created_at': datetime(2026, 1, 5, 14, 30, 15, 123456, tzinfo=dt_timezone.utc),
+    'check_in_date': date(2026, 1, 5),
+    'check_in_time': time(14, 30, 15, 987654),
+    'label': gettext_lazy('Cash'),
+    'errors': [ErrorDetail('Room not found.', code='invalid')],
+    'name': 'Ọmọ́   guest',
+    'nested': [{'count': 3, 'ratio': 0.25, 'flag': None}],
+    7: 'non-string key',
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_output_matches_drf_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE))
+
+    def test_indented_output_matches_drf_renderer(self):
+        media_type = 'application/json; indent=2'
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE, media_type), JSONRenderer().render(SAMPLE, media_type)
+        )
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE))
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        data = {'big': 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def parse(self, body):
+        return FastJSONParser().parse(io.BytesIO(body), 'application/json', {})
+
+    def test_parses_like_drf_parser(self):
+        body = '{"guest_name": "Ọmọ́", "amount_paid": "15000.00", "items": [{"quantity": 2}]}'.encode()
+        self.assertEqual(self.parse(body), JSONParser().parse(io.BytesIO(body), 'application/json', {}))
+
+    def test_rejects_invalid_json_and_nan(self):
+        for body in [b'{"a": ', b'{"a": NaN}']:
+            with self.assertRaises(ParseError):
+                self.parse(body)
@@ -0,0 +1,72 @@
+"""
+Read-replica routing, exercised with a second test database as the replica.
+"""
+import copy
+
+from django.core.cache import cache
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test import TestCase, override_settings
+
+from core.db import ReplicaRouter, replica_reads
+from core.models import User, SystemEvent
+
+API = '/api/v1'
+REPLICA = 'test_replica'
+
+
+def add_replica_alias():
+    """
+    Register a second database standing in for the replica. The test runner
+    creates and migrates it like any other alias listed in `databases`, and we
+    can tell which database served a read by what it contains.
+    """
+    if REPLICA in connections.settings:
+        return
+    replica = copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+    if replica['ENGINE'] == 'django.db.backends.sqlite3':
+        replica['TEST'].update(NAME=None, MIRROR=None)  # a separate in-memory database
+    else:
+        replica['TEST'].update(NAME=f"test_{replica['NAME']}_replica", MIRROR=None)
+    connections.settings[REPLICA] = replica
+
+
+add_replica_alias()
+
+
+@override_settings(REPLICA_DATABASE_ALIAS=REPLICA)
+class ReplicaRoutingTests(TestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='admin', role=User.Role.ADMIN)
+        self.client.force_login(self.user)
+        SystemEvent.objects.create(event_type='ON_PRIMARY', event_category=SystemEvent.EventCategory.SYSTEM)
+        SystemEvent.objects.using(REPLICA).create(
+            event_type='ON_REPLICA', event_category=SystemEvent.EventCategory.SYSTEM
+        )
+
+    def event_types(self):
+        response = self.client.get(f'{API}/events/')
+        self.assertEqual(response.status_code, 200)
+        return {event['event_type'] for event in response.json()['results']}
+
+    def test_reporting_reads_are_served_by_the_replica(self):
+        self.assertEqual(self.event_types(), {'ON_REPLICA'})
+
+    def test_user_who_just_wrote_reads_from_the_primary(self):
+        response = self.client.post(f'{API}/expense-categories/', {'name': 'Diesel'})
+        self.assertEqual(response.status_code, 201)
+
+        self.assertIn('ON_PRIMARY', self.event_types())
+
+    def test_other_views_read_from_the_primary(self):
+        response = self.client.get(f'{API}/users/')
+        self.assertEqual([user['username'] for user in response.json()['results']], ['admin'])
+
+    def test_writes_go_to_the_primary_even_inside_replica_reads(self):
+        router = ReplicaRouter()
+        with replica_reads():
+            self.assertEqual(router.db_for_read(SystemEvent), REPLICA)
+            self.assertEqual(router.db_for_write(SystemEvent), DEFAULT_DB_ALIAS)
+        self.assertIsNone(router.db_for_read(SystemEvent))
@@ -0,0 +1,71 @@
+"""
+Tests for cached sessions and the cached request user.
+"""
+import time
+from unittest import mock, skipUnless
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+
+from core import auth
+from core.models import User
+
+API = '/api/v1'
+
+
+class CachedUserTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='test123', role=User.Role.ADMIN)
+        cls.clerk = User.objects.create_user(username='clerk', password='test123', role=User.Role.RECEPTIONIST)
+
+    def setUp(self):
+        caches['sessions'].clear()
+        caches['throttle'].clear()
+        self.client.force_login(self.clerk)
+        self.admin_client = self.client_class()
+        self.admin_client.force_login(self.admin)
+
+    def me(self):
+        return self.client.get(f'{API}/users/me/')
+
+    def test_steady_state_request_skips_session_and_user_queries(self):
+        self.assertEqual(self.me().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.me()
+        self.assertEqual(response.json()['username'], 'clerk')
+
+    def test_deactivation_takes_effect_on_next_request(self):
+        self.me()
+        response = self.admin_client.post(f'{API}/users/{self.clerk.pk}/activate/', {'is_active': False})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.me().status_code, 403)
+
+    def test_password_reset_ends_existing_sessions(self):
+        self.me()
+        response = self.admin_client.post(f'{API}/users/{self.clerk.pk}/reset_password/', {'password': 'n3w-secret'})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.me().status_code, 403)
+
+    def test_role_change_is_seen_immediately(self):
+        self.me()
+        response = self.admin_client.patch(
+            f'{API}/users/{self.clerk.pk}/', {'role': User.Role.MANAGER}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.me().json()['role'], User.Role.MANAGER)
+
+    @skipUnless(isinstance(caches['sessions'], LocMemCache), 'advances the locmem clock')
+    def test_cached_user_expires_without_a_signal(self):
+        self.me()
+        User.objects.filter(pk=self.clerk.pk).update(is_active=False)  # no post_save
+        self.assertEqual(self.me().status_code, 200)
+
+        clock = mock.Mock(time=mock.Mock(return_value=time.time() + auth.USER_CACHE_TIMEOUT + 1))
+        with mock.patch('django.core.cache.backends.locmem.time', clock):
+            self.assertEqual(self.me().status_code, 403)
@@ -0,0 +1,72 @@
+"""
+Tests for shift running totals and the shift close report.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import User, WorkShift
+from core.tests.utils import QueryBudgetTestCase
+from finance.models import Transaction
+
+API = '/api/v1'
+
+
+class ShiftTotalsTests(QueryBudgetTestCase):
+    role = User.Role.RECEPTIONIST
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.data['users'][self.role]
+        response = self.client.post(f'{API}/shifts/', {'opening_balance': '20000.00'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.shift = WorkShift.objects.get(pk=response.json()['id'])
+
+    def test_ledger_entries_accumulate_by_method(self):
+        self.record('5000.00')
+        self.record('7000.00', Transaction.Method.TRANSFER)
+        self.record('1500.00', transaction_type=Transaction.Type.REFUND)
+        self.record('3000.00', Transaction.Method.POS, status=Transaction.Status.PENDING)
+        self.record('10000.00', Transaction.Method.SPLIT, split_details={'cash': 4000, 'pos': 6000})
+        self.record('9000.00', processed_by=self.data['users'][User.Role.MANAGER])  # not this shift
+
+        self.shift.refresh_from_db()
+        self.assertEqual(self.shift.method_totals, {
+            'CASH': Decimal('7500.00'), 'TRANSFER': Decimal('7000.00'), 'POS': Decimal('6000.00'),
+            'PAYSTACK': Decimal('0.00'), 'OTHER': Decimal('0.00'),
+        })
+
+    def test_cash_bar_orders_count(self):
+        product = self.data['products'][0]
+        response = self.client.post(f'{API}/inventory/orders/', {
+            'payment_method': 'CASH', 'items_data': [{'product_id': str(product.pk), 'quantity': 2}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+
+        self.shift.refresh_from_db()
+        self.assertEqual(self.shift.system_cash_total, Decimal('1000.00'))
+
+    def test_end_shift_reports_from_the_counters(self):
+        stale = WorkShift.objects.get(pk=self.shift.pk)
+        self.record('5000.00')
+        self.record('2000.00', Transaction.Method.POS)
+        stale.close(Decimal('24000.00'))  # must not write back the totals it read
+        self.assertEqual(stale.system_cash_total, Decimal('5000.00'))
+
+        shift = WorkShift.objects.create(user=self.user, opening_balance=Decimal('1000.00'))
+        self.record('3000.00')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'{API}/shifts/{shift.pk}/end_shift/', {'closing_balance': '3900.00'},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "transactions"' in q['sql']])
+
+        report = response.json()
+        self.assertEqual(Decimal(report['method_totals']['CASH']), Decimal('3000.00'))
+        self.assertEqual(Decimal(report['discrepancy']), Decimal('-100.00'))
+
+    def test_only_one_open_shift(self):
+        response = self.client.post(f'{API}/shifts/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,65 @@
+"""
+Tests for ?fields= / ?expand= on the core serializers.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.tests.utils import QueryBudgetTestCase
+
+API = '/api/v1'
+
+
+class SparseFieldsetTests(QueryBudgetTestCase):
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, ' '.join(query['sql'] for query in ctx.captured_queries)
+
+    def test_fields_limits_the_representation(self):
+        response, _ = self.get(f'{API}/bookings/?fields=id,booking_ref,room_number')
+        for row in response.json()['results']:
+            self.assertEqual(set(row), {'id', 'booking_ref', 'room_number'})
+
+    def test_unrequested_balances_are_not_joined(self):
+        _, sql = self.get(f'{API}/bookings/?fields=id,booking_ref,room_number')
+        self.assertNotIn('booking_folios', sql)
+        self.assertNotIn('"guests"', sql)
+
+        response, sql = self.get(f'{API}/bookings/?fields=id,balance_due')
+        self.assertIn('booking_folios', sql)
+        self.assertNotIn('inventory_order', sql)
+        self.assertIn('balance_due', response.json()['results'][0])
+
+    def test_unrequested_guest_stats_are_not_computed(self):
+        _, sql = self.get(f'{API}/guests/?fields=id,name,phone')
+        self.assertNotIn('"bookings"', sql)
+
+        response, sql = self.get(f'{API}/guests/?fields=id,total_stays')
+        self.assertIn('"bookings"', sql)
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'total_stays'})
+
+    def test_unrequested_active_booking_info_is_not_prefetched(self):
+        _, sql = self.get(f'{API}/rooms/?fields=id,room_number,current_state')
+        self.assertNotIn('"bookings"', sql)
+
+    def test_expand_nests_related_objects_without_extra_queries(self):
+        self.assertQueryBudget(f'{API}/transactions/?expand=booking,processed_by', 5)
+        response, _ = self.get(f'{API}/transactions/?fields=id,amount&expand=booking')
+        row = response.json()['results'][0]
+        self.assertEqual(set(row), {'id', 'amount', 'booking'})
+        self.assertEqual(set(row['booking']), {'id', 'booking_ref', 'guest_name', 'room_number', 'status'})
+
+        self.assertQueryBudget(f'{API}/bookings/?expand=guest,room,created_by', 5)
+
+    def test_unknown_names_are_ignored(self):
+        response, _ = self.get(f'{API}/events/?fields=id,nope&expand=payload')
+        self.assertEqual(set(response.json()['results'][0]), {'id'})
+
+    def test_writes_ignore_the_parameters(self):
+        guest = self.data['guests'][0]
+        response = self.client.patch(f'{API}/guests/{guest.pk}/?fields=id', {'notes': 'VIP'},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('notes', response.json())
@@ -0,0 +1,77 @@
+"""
+Tests for the values-based list path (ValuesSerializer / ValuesListMixin).
+"""
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from core.models import SystemEvent
+from core.serializers import (
+    ValuesSerializer, TransactionSerializer, SystemEventSerializer, BookingSerializer
+)
+from core.tests.fixtures import seed_dataset
+from core.tests.utils import QueryBudgetTestCase
+from finance.models import Transaction
+
+API = '/api/v1'
+
+
+def render(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+class ValuesSerializerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset()
+        # Empty relations: DRF leaves out dotted fields like booking_ref / actor_name
+        Transaction.objects.create(
+            transaction_ref='TXN-ORPHAN', transaction_type=Transaction.Type.PAYMENT,
+            payment_method=Transaction.Method.CASH, amount=Decimal('1500.5'),
+        )
+        SystemEvent.log('SYSTEM_TICK', SystemEvent.EventCategory.SYSTEM, payload={'ok': True})
+
+    def assertMatchesModelSerializer(self, serializer_class, queryset, **kwargs):
+        fast = ValuesSerializer(serializer_class(**kwargs))
+        expected = render(serializer_class(queryset, many=True, **kwargs).data)
+        self.assertEqual(render(fast.represent(fast.rows(queryset))), expected)
+        return expected
+
+    def test_transactions_match(self):
+        rows = self.assertMatchesModelSerializer(TransactionSerializer, Transaction.objects.all())
+        self.assertTrue(any('booking_ref' not in row for row in rows))
+
+    def test_events_match(self):
+        rows = self.assertMatchesModelSerializer(SystemEventSerializer, SystemEvent.objects.all())
+        self.assertTrue(any('actor_name' not in row for row in rows))
+
+    def test_sparse_fields_match(self):
+        self.assertMatchesModelSerializer(
+            TransactionSerializer, Transaction.objects.all(), fields=['id', 'amount', 'method_display', 'booking_ref']
+        )
+
+    def test_unsupported_sources_are_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(BookingSerializer())
+
+
+class ValuesListEndpointTests(QueryBudgetTestCase):
+
+    def test_list_pages_match_detail_representation(self):
+        for url, model, serializer_class in [
+            (f'{API}/transactions/', Transaction, TransactionSerializer),
+            (f'{API}/events/', SystemEvent, SystemEventSerializer),
+        ]:
+            with self.subTest(url=url):
+                results = self.assertQueryBudget(url, 4).json()['results']
+                objects = {str(pk): obj for pk, obj in model.objects.in_bulk([row['id'] for row in results]).items()}
+                expected = [render(serializer_class(objects[row['id']]).data) for row in results]
+                self.assertEqual(results, expected)
+
+    def test_expand_takes_the_serializer_path(self):
+        results = self.client.get(f'{API}/transactions/?expand=processed_by').json()['results']
+        self.assertIsInstance(results[0]['processed_by'], dict)
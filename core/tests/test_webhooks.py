@@ -0,0 +1,120 @@
+"""
+Tests for Paystack webhook ingestion and the batch worker, driven by the stub sender.
+"""
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking, Folio
+from core.tests.utils import QueryBudgetTestCase
+from finance.models import PaymentEvent, Transaction
+from finance.webhooks import StubSender, process_events, sign
+
+URL = '/api/v1/webhooks/paystack/'
+SECRET = 'sk_test_stub'
+
+
+@override_settings(PAYSTACK_SECRET_KEY=SECRET)
+class PaystackWebhookTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.logout()  # Paystack has no session
+        self.paystack = StubSender(SECRET, url=URL, post=StubSender.client_post(self.client))
+        self.booking = Booking.objects.get(pk=self.data['bookings'][0].pk)
+
+    def test_webhook_only_stores_the_event(self):
+        event = self.paystack.charge(self.booking.booking_ref, '25000.00')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.paystack.send(event)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json(), {'status': 'ok', 'duplicate': False})
+        writes = [q['sql'] for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('INSERT INTO "payment_events"'))
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).amount_paid, self.booking.amount_paid)
+
+    def test_retries_are_absorbed(self):
+        event = self.paystack.charge(self.booking.booking_ref, '25000.00')
+        response = self.paystack.send(event, times=5)
+        self.assertEqual(response.json()['duplicate'], True)
+        self.assertEqual(PaymentEvent.objects.count(), 1)
+
+        self.assertEqual(process_events(), {'PROCESSED': 1})
+        self.paystack.send(event)
+        self.assertEqual(process_events(), {})
+
+        payment = Transaction.objects.get(external_ref=event['data']['reference'])
+        self.assertEqual((payment.payment_method, payment.amount), ('PAYSTACK', Decimal('25000.00')))
+        self.assertEqual(PaymentEvent.objects.get().ledger_entry, payment)
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).amount_paid,
+                         self.booking.amount_paid + Decimal('25000.00'))
+
+    def test_batch_posts_once_and_sorts_out_the_rest(self):
+        bookings = self.data['bookings'][:10]
+        for index, booking in enumerate(bookings):
+            self.paystack.send(self.paystack.charge(booking.booking_ref, 1000 + index))
+        posted = self.paystack.charge(self.booking.booking_ref, '500', reference='PSK-ALREADY')
+        Transaction.objects.create(booking=self.booking, payment_method='PAYSTACK', amount=Decimal('500'),
+                                   external_ref='PSK-ALREADY')
+        self.paystack.send(posted)
+        self.paystack.send(self.paystack.charge('MKG-NOPE', '700'))
+        self.paystack.send(self.paystack.charge(self.booking.booking_ref, '700', status='failed'))
+        self.paystack.send({'event': 'transfer.success', 'data': {'reference': 'TRF-1'}})
+
+        folio = Folio.objects.get(pk=bookings[3].pk)
+        with CaptureQueriesContext(connection) as ctx:
+            counts = process_events()
+        self.assertEqual(counts, {'PROCESSED': 10, 'DUPLICATE': 1, 'FAILED': 2, 'IGNORED': 1})
+        self.assertLessEqual(len(ctx.captured_queries), 25)
+
+        self.assertEqual(Folio.objects.get(pk=bookings[3].pk).payments, folio.payments + Decimal('1003.00'))
+        self.assertEqual(Transaction.objects.filter(external_ref='PSK-ALREADY').count(), 1)
+        failed = PaymentEvent.objects.filter(status='FAILED').order_by('error')
+        self.assertEqual([event.error for event in failed], ['Booking MKG-NOPE not found', "Charge status is 'failed'"])
+        self.assertFalse(PaymentEvent.objects.filter(status='RECEIVED').exists())
+
+    def test_batches_larger_than_the_ledger_takes(self):
+        for index, booking in enumerate(self.data['bookings'][:5]):
+            self.paystack.send(self.paystack.charge(booking.booking_ref, 1000 + index))
+
+        # A ledger-wide error is nobody's fault: the batch rolls back and stays queued
+        with mock.patch('finance.webhooks.post_entries', side_effect=ValidationError('Database is read-only')), \
+                self.assertRaises(ValidationError):
+            process_events()
+        self.assertEqual(PaymentEvent.objects.filter(status='RECEIVED').count(), 5)
+
+        with mock.patch('finance.webhooks.MAX_BATCH', 2):
+            self.assertEqual(process_events(), {'PROCESSED': 5})
+        self.assertEqual(Transaction.objects.filter(payment_method='PAYSTACK').count(), 5)
+
+    def test_ledger_rejects_a_second_payment_for_a_reference(self):
+        Transaction.objects.create(booking=self.booking, payment_method='PAYSTACK', amount=Decimal('1'),
+                                   external_ref='PSK-ONCE')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Transaction.objects.create(booking=self.booking, payment_method='PAYSTACK', amount=Decimal('1'),
+                                       external_ref='PSK-ONCE')
+
+    def test_rejects_bad_deliveries(self):
+        event = self.paystack.charge(self.booking.booking_ref, '100')
+        self.assertEqual(self.paystack.send(event, signature='forged').status_code, 401)
+        response = self.client.post(URL, b'{}', content_type='application/json',
+                                    HTTP_X_PAYSTACK_SIGNATURE=sign(b'{}', SECRET))
+        self.assertEqual(response.status_code, 400)
+        with override_settings(PAYSTACK_SECRET_KEY=''):
+            self.assertEqual(self.paystack.send(event).status_code, 503)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+    def test_command(self):
+        self.paystack.send(self.paystack.charge('MKG-LATER', '100'))
+        stderr = io.StringIO()
+        call_command('process_payment_events', stderr=stderr)
+        self.assertIn('1 failed', stderr.getvalue())
+        call_command('process_payment_events', '--retry-failed', stderr=io.StringIO())
+        self.assertEqual(PaymentEvent.objects.get().status, 'FAILED')
@@ -0,0 +1,66 @@
+"""
+Query-budget assertions and fixtures shared by the API test suites.
+"""
+import time
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import User
+from core.tests.fixtures import seed_dataset
+from finance.models import Transaction
+
+# Wall-time ceiling per request. Generous on purpose: the query budget is the
+# precise N+1 guard, this only catches pathological slowdowns on CI boxes.
+DEFAULT_MAX_SECONDS = 1.0
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Seeds the shared dataset once per class and provides assertQueryBudget().
+    Requests are made as an authenticated Admin through the real session
+    middleware with cold session and user caches, so budgets include the
+    auth queries of a first request.
+    """
+    role = User.Role.ADMIN
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset()
+
+    def setUp(self):
+        caches['throttle'].clear()  # keep UserRateThrottle from tripping across tests
+        self.client.force_login(self.data['users'][self.role])
+        caches['sessions'].clear()
+
+    def record(self, amount, method=Transaction.Method.CASH, **kwargs):
+        """
+        Create a ledger entry: by default a confirmed payment on the first
+        seeded booking, processed by the logged-in user.
+        """
+        fields = {
+            'booking': self.data['bookings'][0],
+            'transaction_type': Transaction.Type.PAYMENT,
+            'status': Transaction.Status.CONFIRMED,
+            'processed_by': self.data['users'][self.role],
+        } | kwargs
+        return Transaction.objects.create(payment_method=method, amount=Decimal(amount), **fields)
+
+    def assertQueryBudget(self, url, max_queries, max_seconds=DEFAULT_MAX_SECONDS):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(response.status_code, 200, f"GET {url} -> {response.status_code}")
+        executed = len(ctx.captured_queries)
+        self.assertLessEqual(
+            executed, max_queries,
+            f"GET {url} ran {executed} queries (budget {max_queries}):\n"
+            + "\n".join(q['sql'] for q in ctx.captured_queries)
+        )
+        self.assertLess(elapsed, max_seconds, f"GET {url} took {elapsed:.3f}s (budget {max_seconds}s)")
+        return response
@@ -0,0 +1,14 @@
+"""
+Rate limiting for Mayor K. Guest Palace.
+DRF's throttles, counting requests in the dedicated `throttle` cache.
+"""
+from django.core.cache import caches
+from rest_framework import throttling
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle):
+    cache = caches['throttle']
+
+
+class UserRateThrottle(throttling.UserRateThrottle):
+    cache = caches['throttle']
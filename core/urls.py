@@ -8,7 +8,7 @@ from core.views import (
     GuestViewSet, BookingViewSet, TransactionViewSet,
     ExpenseCategoryViewSet, ExpenseViewSet,
     DashboardView, StakeholderDashboardView, AnalyticsView,
-    LoginView, LogoutView, WorkShiftViewSet
+    LoginView, LogoutView, WorkShiftViewSet, PaystackWebhookView, AccountingPeriodViewSet
 )
 
 router = DefaultRouter()
@@ -22,6 +22,7 @@ router.register(r'transactions', TransactionViewSet)
 router.register(r'expense-categories', ExpenseCategoryViewSet)
 router.register(r'expenses', ExpenseViewSet)
 router.register(r'shifts', WorkShiftViewSet)
+router.register(r'periods', AccountingPeriodViewSet)
 
 urlpatterns = [
     # ViewSet routes
@@ -36,4 +37,7 @@ urlpatterns = [
     # Authentication
     path('auth/login/', LoginView.as_view(), name='login'),
     path('auth/logout/', LogoutView.as_view(), name='logout'),
+
+    # Payment provider webhooks
+    path('webhooks/paystack/', PaystackWebhookView.as_view(), name='paystack-webhook'),
 ]
@@ -1,25 +1,40 @@
 """
 API Views for Mayor K. Guest Palace.
 """
+import hashlib
+from contextlib import ExitStack
 from decimal import Decimal
 from datetime import timedelta
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.db.models import Sum, Count, Max, Q, Prefetch
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.cache import group_state, table_group
+from core.db import replica_reads, is_pinned_to_primary
+from core.exports import FORMATS as EXPORT_FORMATS, export_response
 from core.models import User, SystemEvent, WorkShift
 from core.serializers import (
     UserSerializer, SystemEventSerializer, RoomTypeSerializer, RoomSerializer,
     RoomAvailabilitySerializer, GuestSerializer, GuestCreateSerializer,
-    BookingSerializer, QuickBookSerializer, TransactionSerializer,
+    BookingSerializer, FolioSerializer, BookingBalanceSerializer, QuickBookSerializer,
+    TransactionSerializer, LedgerBatchSerializer, StatementReconcileSerializer,
     ExpenseCategorySerializer, ExpenseSerializer, ExpenseCreateSerializer,
-    DashboardStatsSerializer, StakeholderDashboardSerializer, WorkShiftSerializer
+    ExpenseReviewSerializer, AccountingPeriodSerializer, PeriodCloseSerializer, PeriodReportSerializer,
+    DashboardStatsSerializer, StakeholderDashboardSerializer, WorkShiftSerializer,
+    ValuesSerializer, wants_fields, wants_expanded
 )
-from bookings.models import RoomType, Room, Guest, Booking, RoomStateTransition, BookingExtension
-from finance.models import Transaction, ExpenseCategory, Expense
+from bookings.models import RoomType, Room, Guest, Booking, Folio, RoomStateTransition, BookingExtension
+from finance.models import Transaction, ExpenseCategory, Expense, AccountingPeriod
+from finance.ledger import post_entries
+from finance.reconciliation import reconcile
+from finance import expenses, periods, webhooks
 from django.contrib.auth import login, logout, authenticate
 
 # ============ AUTH VIEWS ============
@@ -47,6 +62,23 @@ class LoginView(APIView):
         else:
             return Response({'error': 'Invalid credentials'}, status=400)
 
+class PaystackWebhookView(APIView):
+    """
+    Paystack webhook. Verifies the signature and stores the event, nothing
+    more; process_payment_events posts it to the ledger. Retries of a
+    stored event are acknowledged too, so Paystack stops resending.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = []
+
+    def post(self, request):
+        try:
+            created = webhooks.receive(request.body, request.META.get(webhooks.SIGNATURE_HEADER))
+        except webhooks.WebhookError as e:
+            return Response({'error': str(e)}, status=e.status)
+        return Response({'status': 'ok', 'duplicate': not created})
+
 class LogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -61,6 +93,11 @@ class IsManagerOrAdmin(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_manager_or_admin
 
 
+class IsAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.role == User.Role.ADMIN
+
+
 class IsStakeholder(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_stakeholder
@@ -71,6 +108,94 @@ class CanApproveExpenses(permissions.BasePermission):
         return request.user.is_authenticated and request.user.can_approve_expenses
 
 
+# ============ MIXINS ============
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from the read replica (when one is configured).
+    Users pinned to the primary after a recent write keep reading from it.
+    Authentication and permission checks still run against the primary.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with ExitStack() as self._replica_scope:
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS and not is_pinned_to_primary(request.user):
+            self._replica_scope.enter_context(replica_reads())
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified for reference data that rarely changes.
+    Validators come from the change counters of `change_tables` (bumped in
+    core.signals), so an unchanged GET is answered 304 before the queryset is
+    touched. Responses must be revalidated: browsers keep them, but ask first.
+    """
+    change_tables = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.not_modified(request) or super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.not_modified(request) or super().retrieve(request, *args, **kwargs)
+
+    def not_modified(self, request):
+        versions, last_modified = group_state(*(table_group(model) for model in self.change_tables))
+        digest = hashlib.md5(repr((versions, request.accepted_renderer.format)).encode()).hexdigest()
+        self._validators = (f'"{digest}"', int(last_modified))
+        return get_conditional_response(request, etag=self._validators[0], last_modified=self._validators[1])
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, '_validators', None)
+        if validators and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = validators[0]
+            response['Last-Modified'] = http_date(validators[1])
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ValuesListMixin:
+    """
+    Serve the list action from value tuples (core.serializers.ValuesSerializer)
+    instead of model instances. Same JSON; ?expand= needs the nested
+    serializers and takes the regular path.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if wants_expanded(request, *(getattr(self.get_serializer_class().Meta, 'expandable_fields', ()))):
+            return super().list(request, *args, **kwargs)
+        fast = ValuesSerializer(self.get_serializer())
+        rows = fast.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.represent(page))
+        return Response(fast.represent(rows))
+
+
+class ExportMixin:
+    """
+    GET <list>/export/?as=csv|jsonl streams every row the list view would
+    return: same filters, search and ordering, no pagination; ?fields= picks
+    the columns. See core.exports.
+    """
+    export_name = None  # file name prefix; defaults to the router basename
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        export_format = request.query_params.get('as', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"Unsupported export format '{export_format}' (use {' or '.join(EXPORT_FORMATS)})"},
+                status=400
+            )
+        fast = ValuesSerializer(self.get_serializer())
+        return export_response(fast, self.filter_queryset(self.get_queryset()), export_format, self.export_name or self.basename)
+
+
 # ============ VIEWSETS ============
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -153,25 +278,32 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Password updated successfully'})
 
 
-class SystemEventViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = SystemEvent.objects.all()
+class SystemEventViewSet(ReplicaReadMixin, ValuesListMixin, ExportMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = SystemEvent.objects.select_related('actor').all()
     serializer_class = SystemEventSerializer
+    export_name = 'events'
     permission_classes = [IsManagerOrAdmin]
     filterset_fields = ['event_category', 'event_type', 'actor']
     search_fields = ['event_type', 'target_table']
     ordering_fields = ['created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not (wants_fields(self.request, 'actor_name') or wants_expanded(self.request, 'actor')):
+            queryset = queryset.select_related(None)
+        return queryset
+
 
 class WorkShiftViewSet(viewsets.ModelViewSet):
-    queryset = WorkShift.objects.all()
+    queryset = WorkShift.objects.select_related('user').all()
     serializer_class = WorkShiftSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         # Users see their own shifts, Admins/Managers see all
         if self.request.user.role in ['ADMIN', 'MANAGER']:
-            return WorkShift.objects.all().order_by('-start_time')
-        return WorkShift.objects.filter(user=self.request.user).order_by('-start_time')
+            return self.queryset.order_by('-start_time')
+        return self.queryset.filter(user=self.request.user).order_by('-start_time')
 
     @action(detail=False, methods=['get'])
     def current(self, request):
@@ -198,6 +330,7 @@ class WorkShiftViewSet(viewsets.ModelViewSet):
         if closing_balance is None:
              return Response({'error': 'Closing balance required'}, status=400)
              
+        # The running totals were kept by the ledger during the shift; nothing to scan here
         shift.close(closing_balance=Decimal(closing_balance), notes=notes)
         
         # Log event
@@ -206,16 +339,27 @@ class WorkShiftViewSet(viewsets.ModelViewSet):
             category=SystemEvent.EventCategory.AUTH,
             actor=request.user,
             target=shift,
+            payload={
+                'method_totals': {method: str(total) for method, total in shift.method_totals.items()},
+                'discrepancy': str(shift.discrepancy),
+            },
             description=f"Shift closed. Opening: {shift.opening_balance}, Closing: {shift.closing_balance}, System: {shift.system_cash_total}"
         )
         
         return Response(WorkShiftSerializer(shift).data)
 
 
-class RoomTypeViewSet(viewsets.ModelViewSet):
+class RoomTypeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    change_tables = [RoomType, Room]
     queryset = RoomType.objects.all()
     serializer_class = RoomTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if wants_fields(self.request, 'room_count'):
+            queryset = queryset.annotate(room_total=Count('rooms'))
+        return queryset
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -255,6 +399,18 @@ class RoomViewSet(viewsets.ModelViewSet):
             return [permissions.AllowAny()]
         return super().get_permissions()
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve'] and wants_fields(self.request, 'current_booking_id', 'booking_stay_info'):
+            # RoomSerializer reads the active booking for every occupied room
+            queryset = queryset.prefetch_related(Prefetch(
+                'bookings',
+                queryset=Booking.objects.filter(status=Booking.Status.CHECKED_IN)
+                    .select_related('guest').order_by('-check_in_date', '-created_at'),
+                to_attr='active_bookings'
+            ))
+        return queryset
+    
     @action(detail=False, methods=['get'])
     def available(self, request):
         """
@@ -330,6 +486,23 @@ class GuestViewSet(viewsets.ModelViewSet):
             return GuestCreateSerializer
         return GuestSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve']:
+            # Precompute the requested GuestSerializer stats in one grouped query
+            stay_filter = Q(bookings__status__in=[Booking.Status.CHECKED_IN, Booking.Status.CHECKED_OUT])
+            stats = {}
+            if wants_fields(self.request, 'total_stays'):
+                stats['stay_count'] = Count('bookings', filter=stay_filter)
+            if wants_fields(self.request, 'total_spent'):
+                stats['amount_spent'] = Sum('bookings__amount_paid', filter=stay_filter)
+            if wants_fields(self.request, 'last_visit'):
+                stats['last_checkout'] = Max('bookings__actual_checkout', filter=Q(bookings__status=Booking.Status.CHECKED_OUT))
+                stats['last_check_in_date'] = Max('bookings__check_in_date')
+            if stats:
+                queryset = queryset.annotate(**stats)
+        return queryset
+    
     @action(detail=False, methods=['get'])
     def lookup(self, request):
         """Lookup guest by phone number."""
@@ -352,6 +525,41 @@ class BookingViewSet(viewsets.ModelViewSet):
     search_fields = ['booking_ref', 'guest__name', 'guest__phone', 'room__room_number']
     ordering_fields = ['check_in_date', 'created_at', 'total_amount']
     
+    def get_queryset(self):
+        request = self.request
+        related = [
+            relation for relation, fields in [
+                ('guest', ['guest_name', 'guest_phone']),
+                ('room__room_type', ['room_number', 'room_type']),
+                ('created_by', ['created_by_name']),
+            ]
+            if wants_fields(request, *fields) or wants_expanded(request, relation.split('__')[0])
+        ]
+        # select_related() with no arguments would follow every relation
+        queryset = super().get_queryset().select_related(None)
+        if wants_fields(request, 'total_bar_charges', 'grand_total', 'balance_due', 'is_fully_paid'):
+            # Booking.total_bar_charges / balance_due read the folio instead of aggregating per row
+            related.append('folio')
+        return queryset.select_related(*related) if related else queryset
+
+    @action(detail=True, methods=['get'])
+    def balance(self, request, pk=None):
+        """The booking's folio: one primary-key read, no aggregation."""
+        folio = get_object_or_404(Folio.objects.all(), booking_id=pk)
+        return Response(BookingBalanceSerializer(folio).data)
+
+    @action(detail=False, methods=['get'])
+    def outstanding(self, request):
+        """Folios with money still owed, largest first (a scan of the partial balance index)."""
+        queryset = Folio.objects.filter(balance__gt=0).select_related(
+            'booking__guest', 'booking__room'
+        ).order_by('-balance')
+        booking_status = request.query_params.get('status')
+        if booking_status:
+            queryset = queryset.filter(booking__status=booking_status)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(FolioSerializer(page, many=True).data)
+    
     @action(detail=False, methods=['post'])
     def quick_book(self, request):
         """Quick booking for walk-in guests."""
@@ -473,20 +681,33 @@ class BookingViewSet(viewsets.ModelViewSet):
     def today(self, request):
         """Get today's bookings."""
         today = timezone.now().date()
-        bookings = self.queryset.filter(
+        bookings = self.get_queryset().filter(
             Q(check_in_date=today) | Q(status=Booking.Status.CHECKED_IN)
         )
-        return Response(BookingSerializer(bookings, many=True).data)
+        return Response(self.get_serializer(bookings, many=True).data)
 
 
-class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
+class TransactionViewSet(ReplicaReadMixin, ValuesListMixin, ExportMixin, viewsets.ReadOnlyModelViewSet):
     """Transactions are read-only in API (created through booking flow)."""
     queryset = Transaction.objects.select_related('booking', 'processed_by').all()
     serializer_class = TransactionSerializer
+    export_name = 'transactions'
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['transaction_type', 'payment_method', 'status', 'booking']
     search_fields = ['transaction_ref', 'booking__booking_ref', 'external_ref']
     ordering_fields = ['created_at', 'amount']
+
+    def get_queryset(self):
+        request = self.request
+        related = []
+        if wants_expanded(request, 'booking'):
+            related += ['booking__guest', 'booking__room']
+        elif wants_fields(request, 'booking_ref'):
+            related.append('booking')
+        if wants_fields(request, 'processed_by_name') or wants_expanded(request, 'processed_by'):
+            related.append('processed_by')
+        queryset = super().get_queryset().select_related(None)
+        return queryset.select_related(*related) if related else queryset
     
     @action(detail=True, methods=['post'], permission_classes=[IsManagerOrAdmin])
     def create_correction(self, request, pk=None):
@@ -506,16 +727,56 @@ class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
         )
         return Response(TransactionSerializer(correction).data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsManagerOrAdmin])
+    def post_batch(self, request):
+        """Post a batch of payments, refunds and corrections in one go (all or nothing)."""
+        serializer = LedgerBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            transactions, event = post_entries(
+                serializer.validated_data['entries'], request.user,
+                request=request, source=serializer.validated_data['source'],
+            )
+        except DjangoValidationError as e:
+            if hasattr(e, 'error_dict'):
+                return Response({'error': 'Some entries are invalid', 'entries': e.message_dict}, status=400)
+            return Response({'error': ' '.join(e.messages)}, status=400)
+        return Response({
+            'posted': len(transactions),
+            'bookings_updated': event.payload['bookings_updated'],
+            'totals': event.payload['totals'],
+            'transaction_refs': [entry.transaction_ref for entry in transactions],
+            'event': event.pk,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsManagerOrAdmin])
+    def reconcile(self, request):
+        """Match an uploaded bank statement / POS settlement CSV against pending transactions and confirm the matches."""
+        serializer = StatementReconcileSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            report = reconcile(
+                data['file'], actor=request.user, window=data['window_days'],
+                payment_methods=data.get('payment_methods'), dry_run=data['dry_run'],
+                source_name=data['file'].name, request=request,
+            )
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
+        return Response(report)
+
 
-class ExpenseCategoryViewSet(viewsets.ModelViewSet):
+class ExpenseCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    change_tables = [ExpenseCategory]
     queryset = ExpenseCategory.objects.all()
     serializer_class = ExpenseCategorySerializer
     permission_classes = [IsManagerOrAdmin]
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Expense.objects.select_related('category', 'logged_by', 'approved_by').all()
     permission_classes = [permissions.IsAuthenticated]
+    export_name = 'expenses'
     filterset_fields = ['status', 'category', 'expense_date']
     search_fields = ['expense_ref', 'description', 'vendor_name']
     ordering_fields = ['expense_date', 'amount', 'created_at']
@@ -547,17 +808,16 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         expense = self.get_object()
         
         # Manager Limit Check
-        if request.user.role == 'MANAGER':
-            limit = Decimal('100000.00')
-            if expense.amount > limit:
-                return Response(
-                    {'error': f'Managers can only approve expenses up to ₦{limit:,.2f}. Please escalate to Admin or Stakeholder.'},
-                    status=403
-                )
+        limit_error = expenses.manager_limit_error(request.user, expense)
+        if limit_error:
+            return Response({'error': limit_error}, status=403)
 
         if expense.status != Expense.Status.PENDING:
             return Response({'error': 'Only pending expenses can be approved'}, status=400)
-        expense.approve(request.user)
+        try:
+            expense.approve(request.user)
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
         return Response(ExpenseSerializer(expense).data)
     
     @action(detail=True, methods=['post'], permission_classes=[CanApproveExpenses])
@@ -567,9 +827,98 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         reason = request.data.get('reason', '')
         if not reason:
             return Response({'error': 'Reason is required'}, status=400)
-        expense.reject(request.user, reason)
+        try:
+            expense.reject(request.user, reason)
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
         return Response(ExpenseSerializer(expense).data)
 
+    @action(detail=False, methods=['post'], permission_classes=[CanApproveExpenses])
+    def review(self, request):
+        """
+        Approve or reject many expenses in one transaction:
+        {"ids": [...], "action": "approve" | "reject", "reason": "..."}.
+        Rows over the manager limit, no longer pending or in a closed period
+        are skipped and reported per item.
+        """
+        serializer = ExpenseReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            results = expenses.review(data['ids'], request.user, data['action'], data['reason'], request=request)
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
+        done = sum(1 for result in results if result['ok'])
+        return Response({
+            'action': data['action'],
+            'processed': done,
+            'skipped': len(results) - done,
+            'results': results,
+        })
+
+    def destroy(self, request, *args, **kwargs):
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
+
+
+class AccountingPeriodViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Closed months. POST closes one (freezing its snapshots and locking it);
+    the report combines those snapshots with live totals of the open months.
+    """
+    queryset = AccountingPeriod.objects.select_related('closed_by').all()
+    serializer_class = AccountingPeriodSerializer
+    permission_classes = [IsManagerOrAdmin]
+
+    def create(self, request):
+        serializer = PeriodCloseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            period = periods.close_period(
+                serializer.validated_data['month'], request.user,
+                notes=serializer.validated_data['notes'], request=request,
+            )
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
+        return Response(AccountingPeriodSerializer(period).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAdmin])
+    def reopen(self, request, pk=None):
+        """Reopen the latest closed month (admins only)."""
+        try:
+            periods.reopen_period(self.get_object(), request.user, request.data.get('reason', ''), request=request)
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsManagerOrAdmin | IsStakeholder])
+    def report(self, request):
+        """
+        Monthly totals by dimension (?dimension=METHOD|LEDGER|ROOM_TYPE|SOURCE|CATEGORY|DAY,
+        ?start=YYYY-MM&end=YYYY-MM, default the last 12 months), with
+        ?compare=previous_year adding the same months a year earlier.
+        """
+        params = PeriodReportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        this_month = timezone.localdate().replace(day=1)
+        try:
+            end = periods.month_start(data.get('end') or this_month)
+            start = periods.month_start(data.get('start') or (end - timedelta(days=335)))
+            result = {
+                'dimension': data['dimension'],
+                'months': periods.report(start, end, data['dimension']),
+            }
+            if data.get('compare'):
+                result['previous_year'] = periods.report(
+                    start.replace(year=start.year - 1), end.replace(year=end.year - 1), data['dimension'],
+                )
+        except DjangoValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=400)
+        return Response(result)
+
 
 # ============ DASHBOARD VIEWS ============
 
@@ -588,11 +937,11 @@ class DashboardView(APIView):
         
         # Today's bookings and revenue
         today_bookings = Booking.objects.filter(check_in_date=today).count()
-        today_revenue = Transaction.objects.filter(
+        today_by_method = Transaction.totals_by_method(Transaction.objects.filter(
             created_at__date=today,
             transaction_type=Transaction.Type.PAYMENT,
-            status=Transaction.Status.CONFIRMED
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        ))
+        today_revenue = sum(today_by_method.values(), Decimal('0'))
         
         today_checkouts = Booking.objects.filter(
             actual_checkout__date=today
@@ -654,6 +1003,7 @@ class DashboardView(APIView):
             'dirty_rooms': state_counts.get('DIRTY', 0),
             'today_bookings': today_bookings,
             'today_revenue': today_revenue,
+            'today_revenue_by_method': today_by_method,
             'today_checkouts': today_checkouts,
             'pending_expenses': pending_expenses_count,
             'occupancy_rate': round(occupancy_rate, 1),
@@ -663,7 +1013,7 @@ class DashboardView(APIView):
         return Response(data) # We'll need to update DashboardStatsSerializer or just return dict
 
 
-class StakeholderDashboardView(APIView):
+class StakeholderDashboardView(ReplicaReadMixin, APIView):
     """Simplified dashboard for stakeholders (family members)."""
     permission_classes = [permissions.IsAuthenticated]
     
@@ -696,7 +1046,11 @@ class StakeholderDashboardView(APIView):
         # Revenue
         revenue_today = get_revenue(today)
         revenue_week = get_revenue(week_start)
-        revenue_month = get_revenue(month_start)
+        revenue_by_method_month = Transaction.totals_by_method(Transaction.objects.filter(
+            transaction_type=Transaction.Type.PAYMENT,
+            created_at__date__gte=month_start,
+        ))
+        revenue_month = sum(revenue_by_method_month.values(), Decimal('0'))
         
         # Expenses
         expenses_today = get_expenses(today)
@@ -745,6 +1099,7 @@ class StakeholderDashboardView(APIView):
             'total_revenue_today': revenue_today,
             'total_revenue_week': revenue_week,
             'total_revenue_month': revenue_month,
+            'revenue_by_method_month': revenue_by_method_month,
             'total_expenses_today': expenses_today,
             'total_expenses_week': expenses_week,
             'total_expenses_month': expenses_month,
@@ -759,7 +1114,7 @@ class StakeholderDashboardView(APIView):
         return Response(StakeholderDashboardSerializer(data).data)
 
 
-class AnalyticsView(APIView):
+class AnalyticsView(ReplicaReadMixin, APIView):
     """Comprehensive analytics for Admins."""
     permission_classes = [IsManagerOrAdmin]
     
@@ -809,18 +1164,13 @@ class AnalyticsView(APIView):
 
         overall_avg_dirty = round(sum(r['avg_dirty_minutes'] for r in dirty_to_clean) / len(dirty_to_clean), 1) if dirty_to_clean else 0
 
-        # 2. Daily Revenue (NEW)
-        daily_revenue = Transaction.objects.filter(
-            transaction_type=Transaction.Type.PAYMENT,
-            status=Transaction.Status.CONFIRMED,
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        ).values('created_at__date').annotate(total=Sum('amount')).order_by('created_at__date')
+        # 2. Daily Revenue (closed months from their snapshots)
+        daily_revenue = periods.daily_revenue(start_date, end_date)
 
         revenue_chart = []
         current = start_date
         while current <= end_date:
-            rev = next((x['total'] for x in daily_revenue if x['created_at__date'] == current), 0)
+            rev = daily_revenue.get(current, 0)
             revenue_chart.append({
                 'date': current.isoformat(),
                 'revenue': rev
@@ -2,7 +2,21 @@
 Django Admin configuration for finance app.
 """
 from django.contrib import admin
-from .models import Transaction, ExpenseCategory, Expense, MaintenanceLog
+from .models import (
+    Transaction, PaymentLine, PaymentEvent, ExpenseCategory, Expense, MaintenanceLog,
+    AccountingPeriod, PeriodSnapshot,
+)
+
+
+class PaymentLineInline(admin.TabularInline):
+    model = PaymentLine
+    fields = ('payment_method', 'amount')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False  # Written with the transaction
 
 
 @admin.register(Transaction)
@@ -20,6 +34,7 @@ class TransactionAdmin(admin.ModelAdmin):
         'processed_by', 'verified_by', 'verified_at', 'external_ref', 'notes', 'created_at'
     )
     raw_id_fields = ('booking',)
+    inlines = [PaymentLineInline]
     
     def has_add_permission(self, request):
         return False  # Transactions are created via API
@@ -31,6 +46,45 @@ class TransactionAdmin(admin.ModelAdmin):
         return False  # Immutable - use corrections instead
 
 
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = ('provider_ref', 'provider', 'event_type', 'status', 'received_at', 'processed_at')
+    list_filter = ('provider', 'event_type', 'status')
+    search_fields = ('provider_ref',)
+    date_hierarchy = 'received_at'
+    readonly_fields = (
+        'id', 'provider', 'event_type', 'provider_ref', 'payload', 'ledger_entry', 'received_at', 'processed_at'
+    )
+    raw_id_fields = ('ledger_entry',)
+
+    def has_add_permission(self, request):
+        return False  # Stored by the webhook
+
+
+class PeriodSnapshotInline(admin.TabularInline):
+    model = PeriodSnapshot
+    fields = ('dimension', 'key', 'amount')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False  # Frozen when the period is closed
+
+
+@admin.register(AccountingPeriod)
+class AccountingPeriodAdmin(admin.ModelAdmin):
+    list_display = ('month', 'closed_by', 'closed_at')
+    readonly_fields = ('month', 'closed_by', 'closed_at', 'notes')
+    inlines = [PeriodSnapshotInline]
+
+    def has_add_permission(self, request):
+        return False  # Closed via the API
+
+    def has_delete_permission(self, request, obj=None):
+        return False  # Reopen via the API, which logs it
+
+
 @admin.register(ExpenseCategory)
 class ExpenseCategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'description', 'is_active')
@@ -0,0 +1,121 @@
+"""
+Bulk expense review for Mayor K. Guest Palace.
+
+review() approves or rejects a list of expenses in one database
+transaction: one SELECT ... FOR UPDATE of the rows, one UPDATE for all that
+pass, and one bulk INSERT of their EXPENSE_APPROVED / EXPENSE_REJECTED
+events (the same entries Expense.approve / reject log one by one). Rows
+that don't pass are left untouched and reported with their reason:
+- not found, or no longer pending
+- over MANAGER_APPROVAL_LIMIT, when a manager approves
+- dated in a closed accounting period (the bulk UPDATE skips Expense.save,
+  so the lock is checked here)
+"""
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import SystemEvent, User
+from finance.models import AccountingPeriod, Expense
+
+APPROVE = 'approve'
+REJECT = 'reject'
+# Largest expense a manager may approve; above it goes to an admin or stakeholder
+MANAGER_APPROVAL_LIMIT = Decimal('100000.00')
+# Expenses per request
+MAX_BATCH = 500
+
+
+def manager_limit_error(actor, expense):
+    """Why `actor` may not approve `expense` on their own, or None."""
+    if actor.role == User.Role.MANAGER and expense.amount > MANAGER_APPROVAL_LIMIT:
+        return (f'Managers can only approve expenses up to ₦{MANAGER_APPROVAL_LIMIT:,.2f}. '
+                'Please escalate to Admin or Stakeholder.')
+    return None
+
+
+def _event(expense, action, actor, reason, request):
+    name = actor.get_full_name() or actor.username
+    if action == APPROVE:
+        return SystemEvent.build(
+            event_type='EXPENSE_APPROVED',
+            category=SystemEvent.EventCategory.EXPENSE,
+            actor=actor,
+            target=expense,
+            request=request,
+            description=f'Expense of ₦{expense.amount} for {expense.category.name} approved by {name}',
+            payload={'expense_ref': expense.expense_ref, 'amount': str(expense.amount),
+                     'category': expense.category.name, 'bulk': True},
+        )
+    return SystemEvent.build(
+        event_type='EXPENSE_REJECTED',
+        category=SystemEvent.EventCategory.EXPENSE,
+        actor=actor,
+        target=expense,
+        request=request,
+        description=f'Expense rejected by {name}: {reason}',
+        payload={'expense_ref': expense.expense_ref, 'amount': str(expense.amount),
+                 'reason': reason, 'bulk': True},
+    )
+
+
+def review(expense_ids, actor, action, reason='', request=None):
+    """
+    Approve or reject the expenses `expense_ids` as `actor`. Returns one
+    {'id', 'expense_ref', 'ok', 'status', 'error'} per id, in order.
+    """
+    if action not in (APPROVE, REJECT):
+        raise ValidationError(f'Unknown action {action!r}.')
+    if not actor.can_approve_expenses:
+        raise ValidationError('User does not have permission to approve expenses.')
+    if action == REJECT and not reason:
+        raise ValidationError('Reason is required')
+    if len(expense_ids) > MAX_BATCH:
+        raise ValidationError(f'At most {MAX_BATCH} expenses can be reviewed at once.')
+
+    ids = list(dict.fromkeys(str(pk) for pk in expense_ids))
+    new_status = str(Expense.Status.APPROVED if action == APPROVE else Expense.Status.REJECTED)
+    now = timezone.now()
+    results = []
+    with transaction.atomic():
+        expenses = {
+            str(expense.pk): expense
+            for expense in Expense.objects.select_for_update(of=('self',))
+            .select_related('category').filter(pk__in=ids)
+        }
+        locked_until = AccountingPeriod.locked_until()
+        passed = []
+        for pk in ids:
+            expense = expenses.get(pk)
+            if expense is None:
+                error = 'Expense not found'
+            elif expense.status != Expense.Status.PENDING:
+                error = f'Only pending expenses can be {action}d'
+            elif action == APPROVE and manager_limit_error(actor, expense):
+                error = manager_limit_error(actor, expense)
+            elif locked_until and expense.expense_date <= locked_until:
+                error = f'{expense.expense_date:%B %Y} is a closed accounting period (closed up to {locked_until:%d %B %Y}).'
+            else:
+                error = None
+                passed.append(expense)
+            results.append({
+                'id': pk,
+                'expense_ref': expense.expense_ref if expense else None,
+                'ok': error is None,
+                'status': new_status if error is None else (expense.status if expense else None),
+                'error': error,
+            })
+
+        if passed:
+            changes = {'status': new_status, 'updated_at': now}
+            if action == APPROVE:
+                changes.update(approved_by=actor, approved_at=now)
+            else:
+                changes['rejection_reason'] = reason
+            Expense.objects.filter(pk__in=[expense.pk for expense in passed]).update(**changes)
+            SystemEvent.objects.bulk_create(
+                [_event(expense, action, actor, reason, request) for expense in passed], batch_size=500,
+            )
+    return results
@@ -0,0 +1,181 @@
+"""
+Batched ledger posting for Mayor K. Guest Palace.
+
+Transaction.save() posts one entry at a time: an INSERT plus an UPDATE of the
+booking balance. Settlement imports and end-of-shift corrections post
+hundreds, so post_entries() validates the whole batch up front, bulk-inserts
+it (with the payment lines of its split payments), applies the summed
+amount_paid and folio changes of every booking it touched in one
+UPDATE ... CASE each, adds the takings to the poster's open shift in one
+more UPDATE, and records a single summarizing SystemEvent. The batch is
+all-or-nothing.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+
+from bookings.models import Booking, Folio
+from core.models import SystemEvent, WorkShift
+from finance.models import PaymentLine, Transaction
+
+# Entry types a batch may post; VOIDs stay a per-entry operation
+POSTABLE_TYPES = (Transaction.Type.PAYMENT, Transaction.Type.REFUND, Transaction.Type.CORRECTION)
+MAX_BATCH = 1000
+# Rows per INSERT and bookings per balance UPDATE (3 query parameters per booking)
+BATCH_SIZE = 500
+
+
+def build_entries(entries, actor):
+    """
+    Turn validated entry dicts into unsaved Transactions.
+
+    Each dict carries booking (id), transaction_type, payment_method and
+    amount, and optionally status, original_transaction (id),
+    correction_reason, external_ref, split_details and notes. Raises
+    ValidationError keyed by entry index if anything is wrong; checking that
+    bookings and originals exist and that the new refs are free costs
+    three queries for the whole batch.
+    """
+    errors = {}
+    for index, entry in enumerate(entries):
+        problem = _check_entry(entry)
+        if problem:
+            errors[str(index)] = problem
+
+    booking_ids = {entry['booking'] for entry in entries}
+    known_bookings = set(Booking.objects.filter(pk__in=booking_ids).values_list('pk', flat=True))
+    original_ids = {entry['original_transaction'] for entry in entries if entry.get('original_transaction')}
+    originals = dict(
+        Transaction.objects.filter(pk__in=original_ids).values_list('pk', 'booking_id')
+    ) if original_ids else {}
+
+    for index, entry in enumerate(entries):
+        if entry['booking'] not in known_bookings:
+            errors.setdefault(str(index), 'Booking not found.')
+        original = entry.get('original_transaction')
+        if original and original not in originals:
+            errors.setdefault(str(index), 'Original transaction not found.')
+        elif original and originals[original] != entry['booking']:
+            errors.setdefault(str(index), 'Original transaction belongs to another booking.')
+    if errors:
+        raise ValidationError(errors)
+
+    refs = unique_refs(len(entries))
+    return [
+        Transaction(
+            transaction_ref=ref,
+            booking_id=entry['booking'],
+            transaction_type=entry['transaction_type'],
+            payment_method=entry['payment_method'],
+            status=entry.get('status') or Transaction.Status.CONFIRMED,
+            amount=entry['amount'],
+            split_details=entry.get('split_details'),
+            original_transaction_id=entry.get('original_transaction'),
+            correction_reason=entry.get('correction_reason', ''),
+            external_ref=entry.get('external_ref', ''),
+            notes=entry.get('notes', ''),
+            processed_by=actor,
+        )
+        for entry, ref in zip(entries, refs)
+    ]
+
+
+def unique_refs(count):
+    """Return `count` new transaction refs, distinct from each other and from existing rows."""
+    refs = set()
+    while len(refs) < count:
+        candidates = set()
+        while len(refs) + len(candidates) < count:
+            ref = Transaction._generate_ref()
+            if ref not in refs:
+                candidates.add(ref)
+        taken = set(Transaction.objects.filter(transaction_ref__in=candidates).values_list('transaction_ref', flat=True))
+        refs |= candidates - taken
+    return list(refs)
+
+
+def _check_entry(entry):
+    if entry['transaction_type'] not in POSTABLE_TYPES:
+        return f"Cannot batch-post {entry['transaction_type']} entries."
+    if entry['transaction_type'] == Transaction.Type.CORRECTION:
+        if not entry.get('correction_reason'):
+            return 'Corrections need a correction_reason.'
+        if not entry['amount']:
+            return 'Correction amount cannot be zero.'
+    elif entry['amount'] <= 0:
+        return 'Amount must be positive.'
+    if entry['payment_method'] == Transaction.Method.SPLIT:
+        return Transaction.split_details_error(entry['amount'], entry.get('split_details'))
+    return None
+
+
+def apply_balance_deltas(deltas):
+    """
+    Add each booking's delta to its amount_paid:
+    UPDATE bookings SET amount_paid = amount_paid + CASE id WHEN ... END WHERE id IN (...).
+    """
+    deltas = [(booking_id, delta) for booking_id, delta in deltas.items() if delta]
+    now = timezone.now()
+    for start in range(0, len(deltas), BATCH_SIZE):
+        chunk = deltas[start:start + BATCH_SIZE]
+        change = Case(
+            *[When(pk=booking_id, then=Value(delta)) for booking_id, delta in chunk],
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+        Booking.objects.filter(pk__in=[booking_id for booking_id, _ in chunk]).update(
+            amount_paid=F('amount_paid') + change, updated_at=now
+        )
+    return len(deltas)
+
+
+def post_entries(entries, actor, request=None, source=''):
+    """
+    Validate and post a batch of ledger entries (see build_entries) in one
+    database transaction. Returns (transactions, event).
+    """
+    if not entries:
+        raise ValidationError('No entries to post.')
+    if len(entries) > MAX_BATCH:
+        raise ValidationError(f'At most {MAX_BATCH} entries can be posted at once.')
+    transactions = build_entries(entries, actor)
+
+    deltas = defaultdict(Decimal)
+    folio_changes = defaultdict(lambda: defaultdict(Decimal))
+    totals = defaultdict(Decimal)
+    takings = defaultdict(Decimal)
+    for entry in transactions:
+        deltas[entry.booking_id] += entry.balance_delta
+        if entry.balance_delta:
+            folio_changes[entry.booking_id][Folio.LEDGER_COLUMNS[entry.transaction_type]] += entry.amount
+        totals[entry.transaction_type] += entry.amount
+        for method, amount in entry.method_amounts().items():
+            takings[method] += amount
+
+    with transaction.atomic():
+        Transaction.objects.bulk_create(transactions, batch_size=BATCH_SIZE)
+        PaymentLine.objects.bulk_create(
+            [line for entry in transactions for line in entry.split_lines()], batch_size=BATCH_SIZE,
+        )
+        bookings_updated = apply_balance_deltas(deltas)
+        Folio.post_many(folio_changes)
+        WorkShift.record_takings(actor.pk if actor else None, takings)
+        event = SystemEvent.log(
+            event_type='LEDGER_BATCH_POSTED',
+            category=SystemEvent.EventCategory.PAYMENT,
+            actor=actor,
+            request=request,
+            payload={
+                'source': source,
+                'entries': len(transactions),
+                'bookings_updated': bookings_updated,
+                'totals': {entry_type: str(total) for entry_type, total in sorted(totals.items())},
+                'first_ref': transactions[0].transaction_ref,
+                'last_ref': transactions[-1].transaction_ref,
+            },
+            description=f'Posted {len(transactions)} ledger entries across {bookings_updated} bookings',
+        )
+    return transactions, event
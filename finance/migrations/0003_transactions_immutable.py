@@ -0,0 +1,75 @@
+"""
+Database-level immutability for the ledger.
+
+Transaction.save() only inserts; this trigger also stops raw UPDATEs from
+changing a ledger entry. Only the verification fields (status, verified_by,
+verified_at, verification_notes) may change, a CONFIRMED entry stays
+confirmed, and processed_by may still be nulled when a user is deleted.
+On PostgreSQL, DELETE is rejected too. SQLite can't have that: Django's test
+flush empties tables with DELETE.
+"""
+from django.db import migrations
+
+IMMUTABLE_COLUMNS = [
+    'transaction_ref', 'booking_id', 'transaction_type', 'payment_method', 'amount',
+    'split_details', 'original_transaction_id', 'correction_reason', 'external_ref',
+    'notes', 'created_at',
+]
+MESSAGE = 'Transactions cannot be modified. Create a correction entry instead.'
+
+
+def changed(distinct):
+    conditions = [f'NEW.{column} {distinct} OLD.{column}' for column in IMMUTABLE_COLUMNS]
+    conditions.append(f"(OLD.status = 'CONFIRMED' AND NEW.status {distinct} OLD.status)")
+    return ' OR '.join(conditions)
+
+
+SQLITE_FORWARD = [f"""
+    CREATE TRIGGER transactions_immutable
+    BEFORE UPDATE ON transactions
+    FOR EACH ROW WHEN {changed('IS NOT')}
+    BEGIN SELECT RAISE(ABORT, '{MESSAGE}'); END
+"""]
+SQLITE_REVERSE = ['DROP TRIGGER IF EXISTS transactions_immutable']
+
+POSTGRES_FORWARD = [f"""
+    CREATE FUNCTION transactions_immutable() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' OR {changed('IS DISTINCT FROM')} THEN
+            RAISE EXCEPTION '{MESSAGE}' USING ERRCODE = 'integrity_constraint_violation';
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+""", """
+    CREATE TRIGGER transactions_immutable
+    BEFORE UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_immutable()
+"""]
+POSTGRES_REVERSE = [
+    'DROP TRIGGER IF EXISTS transactions_immutable ON transactions',
+    'DROP FUNCTION IF EXISTS transactions_immutable()',
+]
+
+STATEMENTS = {
+    'sqlite': (SQLITE_FORWARD, SQLITE_REVERSE),
+    'postgresql': (POSTGRES_FORWARD, POSTGRES_REVERSE),
+}
+
+
+def run(direction):
+    def apply(apps, schema_editor):
+        for statement in STATEMENTS.get(schema_editor.connection.vendor, ([], []))[direction]:
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_snapshot_watermark_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(0), run(1)),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:01
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_folios'),
+        ('finance', '0003_transactions_immutable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('provider', models.CharField(default='paystack', max_length=20)),
+                ('event_type', models.CharField(max_length=50)),
+                ('provider_ref', models.CharField(help_text="Provider's payment reference", max_length=100)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('RECEIVED', 'Received'), ('PROCESSED', 'Processed'), ('DUPLICATE', 'Duplicate'), ('IGNORED', 'Ignored'), ('FAILED', 'Failed')], default='RECEIVED', max_length=12)),
+                ('error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'payment_events',
+                'ordering': ['received_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('payment_method', 'PAYSTACK'), ('transaction_type', 'PAYMENT'), models.Q(('external_ref', ''), _negated=True)), fields=('external_ref',), name='transactions_paystack_ref_uniq'),
+        ),
+        migrations.AddField(
+            model_name='paymentevent',
+            name='ledger_entry',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_events', to='finance.transaction'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentevent',
+            index=models.Index(condition=models.Q(('status', 'RECEIVED')), fields=['received_at'], name='payment_event_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentevent',
+            constraint=models.UniqueConstraint(fields=('provider', 'event_type', 'provider_ref'), name='payment_event_once'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:06
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+
+METHODS = {'CASH', 'TRANSFER', 'POS', 'PAYSTACK'}
+
+
+def split_parts(amount, split_details):
+    """
+    Transaction.split_parts as it was for rows written before split_details
+    were validated: unusable parts are skipped and whatever the rest don't
+    cover stays under SPLIT.
+    """
+    parts = {}
+    if isinstance(split_details, dict):
+        for method, part in split_details.items():
+            method = str(method).upper()
+            if method in METHODS:
+                try:
+                    part = Decimal(str(part))
+                except ArithmeticError:
+                    continue
+                if part:
+                    parts[method] = parts.get(method, 0) + part
+    remainder = amount - sum(parts.values(), Decimal('0.00'))
+    if remainder:
+        parts['SPLIT'] = remainder
+    return parts
+
+
+def backfill_lines(apps, schema_editor):
+    """Write the payment lines of every existing SPLIT entry from its split_details."""
+    Transaction = apps.get_model('finance', 'Transaction')
+    PaymentLine = apps.get_model('finance', 'PaymentLine')
+    splits = Transaction.objects.filter(payment_method='SPLIT').order_by('pk').values_list('pk', 'amount', 'split_details')
+    last = None
+    while True:
+        rows = list((splits.filter(pk__gt=last) if last else splits)[:1000])
+        if not rows:
+            return
+        last = rows[-1][0]
+        PaymentLine.objects.bulk_create([
+            PaymentLine(transaction_id=pk, payment_method=method, amount=part)
+            for pk, amount, split_details in rows
+            for method, part in split_parts(amount, split_details).items()
+        ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_payment_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentLine',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('payment_method', models.CharField(choices=[('CASH', 'Cash'), ('TRANSFER', 'Bank Transfer'), ('POS', 'POS'), ('PAYSTACK', 'Paystack (Online)'), ('SPLIT', 'Split Payment')], max_length=15)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('transaction', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='lines', to='finance.transaction')),
+            ],
+            options={
+                'db_table': 'payment_lines',
+                'indexes': [models.Index(fields=['transaction', 'payment_method', 'amount'], name='payment_line_method_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_lines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:12
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_payment_lines'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountingPeriod',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('month', models.DateField(help_text='First day of the month', unique=True)),
+                ('closed_at', models.DateTimeField(auto_now_add=True)),
+                ('notes', models.TextField(blank=True)),
+                ('closed_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='periods_closed', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounting_periods',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('dimension', models.CharField(choices=[('LEDGER', 'Ledger entry type'), ('METHOD', 'Payment method'), ('ROOM_TYPE', 'Room type'), ('SOURCE', 'Booking source'), ('CATEGORY', 'Expense category'), ('DAY', 'Day')], max_length=12)),
+                ('key', models.CharField(max_length=100)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='finance.accountingperiod')),
+            ],
+            options={
+                'db_table': 'period_snapshots',
+                'constraints': [models.UniqueConstraint(fields=('period', 'dimension', 'key'), name='period_snapshot_once')],
+            },
+        ),
+    ]
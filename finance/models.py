@@ -1,12 +1,28 @@
 """
 Finance models for Mayor K. Guest Palace Hotel Management System.
-Contains: Transaction (immutable ledger), ExpenseCategory, Expense, MaintenanceLog.
+Contains: Transaction (immutable ledger), PaymentLine, PaymentEvent, AccountingPeriod,
+PeriodSnapshot, ExpenseCategory, Expense, MaintenanceLog.
 """
 import uuid
+from datetime import timedelta
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.core.exceptions import ValidationError
-from core.models import User
+from django.utils import timezone
+from core.models import User, WorkShift
+from bookings.models import Folio
+
+
+def signed_amount_sql(prefix='', amount=None):
+    """
+    Transaction.signed_amount as SQL for entries already known to be
+    confirmed ledger entries: refunds negative, everything else as stored.
+    `prefix` reaches the transaction through a relation, `amount` names
+    another amount column (e.g. a PaymentLine's).
+    """
+    value = models.F(amount or f'{prefix}amount')
+    return models.Case(models.When(**{f'{prefix}transaction_type': Transaction.Type.REFUND}, then=-value), default=value)
 
 
 class Transaction(models.Model):
@@ -99,7 +115,7 @@ class Transaction(models.Model):
         blank=True,
         related_name='transactions_verified'
     )
-    verified_at = models.DateTimeField(null=True, blank=True)
+    verified_at = models.DateTimeField(null=True, blank=True, db_index=True)
     
     # External references
     external_ref = models.CharField(
@@ -111,7 +127,9 @@ class Transaction(models.Model):
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     
-    # IMMUTABLE: No updated_at - transactions should never be modified
+    # IMMUTABLE: No updated_at - transactions should never be modified.
+    # The transactions_immutable trigger (migration 0003) rejects UPDATEs of
+    # everything but the verification fields, and DELETEs on PostgreSQL.
     
     class Meta:
         db_table = 'transactions'
@@ -121,30 +139,155 @@ class Transaction(models.Model):
             models.Index(fields=['transaction_type', '-created_at']),
             models.Index(fields=['status', '-created_at']),
         ]
+        constraints = [
+            # One ledger payment per provider reference: webhook retries can't post twice
+            models.UniqueConstraint(
+                fields=['external_ref'],
+                condition=models.Q(payment_method='PAYSTACK', transaction_type='PAYMENT') & ~models.Q(external_ref=''),
+                name='transactions_paystack_ref_uniq',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.transaction_ref} - ₦{self.amount} ({self.get_transaction_type_display()})"
     
     def save(self, *args, **kwargs):
+        # Enforce immutability (only new records allowed). The pk is a
+        # pre-filled UUID, so only the instance state can tell an insert apart.
+        if not self._state.adding:
+            raise ValidationError("Transactions cannot be modified. Create a correction entry instead.")
+
+        if self.payment_method == self.Method.SPLIT:
+            error = self.split_details_error(self.amount, self.split_details)
+            if error:
+                raise ValidationError({'split_details': error})
+
         if not self.transaction_ref:
             self.transaction_ref = self._generate_ref()
-        
-        # Enforce immutability (only new records allowed)
-        if self.pk and Transaction.objects.filter(pk=self.pk).exists():
-            raise ValidationError("Transactions cannot be modified. Create a correction entry instead.")
-        
-        super().save(*args, **kwargs)
-        
-        # Update booking amount_paid if this is a confirmed payment
-        if self.booking and self.transaction_type == self.Type.PAYMENT and self.status == self.Status.CONFIRMED:
-            self.booking.amount_paid += self.amount
-            self.booking.save(update_fields=['amount_paid', 'updated_at'])
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.payment_method == self.Method.SPLIT:
+                PaymentLine.objects.bulk_create(self.split_lines())
+            self._post_to_booking()
+            WorkShift.record_takings(self.processed_by_id, self.method_amounts())
+
+    @property
+    def signed_amount(self):
+        """
+        Money this entry moved: confirmed payments and corrections (signed) in,
+        confirmed refunds (stored positive) out. Zero for anything else.
+        """
+        if self.status != self.Status.CONFIRMED:
+            return Decimal('0.00')
+        if self.transaction_type in (self.Type.PAYMENT, self.Type.CORRECTION):
+            return self.amount
+        if self.transaction_type == self.Type.REFUND:
+            return -self.amount
+        return Decimal('0.00')
+
+    @property
+    def balance_delta(self):
+        """What this entry adds to its booking's amount_paid."""
+        return self.signed_amount if self.booking_id else Decimal('0.00')
+
+    @classmethod
+    def split_details_error(cls, amount, split_details):
+        """
+        Why `split_details` can't divide a SPLIT entry of `amount`, or None.
+        Every key must be a payment method other than SPLIT, every part a
+        positive amount in kobo precision, and the parts must add up to
+        `amount` exactly.
+        """
+        if not isinstance(split_details, dict) or not split_details:
+            return 'Split payments need split_details, e.g. {"cash": 10000, "transfer": 5000}.'
+        total = Decimal('0.00')
+        for method, part in split_details.items():
+            if str(method).upper() not in cls.Method.values or str(method).upper() == cls.Method.SPLIT:
+                return f'{method!r} is not a payment method a split can be paid with.'
+            try:
+                part = Decimal(str(part)) if not isinstance(part, bool) else None
+            except ArithmeticError:
+                part = None
+            if part is None or not part.is_finite() or part <= 0 or part.as_tuple().exponent < -2:
+                return f'Split part {method!r} must be a positive amount.'
+            total += part
+        if total != amount:
+            return f'Split parts add up to {total:,.2f}, not {amount:,.2f}.'
+        return None
+
+    def split_parts(self):
+        """
+        The entry's amount by payment method (unsigned, like amount). Split
+        payments are divided by their split_details ({'cash': 10000,
+        'transfer': 5000}), which save() and post_entries check add up to it.
+        """
+        if self.payment_method != self.Method.SPLIT:
+            return {self.payment_method: self.amount}
+        parts = {}
+        for method, part in self.split_details.items():
+            method = str(method).upper()
+            parts[method] = parts.get(method, Decimal('0.00')) + Decimal(str(part))
+        return parts
+
+    def split_lines(self):
+        """Unsaved PaymentLines of a SPLIT entry (none for other entries)."""
+        if self.payment_method != self.Method.SPLIT:
+            return []
+        return [PaymentLine(transaction=self, payment_method=method, amount=amount)
+                for method, amount in self.split_parts().items()]
+
+    def method_amounts(self):
+        """signed_amount by payment method (see split_parts)."""
+        if not self.signed_amount:
+            return {}
+        sign = -1 if self.transaction_type == self.Type.REFUND else 1
+        return {method: sign * amount for method, amount in self.split_parts().items()}
+
+    @classmethod
+    def totals_by_method(cls, queryset):
+        """
+        Net confirmed ledger amount of `queryset` per payment method, split
+        payments broken out through their PaymentLines: one GROUP BY over the
+        entries and one over the lines of the SPLIT ones. Returns
+        {method: Decimal}.
+        """
+        ledger = queryset.filter(
+            status=cls.Status.CONFIRMED,
+            transaction_type__in=[cls.Type.PAYMENT, cls.Type.REFUND, cls.Type.CORRECTION],
+        ).order_by()
+        totals = {}
+        rows = list(
+            ledger.exclude(payment_method=cls.Method.SPLIT)
+            .values('payment_method').annotate(total=models.Sum(signed_amount_sql()))
+        ) + list(
+            PaymentLine.objects.filter(transaction__in=ledger.filter(payment_method=cls.Method.SPLIT).values('pk'))
+            .values('payment_method').annotate(total=models.Sum(signed_amount_sql('transaction__', 'amount')))
+            .order_by()
+        )
+        for row in rows:
+            totals[row['payment_method']] = totals.get(row['payment_method'], Decimal('0.00')) + row['total']
+        return totals
+
+    def _post_to_booking(self):
+        """Apply balance_delta to the booking's amount_paid and folio, one UPDATE each."""
+        delta = self.balance_delta
+        if not delta:
+            return
+        booking_model = self._meta.get_field('booking').related_model
+        # F() keeps concurrent payments from overwriting each other
+        booking_model.objects.filter(pk=self.booking_id).update(
+            amount_paid=F('amount_paid') + delta, updated_at=timezone.now()
+        )
+        Folio.post(self.booking_id, **{Folio.LEDGER_COLUMNS[self.transaction_type]: self.amount})
+        if Transaction.booking.is_cached(self):
+            self.booking.amount_paid += delta
     
-    def _generate_ref(self):
+    @staticmethod
+    def _generate_ref():
         """Generate unique transaction reference: TXN-YYMMDD-XXXXX"""
         import random
         import string
-        from django.utils import timezone
         date_part = timezone.now().strftime('%y%m%d')
         random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
         return f"TXN-{date_part}-{random_part}"
@@ -186,6 +329,151 @@ class Transaction(models.Model):
         return correction
 
 
+class PaymentLine(models.Model):
+    """
+    One payment-method share of a SPLIT ledger entry: {'cash': 10000,
+    'transfer': 5000} is stored as two lines, which add up to the entry's
+    amount since split_details must cover it exactly. Only entries from
+    before that rule may carry a SPLIT line for the part their details
+    missed. Written with the entry and, like it, never changed. Lets per-method
+    reports GROUP BY instead of parsing split_details row by row.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.PROTECT,
+        related_name='lines',
+        db_index=False  # covered by payment_line_method_idx
+    )
+    payment_method = models.CharField(max_length=15, choices=Transaction.Method.choices)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        db_table = 'payment_lines'
+        indexes = [
+            models.Index(fields=['transaction', 'payment_method', 'amount'], name='payment_line_method_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} {self.payment_method} ₦{self.amount}"
+
+
+class PaymentEvent(models.Model):
+    """
+    A payment provider webhook delivery, stored as received before anything
+    else happens to it. finance/webhooks.py turns them into ledger entries
+    in batches. (provider, event_type, provider_ref) is unique, so the
+    provider's retries are absorbed by the INSERT.
+    """
+    class Status(models.TextChoices):
+        RECEIVED = 'RECEIVED', 'Received'
+        PROCESSED = 'PROCESSED', 'Processed'
+        DUPLICATE = 'DUPLICATE', 'Duplicate'
+        IGNORED = 'IGNORED', 'Ignored'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    provider = models.CharField(max_length=20, default='paystack')
+    event_type = models.CharField(max_length=50)
+    provider_ref = models.CharField(max_length=100, help_text="Provider's payment reference")
+    payload = models.JSONField()
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.RECEIVED)
+    error = models.TextField(blank=True)
+    ledger_entry = models.ForeignKey(
+        Transaction,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='payment_events'
+    )
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'payment_events'
+        ordering = ['received_at']
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'event_type', 'provider_ref'], name='payment_event_once'),
+        ]
+        indexes = [
+            # The worker's queue: only unprocessed rows are indexed
+            models.Index(fields=['received_at'], condition=models.Q(status='RECEIVED'), name='payment_event_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.event_type} {self.provider_ref} ({self.status})"
+
+
+class AccountingPeriod(models.Model):
+    """
+    A closed month. Closing freezes the month's totals into PeriodSnapshot
+    rows (finance/periods.py) and moves the lock date to the month's end:
+    nothing dated on or before it may be posted or changed any more.
+    Months are closed in order, so the closed months are contiguous.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    month = models.DateField(unique=True, help_text="First day of the month")
+    closed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='periods_closed'
+    )
+    closed_at = models.DateTimeField(auto_now_add=True)
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'accounting_periods'
+        ordering = ['-month']
+
+    def __str__(self):
+        return self.month.strftime('%B %Y')
+
+    @classmethod
+    def locked_until(cls):
+        """Last day of the latest closed month, or None while nothing is closed."""
+        latest = cls.objects.order_by('-month').values_list('month', flat=True).first()
+        if latest is None:
+            return None
+        return (latest + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    @classmethod
+    def ensure_open(cls, *days):
+        """Raise ValidationError if any of `days` falls in a closed period."""
+        locked = cls.locked_until()
+        for day in days:
+            if locked and day and day <= locked:
+                raise ValidationError(
+                    f"{day:%B %Y} is a closed accounting period (closed up to {locked:%d %B %Y})."
+                )
+
+
+class PeriodSnapshot(models.Model):
+    """One frozen total of a closed month, e.g. (METHOD, 'CASH') or (CATEGORY, 'Diesel')."""
+    class Dimension(models.TextChoices):
+        LEDGER = 'LEDGER', 'Ledger entry type'
+        METHOD = 'METHOD', 'Payment method'
+        ROOM_TYPE = 'ROOM_TYPE', 'Room type'
+        SOURCE = 'SOURCE', 'Booking source'
+        CATEGORY = 'CATEGORY', 'Expense category'
+        DAY = 'DAY', 'Day'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    period = models.ForeignKey(AccountingPeriod, on_delete=models.CASCADE, related_name='snapshots')
+    dimension = models.CharField(max_length=12, choices=Dimension.choices)
+    key = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        db_table = 'period_snapshots'
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'dimension', 'key'], name='period_snapshot_once'),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.dimension} {self.key}: ₦{self.amount}"
+
+
 class ExpenseCategory(models.Model):
     """
     Categories for expense tracking.
@@ -275,10 +563,23 @@ class Expense(models.Model):
     def __str__(self):
         return f"{self.expense_ref} - ₦{self.amount} ({self.category.name})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_expense_date = instance.__dict__.get('expense_date')
+        return instance
+
     def save(self, *args, **kwargs):
+        # Neither the date it had nor the date it gets may be in a closed period
+        AccountingPeriod.ensure_open(self.expense_date, getattr(self, '_stored_expense_date', None))
         if not self.expense_ref:
             self.expense_ref = self._generate_ref()
         super().save(*args, **kwargs)
+        self._stored_expense_date = self.expense_date
+
+    def delete(self, *args, **kwargs):
+        AccountingPeriod.ensure_open(getattr(self, '_stored_expense_date', self.expense_date))
+        return super().delete(*args, **kwargs)
     
     def _generate_ref(self):
         """Generate unique expense reference: EXP-YYMMDD-XXX"""
@@ -0,0 +1,237 @@
+"""
+Accounting period close for Mayor K. Guest Palace.
+
+A reconciled month never changes again, so its report totals are computed
+once, when a manager closes it, and kept as PeriodSnapshot rows:
+- LEDGER: confirmed payments, refunds and corrections
+- METHOD: confirmed payments by payment method (split payments broken out)
+- ROOM_TYPE / SOURCE: confirmed payments by the booking's room type / source
+- CATEGORY: approved expenses by category
+- DAY: confirmed payments per day
+Closing also moves the lock date (AccountingPeriod.locked_until) to the
+month's end, after which expenses dated in it can't be added, changed or
+approved. Ledger entries are always dated now, and a month can only be
+closed once nothing in it is pending, so nothing can be posted into it.
+
+report() reads closed months from their snapshots and aggregates live rows
+only for the months still open.
+"""
+import re
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import SystemEvent
+from finance.models import AccountingPeriod, Expense, PeriodSnapshot, Transaction
+
+Dimension = PeriodSnapshot.Dimension
+PENDING_STATUSES = (Transaction.Status.PENDING, Transaction.Status.AWAITING_TRANSFER)
+LEDGER_TYPES = (Transaction.Type.PAYMENT, Transaction.Type.REFUND, Transaction.Type.CORRECTION)
+# Longest report range, in months
+MAX_MONTHS = 60
+NO_KEY = 'NONE'
+
+
+# ============ MONTHS ============
+
+def month_start(value):
+    """The first day of the month of a date, or of a 'YYYY-MM' string."""
+    if isinstance(value, date):
+        return value.replace(day=1)
+    match = re.fullmatch(r'(\d{4})-(\d{2})(?:-\d{2})?', str(value or '').strip())
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise ValidationError(f'Invalid month {value!r}, expected YYYY-MM.')
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def months_between(first, last):
+    months = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def _bounds(month):
+    """The month as an aware [start, end) datetime range in the hotel's time zone."""
+    tz = timezone.get_current_timezone()
+    return (datetime.combine(month, time.min, tzinfo=tz),
+            datetime.combine(next_month(month), time.min, tzinfo=tz))
+
+
+# ============ AGGREGATES ============
+
+def _payments(month):
+    start, end = _bounds(month)
+    return Transaction.objects.filter(
+        transaction_type=Transaction.Type.PAYMENT, status=Transaction.Status.CONFIRMED,
+        created_at__gte=start, created_at__lt=end,
+    ).order_by()
+
+
+def _grouped(queryset, key, value='amount'):
+    rows = queryset.annotate(key=key).values('key').annotate(total=Sum(value)).values_list('key', 'total')
+    return {str(key) if key is not None else NO_KEY: total for key, total in rows}
+
+
+def _ledger(month):
+    start, end = _bounds(month)
+    return _grouped(Transaction.objects.filter(
+        status=Transaction.Status.CONFIRMED, transaction_type__in=LEDGER_TYPES,
+        created_at__gte=start, created_at__lt=end,
+    ).order_by(), F('transaction_type'))
+
+
+def _methods(month):
+    start, end = _bounds(month)
+    return Transaction.totals_by_method(Transaction.objects.filter(
+        transaction_type=Transaction.Type.PAYMENT, created_at__gte=start, created_at__lt=end,
+    ))
+
+
+def _categories(month):
+    return _grouped(Expense.objects.filter(
+        status=Expense.Status.APPROVED, expense_date__gte=month, expense_date__lt=next_month(month),
+    ).order_by(), F('category__name'))
+
+
+AGGREGATES = {
+    Dimension.LEDGER: _ledger,
+    Dimension.METHOD: _methods,
+    Dimension.ROOM_TYPE: lambda month: _grouped(_payments(month), F('booking__room__room_type__name')),
+    Dimension.SOURCE: lambda month: _grouped(_payments(month), F('booking__source')),
+    Dimension.CATEGORY: _categories,
+    Dimension.DAY: lambda month: _grouped(_payments(month), TruncDate('created_at')),
+}
+
+
+def aggregate(month, dimension):
+    """{key: amount} of one month and dimension, from the live rows (one or two GROUP BYs)."""
+    return AGGREGATES[dimension](month)
+
+
+# ============ CLOSE / REOPEN ============
+
+def close_period(month, actor, notes='', request=None):
+    """
+    Close `month` (a date or 'YYYY-MM'): freeze its snapshots and lock it.
+    Only past months, in order, once nothing dated up to their end is
+    pending. Returns the AccountingPeriod.
+    """
+    month = month_start(month)
+    if month >= timezone.localdate().replace(day=1):
+        raise ValidationError('Only past months can be closed.')
+
+    with transaction.atomic():
+        latest = AccountingPeriod.objects.select_for_update().order_by('-month').first()
+        if latest and month <= latest.month:
+            raise ValidationError(f'{month:%B %Y} is already closed.')
+        if latest and month != next_month(latest.month):
+            raise ValidationError(f'Close {next_month(latest.month):%B %Y} first.')
+
+        _, end = _bounds(month)
+        pending_transactions = Transaction.objects.filter(status__in=PENDING_STATUSES, created_at__lt=end).count()
+        pending_expenses = Expense.objects.filter(
+            status=Expense.Status.PENDING, expense_date__lt=next_month(month),
+        ).count()
+        if pending_transactions or pending_expenses:
+            raise ValidationError(
+                f'{pending_transactions} pending transactions and {pending_expenses} pending expenses '
+                f'dated up to {month:%B %Y} must be resolved first.'
+            )
+
+        period = AccountingPeriod.objects.create(month=month, closed_by=actor, notes=notes)
+        snapshots = [
+            PeriodSnapshot(period=period, dimension=dimension, key=key[:100], amount=amount)
+            for dimension in Dimension.values
+            for key, amount in aggregate(month, dimension).items()
+        ]
+        PeriodSnapshot.objects.bulk_create(snapshots, batch_size=500)
+
+        revenue = sum((s.amount for s in snapshots if s.dimension == Dimension.METHOD), Decimal('0.00'))
+        SystemEvent.log(
+            event_type='PERIOD_CLOSED',
+            category=SystemEvent.EventCategory.ADMIN,
+            actor=actor,
+            target=period,
+            request=request,
+            payload={'month': month.strftime('%Y-%m'), 'snapshots': len(snapshots), 'revenue': str(revenue)},
+            description=f'Closed {month:%B %Y}',
+        )
+    return period
+
+
+def reopen_period(period, actor, reason, request=None):
+    """Reopen the latest closed month, dropping its snapshots (earlier months stay closed)."""
+    if not reason:
+        raise ValidationError('A reason is required to reopen a period.')
+    with transaction.atomic():
+        latest = AccountingPeriod.objects.select_for_update().order_by('-month').first()
+        if latest is None or latest.pk != period.pk:
+            raise ValidationError('Only the latest closed month can be reopened.')
+        SystemEvent.log(
+            event_type='PERIOD_REOPENED',
+            category=SystemEvent.EventCategory.ADMIN,
+            actor=actor,
+            request=request,
+            payload={'month': period.month.strftime('%Y-%m'), 'reason': reason},
+            description=f'Reopened {period.month:%B %Y}: {reason}',
+        )
+        period.delete()
+
+
+# ============ REPORTS ============
+
+def report(first, last, dimension):
+    """
+    Per-month totals of `dimension` from `first` to `last` (dates or
+    'YYYY-MM', inclusive, future months left out): closed months from their
+    snapshots in one query, open months aggregated live. Returns a list of
+    {'month', 'closed', 'totals': {key: amount}, 'total'}.
+    """
+    if dimension not in AGGREGATES:
+        raise ValidationError(f'Unknown dimension {dimension!r}.')
+    first, last = month_start(first), min(month_start(last), timezone.localdate().replace(day=1))
+    months = months_between(first, last)
+    if len(months) > MAX_MONTHS:
+        raise ValidationError(f'At most {MAX_MONTHS} months can be reported at once.')
+
+    closed = dict(AccountingPeriod.objects.filter(month__in=months).values_list('month', 'pk'))
+    frozen = defaultdict(dict)
+    for month, key, amount in PeriodSnapshot.objects.filter(
+        period_id__in=list(closed.values()), dimension=dimension,
+    ).values_list('period__month', 'key', 'amount'):
+        frozen[month][key] = amount
+
+    rows = []
+    for month in months:
+        totals = frozen[month] if month in closed else aggregate(month, dimension)
+        rows.append({
+            'month': month.strftime('%Y-%m'),
+            'closed': month in closed,
+            'totals': dict(sorted(totals.items())),
+            'total': sum(totals.values(), Decimal('0.00')),
+        })
+    return rows
+
+
+def daily_revenue(start, end):
+    """{date: confirmed payments} for each day from `start` to `end`, snapshots for closed months."""
+    revenue = {}
+    for row in report(start, end, Dimension.DAY):
+        for day, amount in row['totals'].items():
+            day = date.fromisoformat(day)
+            if start <= day <= end:
+                revenue[day] = amount
+    return revenue
@@ -0,0 +1,332 @@
+"""
+Bank statement and POS settlement reconciliation for Mayor K. Guest Palace.
+
+Transfers and POS payments wait in PENDING / AWAITING_TRANSFER until the
+money shows up on a statement. reconcile() reads a statement (CSV), matches
+its credit lines to those pending transactions and confirms the matches in
+bulk with verification metadata.
+
+Matching never compares lines with transactions pairwise. The pending
+transactions in the statement's date range are loaded once and indexed in
+two dicts:
+- by reference: the normalized external_ref and transaction_ref
+- by amount, in kobo
+Each line looks up the tokens of its reference (first pass) or its amount
+(second pass) and only scans that (small) bucket for an unmatched transaction within the date
+window. A line whose amount fits more than one pending transaction and whose
+reference names none of them is reported as ambiguous rather than guessed.
+"""
+import csv
+import io
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.models import Folio
+from core.models import SystemEvent
+from finance.ledger import apply_balance_deltas
+from finance.models import Transaction
+
+PENDING_STATUSES = (Transaction.Status.PENDING, Transaction.Status.AWAITING_TRANSFER)
+# Days a statement line may be booked before or after its transaction
+DEFAULT_WINDOW_DAYS = 3
+# Rows per confirming UPDATE
+BATCH_SIZE = 500
+
+# Accepted header names per column (compared lower-cased, spaces collapsed)
+COLUMNS = {
+    'date': ('date', 'transaction date', 'trans date', 'value date', 'posting date', 'settlement date'),
+    'amount': ('amount', 'credit', 'credit amount', 'amount (ngn)', 'settlement amount', 'transaction amount'),
+    'debit': ('debit', 'debit amount'),
+    'reference': ('reference', 'ref', 'narration', 'description', 'details', 'remarks',
+                  'rrn', 'stan', 'terminal id', 'transaction reference'),
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d', '%d-%b-%Y', '%d %b %Y', '%d-%b-%y')
+TOKEN_SPLIT = re.compile(r'[\s,;|/]+')
+NON_ALNUM = re.compile(r'[^A-Z0-9]')
+# Shorter tokens ("NIP", "TRF", dates) would match references by accident
+MIN_REF_LENGTH = 6
+
+
+def normalize_ref(value):
+    return NON_ALNUM.sub('', str(value or '').upper())
+
+
+def ref_tokens(value):
+    """
+    The whole reference, each of its words and each pair of adjacent words
+    ("PSK 77812"), normalized, that are long enough to identify a payment.
+    """
+    words = [normalize_ref(word) for word in TOKEN_SPLIT.split(str(value or ''))]
+    tokens = {normalize_ref(value), *words, *(a + b for a, b in zip(words, words[1:]))}
+    return {token for token in tokens if len(token) >= MIN_REF_LENGTH}
+
+
+def to_kobo(amount):
+    return int((amount * 100).to_integral_value())
+
+
+# ============ STATEMENT PARSING ============
+
+class StatementLine:
+    """One credit line of a statement."""
+
+    def __init__(self, line_no, date, amount, reference):
+        self.line_no = line_no
+        self.date = date
+        self.amount = amount
+        self.reference = reference
+
+    def as_dict(self):
+        return {'line': self.line_no, 'date': self.date.isoformat(),
+                'amount': f'{self.amount:.2f}', 'reference': self.reference}
+
+
+def _parse_date(value):
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    try:
+        # ISO timestamps, e.g. '2026-10-19T14:03:00'
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+
+def _parse_amount(value):
+    value = re.sub(r'[₦,\s]|NGN', '', (value or '').strip(), flags=re.IGNORECASE)
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+    if not value:
+        return None
+    try:
+        return Decimal(value).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+
+
+def _header_map(fieldnames):
+    normalized = {' '.join(name.lower().split()): name for name in fieldnames if name}
+    mapping = {}
+    for column, aliases in COLUMNS.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[column] = normalized[alias]
+                break
+    missing = [column for column in ('date', 'amount') if column not in mapping]
+    if missing:
+        raise ValidationError(f"Statement has no {' or '.join(missing)} column (found: {', '.join(fieldnames)}).")
+    return mapping
+
+
+def parse_statement(source):
+    """
+    Read a CSV statement (a text or binary file, str or bytes) into
+    StatementLines. Debit lines are skipped; unreadable lines are returned
+    separately as (line number, reason). Returns (lines, rejected).
+    """
+    if hasattr(source, 'read'):
+        source = source.read()
+    if isinstance(source, bytes):
+        source = source.decode('utf-8-sig', errors='replace')
+
+    reader = csv.DictReader(io.StringIO(source))
+    if not reader.fieldnames:
+        raise ValidationError('Statement is empty.')
+    columns = _header_map(reader.fieldnames)
+
+    lines, rejected = [], []
+    for line_no, row in enumerate(reader, start=2):
+        if not any((value or '').strip() for value in row.values() if isinstance(value, str)):
+            continue
+        if 'debit' in columns and (_parse_amount(row.get(columns['debit'])) or 0) > 0:
+            continue
+        date = _parse_date(row.get(columns['date']) or '')
+        amount = _parse_amount(row.get(columns['amount']))
+        if date is None or amount is None:
+            rejected.append((line_no, 'Unreadable date or amount'))
+            continue
+        if amount <= 0:
+            continue
+        reference = (row.get(columns['reference']) or '').strip() if 'reference' in columns else ''
+        lines.append(StatementLine(line_no, date, amount, reference))
+    return lines, rejected
+
+
+# ============ MATCHING ============
+
+class PendingIndex:
+    """Pending transactions hashed by reference token and by amount."""
+
+    def __init__(self, candidates):
+        self.by_ref = defaultdict(list)
+        self.by_amount = defaultdict(list)
+        self.matched = set()
+        for candidate in candidates:
+            candidate['date'] = timezone.localdate(candidate['created_at'])
+            for ref in (candidate['external_ref'], candidate['transaction_ref']):
+                key = normalize_ref(ref)
+                if len(key) >= MIN_REF_LENGTH:
+                    self.by_ref[key].append(candidate)
+            self.by_amount[to_kobo(candidate['amount'])].append(candidate)
+
+    def _open(self, bucket, line, window):
+        return [
+            candidate for candidate in bucket
+            if candidate['pk'] not in self.matched and abs((candidate['date'] - line.date).days) <= window
+        ]
+
+    def match_reference(self, line, window):
+        """The unmatched transaction of this amount that the line's reference names, if any."""
+        kobo = to_kobo(line.amount)
+        for token in ref_tokens(line.reference):
+            named = [c for c in self._open(self.by_ref.get(token, ()), line, window) if to_kobo(c['amount']) == kobo]
+            if named:
+                return self._take(named[0])
+        return None
+
+    def match_amount(self, line, window):
+        """Return (candidate, None) if exactly one unmatched transaction has this amount, else (None, reason)."""
+        same_amount = self._open(self.by_amount.get(to_kobo(line.amount), ()), line, window)
+        if len(same_amount) == 1:
+            return self._take(same_amount[0]), None
+        if same_amount:
+            return None, f'{len(same_amount)} pending transactions of this amount in the window'
+        return None, 'No pending transaction of this amount in the window'
+
+    def _take(self, candidate):
+        self.matched.add(candidate['pk'])
+        return candidate
+
+
+def pending_candidates(lines, window, payment_methods=None):
+    """Pending transactions created within `window` days of the statement's date range, as dicts."""
+    first = min(line.date for line in lines) - timedelta(days=window)
+    last = max(line.date for line in lines) + timedelta(days=window + 1)
+    tz = timezone.get_current_timezone()
+    queryset = Transaction.objects.filter(
+        status__in=PENDING_STATUSES,
+        created_at__gte=datetime.combine(first, datetime.min.time(), tzinfo=tz),
+        created_at__lt=datetime.combine(last, datetime.min.time(), tzinfo=tz),
+    )
+    if payment_methods:
+        queryset = queryset.filter(payment_method__in=payment_methods)
+    return list(queryset.order_by('created_at').values(
+        'pk', 'transaction_ref', 'external_ref', 'amount', 'created_at', 'booking_id', 'transaction_type',
+    ))
+
+
+# ============ CONFIRMING ============
+
+def confirm_matches(matches, actor, source):
+    """
+    Confirm the matched transactions and post what they now move. The
+    transactions are confirmed with one UPDATE per BATCH_SIZE rows and
+    verification note (notes name the statement, the line date and how it
+    matched, so there are only a few); amount_paid and the folios then get
+    one UPDATE ... CASE each. Rows confirmed elsewhere since they were read
+    are skipped. Returns the confirmed transaction pks.
+    """
+    notes = {
+        candidate['pk']: f'Matched {source} line dated {line.date.isoformat()} by {how}'
+        for line, candidate, how in matches
+    }
+    now = timezone.now()
+    with transaction.atomic():
+        still_pending = list(Transaction.objects.select_for_update().filter(
+            pk__in=list(notes), status__in=PENDING_STATUSES,
+        ).values('pk', 'booking_id', 'transaction_type', 'amount'))
+
+        by_note = defaultdict(list)
+        for entry in still_pending:
+            by_note[notes[entry['pk']]].append(entry['pk'])
+        for note, pks in by_note.items():
+            for start in range(0, len(pks), BATCH_SIZE):
+                Transaction.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).update(
+                    status=Transaction.Status.CONFIRMED, verified_by=actor, verified_at=now,
+                    verification_notes=note,
+                )
+
+        deltas = defaultdict(Decimal)
+        folio_changes = defaultdict(lambda: defaultdict(Decimal))
+        for entry in still_pending:
+            column = Folio.LEDGER_COLUMNS.get(entry['transaction_type'])
+            if entry['booking_id'] and column:
+                sign = -1 if entry['transaction_type'] == Transaction.Type.REFUND else 1
+                deltas[entry['booking_id']] += sign * entry['amount']
+                folio_changes[entry['booking_id']][column] += entry['amount']
+        apply_balance_deltas(deltas)
+        Folio.post_many(folio_changes)
+    return [entry['pk'] for entry in still_pending]
+
+
+def reconcile(source, actor=None, window=DEFAULT_WINDOW_DAYS, payment_methods=None, dry_run=False,
+              source_name='statement', request=None, sample=50):
+    """
+    Match a statement against pending transactions and (unless dry_run)
+    confirm the matches. Returns a report dict.
+    """
+    lines, rejected = parse_statement(source)
+    report = {
+        'source': source_name,
+        'lines': len(lines),
+        'rejected': [{'line': line_no, 'reason': reason} for line_no, reason in rejected[:sample]],
+        'matched': 0,
+        'confirmed': 0,
+        'matched_total': '0.00',
+        'unmatched_count': 0,
+        'matches': [],
+        'unmatched': [],
+    }
+    if not lines:
+        return report
+
+    index = PendingIndex(pending_candidates(lines, window, payment_methods))
+    # References first, so a bare amount never takes a transaction another line names
+    matches, by_amount, unmatched = [], [], []
+    for line in lines:
+        candidate = index.match_reference(line, window)
+        if candidate:
+            matches.append((line, candidate, 'reference'))
+        else:
+            by_amount.append(line)
+    for line in by_amount:
+        candidate, reason = index.match_amount(line, window)
+        if candidate:
+            matches.append((line, candidate, 'amount'))
+        else:
+            unmatched.append(dict(line.as_dict(), reason=reason))
+
+    confirmed = [] if dry_run else confirm_matches(matches, actor, source_name)
+    total = sum((line.amount for line, _, _ in matches), Decimal('0.00'))
+    report.update({
+        'matched': len(matches),
+        'confirmed': len(confirmed),
+        'matched_total': f'{total:.2f}',
+        'unmatched_count': len(unmatched),
+        'matches': [
+            dict(line.as_dict(), transaction_ref=candidate['transaction_ref'], matched_on=how)
+            for line, candidate, how in matches[:sample]
+        ],
+        'unmatched': unmatched[:sample],
+    })
+
+    if confirmed:
+        SystemEvent.log(
+            event_type='STATEMENT_RECONCILED',
+            category=SystemEvent.EventCategory.PAYMENT,
+            actor=actor,
+            request=request,
+            payload={key: report[key] for key in ('source', 'lines', 'matched', 'confirmed',
+                                                  'matched_total', 'unmatched_count')},
+            description=f'{source_name}: confirmed {len(confirmed)} of {len(lines)} statement lines',
+        )
+    return report
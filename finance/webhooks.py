@@ -0,0 +1,287 @@
+"""
+Paystack webhook ingestion for Mayor K. Guest Palace.
+
+Paystack retries a delivery until it gets a 2xx, often several times in a
+burst. The webhook therefore does as little as possible: receive() checks
+the HMAC signature and stores the event with one INSERT; a retry hits the
+unique (provider, event_type, reference) constraint and is acknowledged
+without touching anything else. process_events(), run out of band by
+`manage.py process_payment_events`, turns stored charge.success events into
+ledger payments a batch at a time through finance.ledger.post_entries:
+one bulk INSERT, one amount_paid UPDATE and one folio UPDATE per batch.
+
+Idempotency holds at both ends. Events are unique per reference, and the
+transactions table has a unique index on PAYSTACK payment external_refs, so
+an event whose reference is already in the ledger is marked DUPLICATE and
+never posted twice.
+"""
+import hashlib
+import hmac
+import json
+import urllib.request
+import uuid
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from bookings.models import Booking
+from finance.ledger import MAX_BATCH, post_entries
+from finance.models import PaymentEvent, Transaction
+
+PROVIDER = 'paystack'
+SIGNATURE_HEADER = 'HTTP_X_PAYSTACK_SIGNATURE'
+CHARGE_SUCCESS = 'charge.success'
+CURRENCY = 'NGN'
+# Events per worker transaction
+BATCH_SIZE = 200
+
+
+class WebhookError(Exception):
+    """A delivery the webhook refuses; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def sign(body, secret):
+    return hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+
+
+# ============ RECEIVING ============
+
+def receive(body, signature):
+    """
+    Verify and store one raw delivery. Returns True if it was new, False for
+    a retry of a stored event. Raises WebhookError for anything rejected.
+    """
+    secret = settings.PAYSTACK_SECRET_KEY
+    if not secret:
+        raise WebhookError('Paystack is not configured', 503)
+    if not signature or not hmac.compare_digest(sign(body, secret), signature):
+        raise WebhookError('Invalid signature', 401)
+    try:
+        event = json.loads(body)
+        event_type = str(event['event'])[:50]
+        reference = str(event['data']['reference'])[:100]
+    except (ValueError, TypeError, KeyError):
+        raise WebhookError('Malformed event', 400)
+
+    try:
+        with transaction.atomic():
+            PaymentEvent.objects.create(
+                provider=PROVIDER, event_type=event_type, provider_ref=reference, payload=event,
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+# ============ PROCESSING ============
+
+def _charge(event):
+    """(amount, booking_ref) of a charge.success payload, or raise ValueError saying what is wrong."""
+    data = event.payload.get('data') or {}
+    if data.get('status', 'success') != 'success':
+        raise ValueError(f"Charge status is {data.get('status')!r}")
+    if data.get('currency', CURRENCY) != CURRENCY:
+        raise ValueError(f"Unsupported currency {data.get('currency')!r}")
+    try:
+        amount = (Decimal(str(data['amount'])) / 100).quantize(Decimal('0.01'))  # kobo
+    except (KeyError, InvalidOperation):
+        raise ValueError('Missing or invalid amount')
+    if amount <= 0:
+        raise ValueError('Amount must be positive')
+    metadata = data.get('metadata') or {}
+    if isinstance(metadata, str):  # Paystack passes metadata through as sent, sometimes JSON-encoded
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            metadata = {}
+    booking_ref = metadata.get('booking_ref') if isinstance(metadata, dict) else None
+    if not booking_ref:
+        raise ValueError('No booking_ref in metadata')
+    return amount, str(booking_ref)
+
+
+def _mark(pks, status, now, error=''):
+    if pks:
+        PaymentEvent.objects.filter(pk__in=pks).update(status=status, error=error, processed_at=now)
+
+
+def _link_ledger_entries(pks):
+    """Point events at the ledger payment carrying their reference, in one UPDATE."""
+    PaymentEvent.objects.filter(pk__in=pks).update(ledger_entry=Subquery(
+        Transaction.objects.filter(
+            payment_method=Transaction.Method.PAYSTACK, transaction_type=Transaction.Type.PAYMENT,
+            external_ref=OuterRef('provider_ref'),
+        ).values('pk')[:1]
+    ))
+
+
+def _post(entries, pks, failed):
+    """
+    Post `entries`, one per event in `pks`. Entries the ledger rejects are
+    set aside under their error in `failed` and the rest posted. Returns the
+    pks of the events posted.
+    """
+    entries, pks = list(entries), list(pks)
+    while entries:
+        try:
+            post_entries(entries, actor=None, source=PROVIDER)
+            break
+        except ValidationError as e:
+            if not hasattr(e, 'error_dict'):
+                raise  # not about any one entry, so no event is to blame
+            errors = e.message_dict
+            for index in sorted((int(index) for index in errors), reverse=True):
+                failed[' '.join(errors[str(index)])].append(pks.pop(index))
+                entries.pop(index)
+    return pks
+
+
+def process_batch(batch_size=BATCH_SIZE):
+    """
+    Process up to `batch_size` stored events, oldest first, in one database
+    transaction. Workers running side by side skip each other's rows on
+    PostgreSQL. Returns {status: count} for the batch.
+    """
+    now = timezone.now()
+    counts = defaultdict(int)
+    with transaction.atomic():
+        events = list(
+            PaymentEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=PaymentEvent.Status.RECEIVED).order_by('received_at')[:batch_size]
+        )
+        if not events:
+            return {}
+
+        ignored = [event.pk for event in events if event.event_type != CHARGE_SUCCESS]
+        _mark(ignored, PaymentEvent.Status.IGNORED, now)
+        counts[PaymentEvent.Status.IGNORED] += len(ignored)
+
+        failed = defaultdict(list)
+        charges = {}
+        for event in events:
+            if event.event_type != CHARGE_SUCCESS:
+                continue
+            try:
+                charges[event.pk] = (event,) + _charge(event)
+            except ValueError as e:
+                failed[str(e)].append(event.pk)
+
+        refs = {event.provider_ref for event, _, _ in charges.values()}
+        posted_refs = set(Transaction.objects.filter(
+            payment_method=Transaction.Method.PAYSTACK, transaction_type=Transaction.Type.PAYMENT,
+            external_ref__in=refs,
+        ).values_list('external_ref', flat=True))
+        bookings = dict(Booking.objects.filter(
+            booking_ref__in={booking_ref for _, _, booking_ref in charges.values()},
+        ).values_list('booking_ref', 'pk'))
+
+        duplicates, to_post, entries = [], [], []
+        for pk, (event, amount, booking_ref) in charges.items():
+            if event.provider_ref in posted_refs:
+                duplicates.append(pk)
+            elif booking_ref not in bookings:
+                failed[f'Booking {booking_ref} not found'].append(pk)
+            else:
+                posted_refs.add(event.provider_ref)
+                to_post.append(pk)
+                entries.append({
+                    'booking': bookings[booking_ref],
+                    'transaction_type': Transaction.Type.PAYMENT,
+                    'payment_method': Transaction.Method.PAYSTACK,
+                    'amount': amount,
+                    'external_ref': event.provider_ref,
+                    'notes': f'Paystack {event.provider_ref}',
+                })
+
+        # post_entries takes at most MAX_BATCH entries at a time
+        to_post = [pk for start in range(0, len(entries), MAX_BATCH)
+                   for pk in _post(entries[start:start + MAX_BATCH], to_post[start:start + MAX_BATCH], failed)]
+        _mark(to_post, PaymentEvent.Status.PROCESSED, now)
+        _mark(duplicates, PaymentEvent.Status.DUPLICATE, now)
+        _link_ledger_entries(to_post + duplicates)
+        for error, pks in failed.items():
+            _mark(pks, PaymentEvent.Status.FAILED, now, error)
+
+    counts[PaymentEvent.Status.PROCESSED] += len(to_post)
+    counts[PaymentEvent.Status.DUPLICATE] += len(duplicates)
+    counts[PaymentEvent.Status.FAILED] += sum(len(pks) for pks in failed.values())
+    return {str(status): count for status, count in counts.items() if count}
+
+
+def process_events(batch_size=BATCH_SIZE, max_batches=None):
+    """Process stored events batch by batch until none are left. Returns the summed counts."""
+    totals = defaultdict(int)
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        counts = process_batch(batch_size)
+        if not counts:
+            break
+        batches += 1
+        for status, count in counts.items():
+            totals[status] += count
+    return dict(totals)
+
+
+# ============ STUB SENDER ============
+
+class StubSender:
+    """
+    Stand-in for Paystack in tests and local runs: builds signed
+    charge.success deliveries and posts them to the webhook, retries
+    included. `post(url, body, headers)` defaults to an HTTP POST with
+    urllib; tests pass the Django test client instead (see client_post).
+    """
+
+    def __init__(self, secret=None, url='http://127.0.0.1:8000/api/v1/webhooks/paystack/', post=None):
+        self.secret = secret or settings.PAYSTACK_SECRET_KEY
+        self.url = url
+        self.post = post or self.http_post
+
+    @staticmethod
+    def charge(booking_ref, amount, reference=None, **data):
+        """A charge.success event for `amount` naira (sent in kobo, as Paystack does)."""
+        return {
+            'event': CHARGE_SUCCESS,
+            'data': {
+                'reference': reference or f'PSK-{uuid.uuid4().hex[:12].upper()}',
+                'amount': int(Decimal(str(amount)) * 100),
+                'currency': CURRENCY,
+                'status': 'success',
+                'paid_at': timezone.now().isoformat(),
+                'metadata': {'booking_ref': booking_ref},
+                **data,
+            },
+        }
+
+    def send(self, event, times=1, signature=None):
+        """Deliver `event` `times` times (a provider retrying). Returns the last response."""
+        body = json.dumps(event).encode()
+        headers = {'Content-Type': 'application/json',
+                   'X-Paystack-Signature': signature or sign(body, self.secret)}
+        response = None
+        for _ in range(times):
+            response = self.post(self.url, body, headers)
+        return response
+
+    @staticmethod
+    def http_post(url, body, headers):
+        request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+        with urllib.request.urlopen(request) as response:
+            return response.status
+
+    @staticmethod
+    def client_post(client):
+        """Adapt a django.test.Client to `post`."""
+        def post(url, body, headers):
+            return client.post(url, body, content_type=headers['Content-Type'],
+                               HTTP_X_PAYSTACK_SIGNATURE=headers['X-Paystack-Signature'])
+        return post
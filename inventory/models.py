@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 import uuid
+from bookings.models import Folio
 
 class Category(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -64,7 +65,7 @@ class StockLog(models.Model):
     new_quantity = models.IntegerField()
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     notes = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"{self.product.name} - {self.action} ({self.quantity_change})"
@@ -95,15 +96,42 @@ class Order(models.Model):
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHODS)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     notes = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        order = super().from_db(db, field_names, values)
+        order._posted = (order.__dict__.get('booking_id'), order.__dict__.get('total_amount'))
+        return order
 
     def save(self, *args, **kwargs):
         if not self.reference:
-            # Generate simple reference like BAR-1234
+            # Generate reference like BAR-YYMMDD-XXXXX (4 random digits collided within a busy day)
             import random
-            suffix = random.randint(1000, 9999)
-            self.reference = f"BAR-{suffix}"
-        super().save(*args, **kwargs)
+            import string
+            from django.utils import timezone
+            date_part = timezone.now().strftime('%y%m%d')
+            random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
+            self.reference = f"BAR-{date_part}-{random_part}"
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._post_to_folio(self.booking_id, self.total_amount)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._post_to_folio(None, 0)
+        return result
+
+    def _post_to_folio(self, booking_id, total):
+        """Move the difference from what this order last posted onto the booking folios."""
+        posted_booking, posted_total = getattr(self, '_posted', (None, 0))
+        if posted_booking == booking_id:
+            Folio.post(booking_id, bar_charges=total - (posted_total or 0))
+        else:
+            Folio.post(posted_booking, bar_charges=-(posted_total or 0))
+            Folio.post(booking_id, bar_charges=total)
+        self._posted = (booking_id, total)
 
     def __str__(self):
         return f"Order {self.reference}"
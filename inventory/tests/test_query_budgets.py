@@ -0,0 +1,33 @@
+"""
+Query and wall-time budgets for every router endpoint in inventory/urls.py.
+"""
+from core.tests.utils import QueryBudgetTestCase
+
+API = '/api/v1/inventory'
+
+
+class InventoryEndpointQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_categories(self):
+        self.assertQueryBudget(f'{API}/categories/', 5)
+        self.assertQueryBudget(f"{API}/categories/{self.data['categories'][0].pk}/", 4)
+
+    def test_active_bookings(self):
+        self.assertQueryBudget(f'{API}/active-bookings/', 5)
+        self.assertQueryBudget(f"{API}/active-bookings/{self.data['bookings'][0].pk}/", 4)
+
+    def test_vendors(self):
+        self.assertQueryBudget(f'{API}/vendors/', 5)
+        self.assertQueryBudget(f"{API}/vendors/{self.data['vendors'][0].pk}/", 4)
+
+    def test_products(self):
+        self.assertQueryBudget(f'{API}/products/', 5)
+        self.assertQueryBudget(f"{API}/products/{self.data['products'][0].pk}/", 4)
+
+    def test_orders(self):
+        self.assertQueryBudget(f'{API}/orders/', 7)
+        self.assertQueryBudget(f"{API}/orders/{self.data['orders'][0].pk}/", 6)
+
+    def test_stock_logs(self):
+        self.assertQueryBudget(f'{API}/stock-logs/', 5)
+        self.assertQueryBudget(f"{API}/stock-logs/{self.data['stock_logs'][0].pk}/", 4)
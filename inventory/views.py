@@ -6,26 +6,30 @@ from .models import Category, Product, StockLog, Order, Vendor
 from bookings.models import Booking
 from .serializers import CategorySerializer, ProductSerializer, StockLogSerializer, OrderSerializer, VendorSerializer, ActiveBookingSerializer
 from core.models import SystemEvent
+from core.views import ReplicaReadMixin, ConditionalGetMixin
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    change_tables = [Category]
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
 class ActiveBookingViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Booking.objects.filter(status='CHECKED_IN')
+    queryset = Booking.objects.filter(status='CHECKED_IN').select_related('room', 'guest')
     serializer_class = ActiveBookingSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class VendorViewSet(viewsets.ModelViewSet):
+class VendorViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    change_tables = [Vendor]
     queryset = Vendor.objects.all()
     serializer_class = VendorSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'contact_person', 'email']
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+class ProductViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    change_tables = [Product, Category, Vendor]
+    queryset = Product.objects.select_related('category', 'preferred_vendor').all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -111,7 +115,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Stock updated', 'new_quantity': new_quantity})
 
 class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all().order_by('-created_at')
+    queryset = Order.objects.select_related('user').prefetch_related('items__product').order_by('-created_at')
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -121,8 +125,8 @@ class OrderViewSet(viewsets.ModelViewSet):
         # The actual creation logic is in the serializer, this just triggers it
         serializer.save(user=self.request.user)
 
-class StockLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = StockLog.objects.all().order_by('-created_at')
+class StockLogViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = StockLog.objects.select_related('product', 'user').order_by('-created_at')
     serializer_class = StockLogSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]